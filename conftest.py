@@ -0,0 +1,24 @@
+import pytest
+
+from django.conf import settings
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings_xdist_suffix(request):
+    """Отдельные тестовые базы для процессов pytest-xdist.
+
+    Тестовая база SQLite без имени создаётся в памяти процесса и уже
+    изолирована, поэтому суффикс процесса (_gw0, _gw1…) добавляется
+    только к именованным базам. pytest-django узнаёт SQLite лишь по
+    стандартному движку и превратил бы базу в памяти в файл рядом с
+    рабочей базой.
+    """
+    worker = getattr(request.config, 'workerinput', {}).get('workerid')
+    if not worker:
+        return
+    for database in settings.DATABASES.values():
+        test = database.setdefault('TEST', {})
+        if test.get('NAME'):
+            test['NAME'] = f'{test["NAME"]}_{worker}'
+        elif 'sqlite3' not in database['ENGINE']:
+            test['NAME'] = f'test_{database["NAME"]}_{worker}'
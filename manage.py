@@ -6,7 +6,12 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    # Тесты по умолчанию запускаются с облегчёнными настройками.
+    default_settings = (
+        'yanote.test_settings' if sys.argv[1:2] == ['test']
+        else 'yanote.settings'
+    )
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', default_settings)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
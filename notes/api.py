@@ -0,0 +1,235 @@
+"""JSON API заметок.
+
+Все представления работают только с заметками текущего пользователя,
+как и NoteBase, а анонимный запрос получает ответ 401 в JSON. Поля
+ответа выбираются параметром ``?fields=``, список листается по
+курсору ``?after=``, а пакетный запрос применяет много изменений в
+одной транзакции.
+"""
+import json
+
+from django.db import transaction
+from django.http import HttpResponse, JsonResponse
+from django.views import generic
+
+from .forms import NoteForm
+from .pagination import CursorPaginator, InvalidCursor
+from .tags import tag_names
+from .views import NoteBase
+
+API_FIELDS = ('id', 'title', 'text', 'slug', 'created', 'updated')
+DEFAULT_FIELDS = ('id', 'title', 'slug', 'updated')
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 500
+BATCH_MAX_OPERATIONS = 500
+
+
+class ApiError(Exception):
+    """Ошибка запроса, которая отдаётся клиенту в JSON."""
+
+    def __init__(self, message, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+    def response(self):
+        return JsonResponse(
+            {'error': str(self), **self.extra}, status=self.status
+        )
+
+
+class NoteApiBase(NoteBase, generic.View):
+    """Базовый класс представлений API."""
+
+    def handle_no_permission(self):
+        return JsonResponse({'error': 'Требуется авторизация'}, status=401)
+
+    def rate_limited(self, retry_after):
+        response = JsonResponse(
+            {'error': 'Слишком много запросов', 'retry_after': retry_after},
+            status=429
+        )
+        response['Retry-After'] = retry_after
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return error.response()
+
+    def get_fields(self):
+        """Поля ответа из параметра ``fields``."""
+        value = self.request.GET.get('fields')
+        if not value:
+            return DEFAULT_FIELDS
+        fields = tuple(dict.fromkeys(
+            field.strip() for field in value.split(',') if field.strip()
+        ))
+        unknown = sorted(set(fields) - set(API_FIELDS))
+        if unknown or not fields:
+            raise ApiError(
+                'Неизвестные поля', fields=unknown, allowed=API_FIELDS
+            )
+        return fields
+
+    def get_object(self, slug):
+        try:
+            return self.get_queryset().get(slug=slug)
+        except self.model.DoesNotExist:
+            raise ApiError('Заметка не найдена', status=404, slug=slug)
+
+    def read_json(self):
+        try:
+            data = json.loads(self.request.body)
+        except ValueError:
+            raise ApiError('Тело запроса должно быть JSON')
+        if not isinstance(data, dict):
+            raise ApiError('Ожидается объект JSON')
+        return data
+
+    def save_note(self, data, instance=None, partial=False):
+        """Проверяет данные формой NoteForm и сохраняет заметку."""
+        if not isinstance(data, dict):
+            raise ApiError('Ожидается объект JSON')
+        if partial:
+            current = {field: getattr(instance, field)
+                       for field in NoteForm.Meta.fields}
+            if 'tags' not in data:
+                current['tags'] = ', '.join(tag_names(instance))
+            data = {**current, **data}
+        form = NoteForm(data=data, instance=instance)
+        if not form.is_valid():
+            raise ApiError('Некорректные данные', errors=form.errors)
+        note = form.save(commit=False)
+        if instance is None:
+            note.author = self.request.user
+        note.save()
+        form.save_m2m()
+        return note
+
+    @staticmethod
+    def serialize(note, fields):
+        return {field: getattr(note, field) for field in fields}
+
+
+class NotesCollection(NoteApiBase):
+    """Список заметок и добавление новой."""
+
+    def get(self, request):
+        fields = self.get_fields()
+        try:
+            per_page = min(
+                int(request.GET.get('limit', API_PAGE_SIZE)),
+                API_MAX_PAGE_SIZE
+            )
+        except ValueError:
+            raise ApiError('Некорректный limit')
+        if per_page < 1:
+            raise ApiError('Некорректный limit')
+        queryset = self.get_queryset().only(*fields)
+        try:
+            page = CursorPaginator(queryset, per_page).page(
+                request.GET.get('after')
+            )
+        except InvalidCursor as error:
+            raise ApiError(str(error))
+        return JsonResponse({
+            'results': [self.serialize(note, fields) for note in page],
+            'next': page.next_cursor,
+        })
+
+    def post(self, request):
+        fields = self.get_fields()
+        note = self.save_note(self.read_json())
+        return JsonResponse(self.serialize(note, fields), status=201)
+
+
+class NoteResource(NoteApiBase):
+    """Чтение, изменение и удаление одной заметки."""
+
+    def get(self, request, slug):
+        fields = self.get_fields()
+        try:
+            note = self.get_queryset().only(*fields).get(slug=slug)
+        except self.model.DoesNotExist:
+            raise ApiError('Заметка не найдена', status=404, slug=slug)
+        return JsonResponse(self.serialize(note, fields))
+
+    def put(self, request, slug):
+        fields = self.get_fields()
+        note = self.save_note(self.read_json(), self.get_object(slug))
+        return JsonResponse(self.serialize(note, fields))
+
+    def patch(self, request, slug):
+        fields = self.get_fields()
+        note = self.save_note(
+            self.read_json(), self.get_object(slug), partial=True
+        )
+        return JsonResponse(self.serialize(note, fields))
+
+    def delete(self, request, slug):
+        self.get_object(slug).delete()
+        return HttpResponse(status=204)
+
+
+class NotesBatch(NoteApiBase):
+    """Пакет операций над заметками в одной транзакции.
+
+    Тело запроса — ``{"operations": [...]}``, где операция это
+    ``{"op": "create", "data": {...}}``, ``{"op": "update", "slug": ...,
+    "data": {...}}`` (частичное изменение) или ``{"op": "delete",
+    "slug": ...}``. Заметки из операций загружаются одним запросом.
+    При первой ошибке откатывается весь пакет, а в ответе указывается
+    номер операции.
+    """
+
+    def post(self, request):
+        fields = self.get_fields()
+        operations = self.read_json().get('operations')
+        if not isinstance(operations, list) or not operations:
+            raise ApiError('Ожидается непустой список operations')
+        if len(operations) > BATCH_MAX_OPERATIONS:
+            raise ApiError(
+                'Слишком много операций', limit=BATCH_MAX_OPERATIONS
+            )
+        if not all(isinstance(operation, dict) for operation in operations):
+            raise ApiError('Операция должна быть объектом JSON')
+        slugs = {
+            operation['slug'] for operation in operations
+            if isinstance(operation.get('slug'), str)
+        }
+        notes = {
+            note.slug: note
+            for note in self.get_queryset().filter(slug__in=slugs)
+        }
+        results = []
+        with transaction.atomic():
+            for index, operation in enumerate(operations):
+                try:
+                    results.append(self.apply(operation, notes, fields))
+                except ApiError as error:
+                    error.extra['index'] = index
+                    raise
+        return JsonResponse({'results': results})
+
+    def apply(self, operation, notes, fields):
+        op = operation.get('op')
+        if op == 'create':
+            note = self.save_note(operation.get('data'))
+            notes[note.slug] = note
+            return {'op': op, 'note': self.serialize(note, fields)}
+        if op not in ('update', 'delete'):
+            raise ApiError('Неизвестная операция', op=op)
+        slug = operation.get('slug')
+        if not isinstance(slug, str):
+            raise ApiError('Ожидается строка slug')
+        note = notes.pop(slug, None)
+        if note is None:
+            raise ApiError('Заметка не найдена', status=404, slug=slug)
+        if op == 'delete':
+            note.delete()
+            return {'op': op, 'slug': slug}
+        note = self.save_note(operation.get('data'), note, partial=True)
+        notes[note.slug] = note
+        return {'op': op, 'note': self.serialize(note, fields)}
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from notes import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path('notes/', api.NotesCollection.as_view(), name='notes'),
+    path('batch/', api.NotesBatch.as_view(), name='batch'),
+    path('notes/<slug:slug>/', api.NoteResource.as_view(), name='note'),
+]
@@ -0,0 +1,108 @@
+"""Выгрузка заметок архивом с файлом Markdown на каждую заметку.
+
+Архив пишется в буфер, который опустошается после каждого файла,
+а заметки читаются из базы порциями, поэтому в памяти одновременно
+находятся одна порция строк и сжатые данные последних файлов. От
+числа заметок зависит только оглавление zip — несколько сотен байт
+на файл.
+"""
+import tarfile
+import zipfile
+from io import BytesIO
+
+from .models import Note
+
+ARCHIVE_CHUNK_SIZE = 500
+# Сколько байт архива копить перед отправкой очередного куска.
+FLUSH_SIZE = 64 * 1024
+ARCHIVE_DIRECTORY = 'notes'
+
+# Формат: тип содержимого и расширение файла.
+ARCHIVE_FORMATS = {
+    'zip': ('application/zip', 'zip'),
+    'tar': ('application/x-tar', 'tar'),
+    'tar.gz': ('application/gzip', 'tar.gz'),
+}
+
+
+class _Sink:
+    """Файл только для записи, содержимое которого забирается кусками.
+
+    У него нет tell и seek, поэтому zipfile пишет размеры файлов после
+    их данных, а не возвращается к заголовкам.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        self.size = 0
+        return data
+
+
+def render_markdown(title, text):
+    """Содержимое файла заметки."""
+    return f'# {title}\n\n{text}\n'.encode()
+
+
+def _rows(author, chunk_size):
+    return Note.objects.filter(author=author).order_by('id').values_list(
+        'slug', 'title', 'text', 'updated'
+    ).iterator(chunk_size=chunk_size)
+
+
+def _write_zip(sink, rows):
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for slug, title, text, updated in rows:
+            info = zipfile.ZipInfo(
+                f'{ARCHIVE_DIRECTORY}/{slug}.md',
+                date_time=updated.timetuple()[:6]
+            )
+            info.compress_type = zipfile.ZIP_DEFLATED
+            zf.writestr(info, render_markdown(title, text))
+            yield
+
+
+def _write_tar(sink, rows, compressed):
+    mode = 'w|gz' if compressed else 'w|'
+    with tarfile.open(fileobj=sink, mode=mode) as tar:
+        for slug, title, text, updated in rows:
+            data = render_markdown(title, text)
+            info = tarfile.TarInfo(f'{ARCHIVE_DIRECTORY}/{slug}.md')
+            info.size = len(data)
+            info.mtime = int(updated.timestamp())
+            tar.addfile(info, BytesIO(data))
+            # Список добавленных файлов потоковому архиву не нужен.
+            tar.members.clear()
+            yield
+
+
+def export_archive(author, archive_format='zip',
+                   chunk_size=ARCHIVE_CHUNK_SIZE):
+    """Отдаёт архив заметок автора кусками по мере его записи."""
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f'Неизвестный формат архива: {archive_format}')
+    sink = _Sink()
+    rows = _rows(author, chunk_size)
+    if archive_format == 'zip':
+        files = _write_zip(sink, rows)
+    else:
+        files = _write_tar(sink, rows, archive_format == 'tar.gz')
+    for _ in files:
+        if sink.size >= FLUSH_SIZE:
+            yield sink.drain()
+    # Оглавление zip и окончание tar дописываются при закрытии архива.
+    data = sink.drain()
+    if data:
+        yield data
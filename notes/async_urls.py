@@ -0,0 +1,16 @@
+"""Корневые маршруты проекта с асинхронными представлениями заметок.
+
+Позволяют сравнивать обе реализации в одном процессе (тесты, замеры),
+не меняя настройку NOTES_ASYNC_VIEWS.
+"""
+from django.urls import include, path
+
+from yanote.urls import auth_urls
+
+from .urls import app_name, get_urlpatterns
+
+urlpatterns = [
+    path('', include((get_urlpatterns(use_async=True), app_name))),
+    path('api/', include('notes.api_urls')),
+    path('auth/', include(auth_urls)),
+]
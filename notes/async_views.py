@@ -0,0 +1,214 @@
+"""Асинхронные версии представлений заметок.
+
+Подключаются вместо notes.views настройкой NOTES_ASYNC_VIEWS.
+В Django 3.2 у ORM нет асинхронного API, поэтому каждое обращение
+к БД выполняется через sync_to_async одним вызовом на шаг запроса,
+а ожидание ввода-вывода не занимает поток из пула.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth.views import redirect_to_login
+from django.http import (
+    Http404, HttpResponse, HttpResponseNotAllowed, HttpResponseRedirect
+)
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from . import cache
+from .forms import NoteForm
+from .models import Note
+from .pagination import CursorPaginator, InvalidCursor
+from .ratelimit import rate_limit
+from .stats import get_stats
+from .tags import filter_by_query, filter_query
+from .views import NotesList, note_etag, note_updated, notes_list_etag
+
+
+def login_required(view):
+    """Асинхронный аналог django.contrib.auth.decorators.login_required."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        # Пользователь загружается лениво при первом обращении, и это
+        # запрос к БД, поэтому первое обращение выполняется в потоке.
+        is_authenticated = await sync_to_async(
+            lambda: request.user.is_authenticated
+        )()
+        if not is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def allowed_methods(*methods):
+    """Асинхронный аналог require_http_methods."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+async def _conditional(request, etag, last_modified, render):
+    """Отвечает 304 для неизменившейся страницы, иначе отрисовывает её."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp
+    )
+    if response is None:
+        response = await render()
+    if timestamp:
+        response.headers.setdefault('Last-Modified', http_date(timestamp))
+    if etag:
+        response.headers.setdefault('ETag', etag)
+    return response
+
+
+async def _cached(request, prefix, parts, render):
+    """Отдаёт страницу из версионированного кэша или отрисовывает её."""
+    key = await sync_to_async(cache.page_key)(prefix, request.user.pk, *parts)
+    content = await sync_to_async(cache.get_page)(key)
+    if content is not None:
+        return HttpResponse(content)
+    response = await render()
+    if response.status_code == 200 and not response.cookies:
+        response.add_post_render_callback(
+            lambda rendered: cache.set_page(key, rendered.content)
+        )
+    return response
+
+
+async def home(request):
+    """Домашняя страница."""
+    def load_stats():
+        if request.user.is_authenticated:
+            return get_stats(request.user)
+
+    return TemplateResponse(request, 'notes/home.html', {
+        'stats': await sync_to_async(load_stats)(),
+    })
+
+
+@login_required
+async def success(request):
+    """Страница успешного выполнения операции."""
+    return TemplateResponse(request, 'notes/success.html')
+
+
+def _own_note(request, slug):
+    return get_object_or_404(Note, author=request.user, slug=slug)
+
+
+@login_required
+@allowed_methods('GET', 'HEAD')
+async def notes_list(request):
+    """Список всех заметок пользователя."""
+    def paginate():
+        queryset = filter_by_query(
+            Note.objects.filter(author=request.user).for_list(),
+            request.user, request.GET
+        )
+        paginator = CursorPaginator(queryset, NotesList.paginate_by)
+        try:
+            page = paginator.page(request.GET.get('after'))
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return paginator, page, get_stats(request.user)
+
+    async def render():
+        paginator, page, stats = await sync_to_async(paginate)()
+        return TemplateResponse(request, 'notes/list.html', {
+            'stats': stats,
+            'filter_query': filter_query(request.GET),
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': page.has_other_pages(),
+            'object_list': page.object_list,
+            'note_list': page.object_list,
+        })
+
+    async def cached():
+        return await _cached(
+            request, 'list', (request.GET.urlencode(),), render
+        )
+
+    etag = await sync_to_async(notes_list_etag)(request)
+    return await _conditional(request, etag, None, cached)
+
+
+@login_required
+@allowed_methods('GET', 'HEAD')
+async def note_detail(request, slug):
+    """Заметка подробно."""
+    async def render():
+        note = await sync_to_async(_own_note)(request, slug)
+        return TemplateResponse(request, 'notes/detail.html', {
+            'note': note, 'object': note,
+        })
+
+    async def cached():
+        return await _cached(request, 'detail', (slug,), render)
+
+    etag, updated = await sync_to_async(
+        lambda: (note_etag(request, slug), note_updated(request, slug))
+    )()
+    return await _conditional(request, etag, updated, cached)
+
+
+def _save_form(form, author):
+    if not form.is_valid():
+        return False
+    form.instance.author = author
+    form.save()
+    return True
+
+
+async def _note_form(request, instance=None):
+    if request.method == 'POST':
+        form = NoteForm(request.POST, instance=instance)
+        if await sync_to_async(_save_form)(form, request.user):
+            return HttpResponseRedirect(reverse('notes:success'))
+    else:
+        # Форма правки читает метки заметки из базы.
+        form = await sync_to_async(NoteForm)(instance=instance)
+    return TemplateResponse(request, 'notes/form.html', {
+        'form': form, 'object': instance, 'note': instance,
+    })
+
+
+@login_required
+@rate_limit('notes-write')
+@allowed_methods('GET', 'HEAD', 'POST')
+async def note_create(request):
+    """Добавление заметки."""
+    return await _note_form(request)
+
+
+@login_required
+@rate_limit('notes-write')
+@allowed_methods('GET', 'HEAD', 'POST')
+async def note_update(request, slug):
+    """Редактирование заметки."""
+    note = await sync_to_async(_own_note)(request, slug)
+    return await _note_form(request, instance=note)
+
+
+@login_required
+@rate_limit('notes-write')
+@allowed_methods('GET', 'HEAD', 'POST', 'DELETE')
+async def note_delete(request, slug):
+    """Удаление заметки."""
+    note = await sync_to_async(_own_note)(request, slug)
+    if request.method in ('POST', 'DELETE'):
+        await sync_to_async(note.delete)()
+        return HttpResponseRedirect(reverse('notes:success'))
+    return TemplateResponse(request, 'notes/delete.html', {
+        'note': note, 'object': note,
+    })
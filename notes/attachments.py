@@ -0,0 +1,155 @@
+"""Вложения заметок: потоковая загрузка, хранение по хэшу, выдача частями.
+
+Загружаемый файл пишется кусками во временный файл, и по пути
+считается его SHA-256. Содержимое хранится в ``Blob`` один раз на хэш:
+повторная загрузка того же файла только добавляет ``Attachment``, а
+временный файл переносится в хранилище переименованием, без
+копирования. Файл удаляется после удаления последнего вложения.
+"""
+import hashlib
+import logging
+import re
+
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    SkipFile, TemporaryFileUploadHandler
+)
+from django.db import IntegrityError, transaction
+from django.db.models import ProtectedError
+
+from .models import Attachment, Blob, blob_path
+
+logger = logging.getLogger(__name__)
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку во временный файл и считает её SHA-256.
+
+    Файлы больше ``NOTES_ATTACHMENT_MAX_SIZE`` пропускаются, а
+    обработчик запоминает это в ``too_large``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.too_large = False
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hash = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.NOTES_ATTACHMENT_MAX_SIZE:
+            self.too_large = True
+            self.file.close()
+            raise SkipFile()
+        self.hash.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        file.sha256 = self.hash.hexdigest()
+        return file
+
+
+def _get_or_create_blob(uploaded):
+    blob = Blob.objects.filter(sha256=uploaded.sha256).first()
+    if blob is not None:
+        return blob
+    blob = Blob(sha256=uploaded.sha256, size=uploaded.size)
+    name = blob_path(blob, uploaded.name)
+    stored = not blob.file.storage.exists(name)
+    if not stored:
+        # Файл с тем же хэшем остался от прерванной загрузки, и его
+        # содержимое совпадает с загруженным.
+        uploaded.close()
+        blob.file.name = name
+    else:
+        # Временный файл переносится в хранилище переименованием.
+        blob.file.save(name, uploaded, save=False)
+    try:
+        with transaction.atomic():
+            blob.save()
+    except IntegrityError:
+        # Тот же файл параллельно загрузил кто-то ещё.
+        if stored:
+            blob.file.delete(save=False)
+        blob = Blob.objects.get(sha256=uploaded.sha256)
+    return blob
+
+
+def attach(note, uploaded):
+    """Прикрепляет загруженный файл к заметке."""
+    return Attachment.objects.create(
+        note=note,
+        blob=_get_or_create_blob(uploaded),
+        name=uploaded.name[:Attachment._meta.get_field('name').max_length],
+        content_type=(uploaded.content_type or 'application/octet-stream'),
+    )
+
+
+def release_blob(blob_id):
+    """Удаляет содержимое, на которое больше не ссылаются вложения."""
+    blob = Blob.objects.filter(pk=blob_id).first()
+    if blob is None or blob.attachments.exists():
+        return
+    try:
+        blob.delete()
+    except ProtectedError:
+        # Между проверкой и удалением файл прикрепили заново.
+        return
+    try:
+        blob.file.delete(save=False)
+    except OSError:
+        logger.warning('Не удалось удалить файл %s', blob.file.name)
+
+
+def parse_range(header, size):
+    """Границы запрошенного диапазона байт ``(start, end)`` включительно.
+
+    Возвращает None, если заголовка нет, он не поддерживается или
+    неверен — тогда отдаётся весь файл, — и ``(None, None)``, если
+    диапазон вне файла.
+    Несколько диапазонов в одном запросе не поддерживаются.
+    """
+    match = _RANGE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Суффикс: последние N байт.
+        length = int(last)
+        if not length or not size:
+            return None, None
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        # Синтаксически неверный диапазон игнорируется (RFC 7233).
+        return None
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        return None, None
+    return start, end
+
+
+class RangeFile:
+    """Часть файла от текущей позиции длиной ``length`` байт."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
@@ -0,0 +1,89 @@
+"""Кэш пользователей в памяти процесса для быстрой аутентификации.
+
+Ключ записи — id пользователя, бэкенд и хэш пароля из сессии, так что
+сессия после смены пароля кэш не находит. Запись действительна
+NOTES_USER_CACHE_TTL секунд и, кроме того, сверяется с версией
+пользователя в общем кэше: сохранение пользователя (в том числе смена
+пароля) увеличивает версию и тем самым сбрасывает его записи во всех
+процессах, которые пользуются этим кэшем. Версия отдельна от версии
+страниц, поэтому правка заметок записи не сбрасывает.
+"""
+import threading
+import time
+from collections import OrderedDict
+from copy import copy
+
+from django.conf import settings
+from django.contrib import auth
+
+from . import cache
+
+USER_CACHE_SIZE = 10000
+
+
+class UserCache:
+    """Потокобезопасный LRU-кэш пользователей с временем жизни."""
+
+    def __init__(self, max_size=USER_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, entry_version, user = entry
+            if expires < time.monotonic() or entry_version != version:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        # Запрос может менять своего пользователя, общий экземпляр — нет.
+        return copy(user)
+
+    def set(self, key, version, user, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, version, copy(user))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def forget(self, user_id):
+        """Удаляет все записи пользователя."""
+        user_id = str(user_id)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+def get_user(request):
+    """Пользователь сессии из кэша или, при промахе, через django.contrib.auth.
+
+    Проверку хэша пароля при промахе выполняет auth.get_user, поэтому в
+    кэш попадают только пользователи с действительной сессией.
+    """
+    ttl = settings.NOTES_USER_CACHE_TTL
+    session = request.session
+    user_id = session.get(auth.SESSION_KEY)
+    if not ttl or user_id is None:
+        return auth.get_user(request)
+    key = (
+        str(user_id),
+        session.get(auth.BACKEND_SESSION_KEY),
+        session.get(auth.HASH_SESSION_KEY),
+    )
+    version = cache.get_user_version(user_id)
+    user = user_cache.get(key, version)
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            user_cache.set(key, version, user, ttl)
+    return user
@@ -0,0 +1,23 @@
+"""Воспроизводимые замеры производительности.
+
+Сценарии регистрируются декоратором :func:`scenario` и запускаются
+командой ``manage.py bench <сценарий>`` на отдельной тестовой базе.
+"""
+SCENARIOS = {}
+
+
+def scenario(name):
+    """Регистрирует функцию сценария под указанным именем."""
+    def decorator(func):
+        SCENARIOS[name] = func
+        return func
+    return decorator
+
+
+def load_scenarios():
+    """Импортирует модули со сценариями, чтобы они зарегистрировались."""
+    from . import (  # noqa: F401
+        archive, auth, compression, concurrency, metrics, revisions,
+        rendering, sqlite, tags, templates, views
+    )
+    return SCENARIOS
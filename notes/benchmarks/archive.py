@@ -0,0 +1,102 @@
+"""Память и время выгрузки заметок архивом.
+
+Для растущего числа заметок автора архив zip и tar.gz отдаётся
+потоком и для сравнения собирается целиком в памяти из загруженных
+заметок. Сообщаются пик выделенной Python памяти (tracemalloc) и на
+Linux прирост пикового RSS процесса, который перед каждым замером
+сбрасывается через /proc/self/clear_refs.
+"""
+import re
+import time
+import tracemalloc
+import zipfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+
+from notes.archive import export_archive, render_markdown
+from notes.bulk import import_notes
+from notes.models import Note
+
+from . import scenario
+
+GROWTH = (1, 10)
+TEXT_SIZE = 4000
+
+
+def _rss_kb(field):
+    try:
+        with open('/proc/self/status') as status:
+            return int(re.search(rf'{field}:\s+(\d+)', status.read())[1])
+    except (OSError, TypeError):
+        return None
+
+
+def _reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _in_memory_zip(author):
+    """Наивная выгрузка: все заметки и весь архив в памяти."""
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for note in list(Note.objects.filter(author=author)):
+            archive.writestr(f'notes/{note.slug}.md',
+                             render_markdown(note.title, note.text))
+    return [buffer.getvalue()]
+
+
+def _measure(export):
+    """Размер архива, время и пики памяти одной выгрузки."""
+    tracemalloc.start()
+    try:
+        for _ in export():
+            pass
+        _, traced = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    rss_reset = _reset_peak_rss()
+    rss_before = _rss_kb('VmRSS')
+    start = time.perf_counter()
+    size = sum(len(chunk) for chunk in export())
+    elapsed = time.perf_counter() - start
+    peak_rss = _rss_kb('VmHWM') if rss_reset else None
+    return {
+        'archive_kb': round(size / 1024),
+        'seconds': round(elapsed, 3),
+        'peak_traced_kb': round(traced / 1024),
+        'peak_rss_growth_kb': (
+            peak_rss - rss_before if peak_rss and rss_before else None
+        ),
+    }
+
+
+@scenario('archive')
+def archive(notes, **options):
+    """Потоковый архив против сборки в памяти при росте числа заметок."""
+    author = get_user_model().objects.create(username='bench-archive')
+    words = 'Текст заметки для выгрузки архивом номер {idx}. '
+    report = {}
+    for factor in GROWTH:
+        total = notes * factor
+        existing = Note.objects.filter(author=author).count()
+        import_notes(author, (
+            {'title': f'Заметка {idx}', 'slug': '',
+             'text': (words.format(idx=idx) * TEXT_SIZE)[:TEXT_SIZE]}
+            for idx in range(existing, total)
+        ))
+        exports = {
+            'zip stream': lambda: export_archive(author, 'zip'),
+            'tar.gz stream': lambda: export_archive(author, 'tar.gz'),
+            'zip in memory': lambda: _in_memory_zip(author),
+        }
+        for name, export in exports.items():
+            report[f'{total} notes, {name}'] = {
+                'notes': total, **_measure(export)
+            }
+    return report
@@ -0,0 +1,63 @@
+"""Запросы к базе на аутентификацию при повторных обращениях.
+
+Сравниваются сессии в базе со стандартной аутентификацией Django,
+сессии в кэше с базой и сессии в подписанных cookie, оба варианта с
+кэшем пользователей.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from notes.auth import user_cache
+
+from . import scenario
+from .harness import Recorder, seed
+
+CACHED_MIDDLEWARE = 'notes.middleware.CachedAuthenticationMiddleware'
+
+PROFILES = (
+    ('db', 'django.contrib.sessions.backends.db',
+     'django.contrib.auth.middleware.AuthenticationMiddleware'),
+    ('cached_db', 'django.contrib.sessions.backends.cached_db',
+     CACHED_MIDDLEWARE),
+    ('signed_cookies', 'django.contrib.sessions.backends.signed_cookies',
+     CACHED_MIDDLEWARE),
+)
+
+
+def _middleware(authentication):
+    return [
+        authentication if name == CACHED_MIDDLEWARE else name
+        for name in settings.MIDDLEWARE
+    ]
+
+
+@scenario('auth')
+def auth(users, notes, requests, **options):
+    """Список и заметка при разных хранилищах сессий."""
+    author = seed(1, notes)[0]
+    slug = author.note_set.values_list('slug', flat=True).first()
+    urls = (
+        ('notes:list', reverse('notes:list')),
+        ('notes:detail', reverse('notes:detail', args=(slug,))),
+    )
+    recorder = Recorder()
+    for profile, engine, authentication in PROFILES:
+        with override_settings(SESSION_ENGINE=engine,
+                               MIDDLEWARE=_middleware(authentication)):
+            cache.clear()
+            user_cache.clear()
+            client = Client()
+            client.force_login(author)
+            for name, url in urls:
+                client.get(url)
+                for _ in range(requests):
+                    with recorder.measure(f'{name} {profile}'):
+                        response = client.get(url)
+                    if response.status_code != 200:
+                        raise AssertionError(
+                            f'{name} {profile}: получен код '
+                            f'{response.status_code}'
+                        )
+    return recorder.summary()
@@ -0,0 +1,118 @@
+"""Объём хранения и скорость чтения сжатых текстов заметок.
+
+Один и тот же корпус записывается в две файловые базы: без сжатия и
+с порогом сжатия из настроек. Для каждой сообщаются объём текстов и
+файла базы после VACUUM, время чтения страницы списка (без текстов),
+отдельной заметки и полного прохода по всем текстам.
+"""
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+
+from notes.models import Note
+
+from . import scenario
+from .harness import add_database, percentile, remove_database
+
+WORDS = (
+    'заметка', 'текст', 'список', 'дела', 'встреча', 'проект', 'задача',
+    'идея', 'вопрос', 'ответ', 'неделя', 'отчёт', 'код', 'база', 'данных',
+    'страница', 'план', 'сегодня', 'завтра', 'важно', 'проверить',
+)
+TEXT_SIZES = (100, 1000, 5000, 20000)
+
+
+def _text(rng, size):
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _run_profile(alias, corpus, requests):
+    call_command('migrate', database=alias, verbosity=0)
+    author = get_user_model().objects.db_manager(alias).create(
+        username='bench'
+    )
+    Note.objects.using(alias).bulk_create(
+        Note(title=f'Заметка {idx}', text=text, slug=f'zametka-{idx}',
+             author=author)
+        for idx, text in enumerate(corpus)
+    )
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT SUM(LENGTH(text)) FROM notes_note')
+        text_bytes = cursor.fetchone()[0]
+        cursor.execute('VACUUM')
+        cursor.execute('PRAGMA page_count')
+        pages = cursor.fetchone()[0]
+        cursor.execute('PRAGMA page_size')
+        page_size = cursor.fetchone()[0]
+    notes = Note.objects.using(alias)
+    ids = list(notes.values_list('id', flat=True))
+    rng = random.Random(0)
+    list_timings = [
+        _timed(lambda: list(notes.for_list().order_by('-id')[:50]))
+        for _ in range(requests)
+    ]
+    detail_timings = [
+        _timed(lambda: notes.get(pk=rng.choice(ids)).text)
+        for _ in range(requests)
+    ]
+    scan = _timed(lambda: sum(
+        len(text) for text in notes.values_list('text', flat=True).iterator()
+    ))
+    return {
+        'text_kb': round(text_bytes / 1024, 1),
+        'file_kb': round(pages * page_size / 1024, 1),
+        'list_p50_ms': round(percentile(list_timings, 50) * 1000, 3),
+        'detail_p50_ms': round(percentile(detail_timings, 50) * 1000, 3),
+        'scan_ms': round(scan * 1000, 3),
+    }
+
+
+@scenario('compression')
+def compression(users, notes, requests, **options):
+    """Экономия места и цена распаковки на синтетическом корпусе."""
+    rng = random.Random(0)
+    corpus = [_text(rng, rng.choice(TEXT_SIZES))
+              for _ in range(users * notes)]
+    profiles = {
+        'plain': None,
+        'zlib': settings.NOTES_TEXT_COMPRESS_THRESHOLD,
+    }
+    directory = Path(tempfile.mkdtemp())
+    report = {}
+    try:
+        for name, threshold in profiles.items():
+            alias = f'bench_{name}'
+            add_database(alias, directory / f'{name}.sqlite3', {
+                'ENGINE': 'yanote.db.sqlite3'
+            })
+            try:
+                with override_settings(
+                    NOTES_TEXT_COMPRESS_THRESHOLD=threshold
+                ):
+                    report[name] = _run_profile(alias, corpus, requests)
+            finally:
+                remove_database(alias)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return report
@@ -0,0 +1,84 @@
+"""Масштабирование по числу одновременных запросов через ASGI.
+
+Запросы выполняются AsyncClient'ом, то есть тем же ASGI-обработчиком,
+что и под uvicorn, только без сети. Сравниваются синхронные
+представления (каждое занимает поток из пула sync_to_async) и
+асинхронные из notes.async_views. Для замеров на PostgreSQL сценарий
+запускается с настройками, где DATABASES указывает на локальный сервер.
+"""
+import asyncio
+import time
+from itertools import cycle
+
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from notes.models import Note
+
+from . import scenario
+from .harness import percentile, seed
+
+CONCURRENCY_LEVELS = (1, 4, 16, 64)
+URLCONFS = {
+    'sync': 'yanote.urls',
+    'async': 'notes.async_urls',
+}
+
+
+async def _load(urls, cookies, requests, concurrency):
+    clients = []
+    for session_cookies in cookies:
+        client = AsyncClient()
+        client.cookies = session_cookies
+        clients.append(client)
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def fetch(client, url):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(url)
+            timings.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise AssertionError(f'{url}: код {response.status_code}')
+
+    sessions = cycle(zip(clients, urls))
+    tasks = [fetch(*next(sessions)) for _ in range(requests)]
+    start = time.perf_counter()
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start, timings
+
+
+@scenario('concurrency')
+def concurrency(users, notes, requests, **options):
+    """Пропускная способность страниц при разной конкурентности."""
+    authors = seed(users, notes)
+    urls, cookies = [], []
+    for author in authors:
+        client = Client()
+        client.force_login(author)
+        slug = Note.objects.filter(author=author).values_list(
+            'slug', flat=True
+        ).first()
+        for url in (reverse('notes:list'),
+                    reverse('notes:detail', args=(slug,))):
+            urls.append(url)
+            cookies.append(client.cookies)
+    # Соединение главного потока больше не нужно, запросы идут из пула.
+    connection.close()
+    report = {}
+    for mode, urlconf in URLCONFS.items():
+        with override_settings(ROOT_URLCONF=urlconf):
+            for level in CONCURRENCY_LEVELS:
+                total, timings = asyncio.run(
+                    _load(urls, cookies, requests, level)
+                )
+                report[f'{mode} x{level}'] = {
+                    'requests': len(timings),
+                    'p50_ms': round(percentile(timings, 50) * 1000, 3),
+                    'p95_ms': round(percentile(timings, 95) * 1000, 3),
+                    'p99_ms': round(percentile(timings, 99) * 1000, 3),
+                    'throughput_rps': round(len(timings) / total, 1),
+                }
+    return report
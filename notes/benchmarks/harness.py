@@ -0,0 +1,141 @@
+"""Общие инструменты замеров: наполнение базы, тайминги, отчёты."""
+import json
+import math
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+
+from notes.bulk import import_notes
+
+
+def seed(users, notes_per_user, text_size=500):
+    """Создаёт пользователей с заметками и возвращает пользователей."""
+    User = get_user_model()
+    text = ('Текст заметки для замеров. ' * (text_size // 27 + 1))[:text_size]
+    authors = []
+    for user_idx in range(users):
+        author = User.objects.create(username=f'bench-{user_idx}')
+        import_notes(author, (
+            {'title': f'Заметка {idx}', 'text': text, 'slug': ''}
+            for idx in range(notes_per_user)
+        ))
+        authors.append(author)
+    return authors
+
+
+def add_database(alias, path, settings_dict):
+    """Подключает отдельную файловую базу под псевдонимом ``alias``."""
+    connections.databases[alias] = {'NAME': str(path), **settings_dict}
+    connections.ensure_defaults(alias)
+    connections.prepare_test_settings(alias)
+
+
+def remove_database(alias):
+    """Закрывает и забывает базу, подключённую :func:`add_database`."""
+    connections[alias].close()
+    del connections[alias]
+    del connections.databases[alias]
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+class Recorder:
+    """Накапливает время и число запросов к БД для каждой операции."""
+
+    def __init__(self):
+        self.samples = {}
+
+    @contextmanager
+    def measure(self, name):
+        # Счётчик через execute_wrapper: журнал запросов сбрасывается
+        # сигналом request_started и для замеров не годится.
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count):
+            start = time.perf_counter()
+            yield
+            elapsed = time.perf_counter() - start
+        self.samples.setdefault(name, []).append((elapsed, len(queries)))
+
+    def summary(self):
+        """Сводка по операциям: перцентили в мс, запросы, пропускная."""
+        report = {}
+        for name, samples in self.samples.items():
+            timings = [elapsed for elapsed, _ in samples]
+            total = sum(timings)
+            report[name] = {
+                'requests': len(samples),
+                'p50_ms': round(percentile(timings, 50) * 1000, 3),
+                'p95_ms': round(percentile(timings, 95) * 1000, 3),
+                'p99_ms': round(percentile(timings, 99) * 1000, 3),
+                'queries_per_request': round(
+                    sum(count for _, count in samples) / len(samples), 2
+                ),
+                'throughput_rps': round(len(samples) / total, 1)
+                if total else None,
+            }
+        return report
+
+
+def compare(report, baseline, tolerance):
+    """Список регрессий отчёта относительно базовой линии.
+
+    Число запросов детерминировано и сравнивается строго, время
+    сравнивается с допуском ``tolerance`` (доля от базового значения).
+    """
+    regressions = []
+    for name, current in report.items():
+        previous = baseline.get(name)
+        if previous is None or 'p95_ms' not in previous:
+            continue
+        if current['queries_per_request'] > previous['queries_per_request']:
+            regressions.append(
+                f'{name}: запросов {previous["queries_per_request"]} -> '
+                f'{current["queries_per_request"]}'
+            )
+        limit = previous['p95_ms'] * (1 + tolerance)
+        if current['p95_ms'] > limit:
+            regressions.append(
+                f'{name}: p95 {previous["p95_ms"]} мс -> '
+                f'{current["p95_ms"]} мс'
+            )
+    return regressions
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_baseline(path, report):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2, sort_keys=True)
+        file.write('\n')
+
+
+def format_report(report):
+    """Отчёт в виде таблицы для вывода в консоль."""
+    columns = list(dict.fromkeys(
+        column for row in report.values() for column in row
+    ))
+    width = max([len(name) for name in report] + [9])
+    lines = [' '.join(
+        [f'{"operation":<{width}}'] + [f'{column:>20}' for column in columns]
+    )]
+    for name, row in report.items():
+        lines.append(' '.join(
+            [f'{name:<{width}}']
+            + [f'{str(row.get(column, "")):>20}' for column in columns]
+        ))
+    return '\n'.join(lines)
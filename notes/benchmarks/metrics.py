@@ -0,0 +1,42 @@
+"""Накладные расходы промежуточного слоя сбора показателей."""
+from itertools import cycle
+
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from notes.metrics import registry
+from notes.models import Note
+
+from . import scenario
+from .harness import Recorder, seed
+
+
+def _drive(recorder, label, authors, requests):
+    # Новый клиент собирает цепочку промежуточных слоёв заново.
+    sessions = []
+    for author in authors:
+        client = Client()
+        client.force_login(author)
+        slug = Note.objects.filter(author=author).values_list(
+            'slug', flat=True
+        ).first()
+        sessions.append((client, reverse('notes:detail', args=(slug,))))
+    list_url = reverse('notes:list')
+    for _, (client, detail_url) in zip(range(requests), cycle(sessions)):
+        with recorder.measure(f'{label} notes:list'):
+            client.get(list_url)
+        with recorder.measure(f'{label} notes:detail'):
+            client.get(detail_url)
+
+
+@scenario('metrics')
+def metrics(users, notes, requests, **options):
+    """Время страниц с выключенным и включённым сбором показателей."""
+    authors = seed(users, notes)
+    recorder = Recorder()
+    with override_settings(NOTES_METRICS_ENABLED=False):
+        _drive(recorder, 'off', authors, requests)
+    with override_settings(NOTES_METRICS_ENABLED=True):
+        _drive(recorder, 'on', authors, requests)
+    registry.reset()
+    return recorder.summary()
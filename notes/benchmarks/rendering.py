@@ -0,0 +1,70 @@
+"""Цена отрисовки Markdown при показе заметки и при заполнении HTML.
+
+Сравнивается отрисовка текста заметки при каждом показе с чтением
+HTML, сохранённого вместе с текстом, и заполнение HTML всех заметок
+командой render_notes в одном процессе и в нескольких.
+"""
+import os
+
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+
+from notes.markup import render_html
+from notes.models import Note
+from notes.rendering import render_notes
+
+from . import scenario
+from .harness import Recorder, seed
+
+SAMPLE = '''## Раздел {idx}
+
+Текст с **выделением**, *курсивом*, `кодом` и [ссылкой](https://example.com).
+
+- первый пункт
+- второй пункт с [ссылкой](https://example.com/{idx})
+- третий пункт
+
+| Столбец | Значение |
+|---------|----------|
+| a       | {idx}    |
+
+```
+print({idx})
+```
+'''
+
+
+def _text(sections):
+    return '\n'.join(SAMPLE.format(idx=idx) for idx in range(sections))
+
+
+@scenario('rendering')
+def rendering(users, notes, requests, **options):
+    """Показ заметки с отрисовкой и без, заполнение HTML."""
+    author = seed(1, 0)[0]
+    text = _text(8)
+    for idx in range(notes):
+        Note.objects.create(
+            title=f'Заметка {idx}', text=text, slug=f'markdown-{idx}',
+            author=author
+        )
+    client = Client()
+    client.force_login(author)
+    url = reverse('notes:detail', args=('markdown-0',))
+    recorder = Recorder()
+    for _ in range(requests):
+        cache.clear()
+        with recorder.measure('detail stored html'):
+            client.get(url)
+        with recorder.measure('render on read'):
+            render_html(Note.objects.get(slug='markdown-0').text)
+    for workers in (1, max(2, os.cpu_count() or 1)):
+        Note.objects.update(text_hash='')
+        with recorder.measure(f'render_notes workers={workers}'):
+            stats = render_notes(workers=workers)
+        if stats.rendered != notes:
+            raise AssertionError(
+                f'Отрисовано {stats.rendered} заметок из {notes}'
+            )
+    return recorder.summary()
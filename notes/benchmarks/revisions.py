@@ -0,0 +1,69 @@
+"""Объём истории правок и время восстановления версий.
+
+Заметка из многих строк правится по одной случайной строке за раз.
+Для нескольких значений периода снимков сообщаются средний объём
+хранения на правку рядом с объёмом полной сжатой копии, время
+сохранения правки и время восстановления произвольной версии.
+"""
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.db.models import Avg
+from django.db.models.functions import Length
+from django.test import override_settings
+
+from notes.fields import compress_text
+from notes.models import Note, NoteRevision
+from notes.revisions import get_revision
+
+from . import scenario
+from .harness import percentile
+
+SNAPSHOT_PERIODS = (1, 5, 10, 25)
+LINES = 200
+
+
+def _ms(timings, percent):
+    return round(percentile(timings, percent) * 1000, 3)
+
+
+@scenario('revisions')
+def revisions(requests, **options):
+    """Разницы против полных копий при разных периодах снимков."""
+    author = get_user_model().objects.create(username='bench-revisions')
+    report = {}
+    for period in SNAPSHOT_PERIODS:
+        rng = random.Random(period)
+        lines = [f'Строка {idx}: ' + 'текст заметки ' * rng.randint(1, 8)
+                 for idx in range(LINES)]
+        note = Note.objects.create(
+            title='Заметка', text='\n'.join(lines), author=author
+        )
+        save_timings, copy_sizes = [], []
+        with override_settings(NOTES_REVISION_SNAPSHOT_EVERY=period):
+            for edit in range(requests):
+                copy_sizes.append(len(compress_text(note.text)))
+                lines[rng.randrange(LINES)] = f'Правка {edit}'
+                note.text = '\n'.join(lines)
+                start = time.perf_counter()
+                note.save()
+                save_timings.append(time.perf_counter() - start)
+        stored = NoteRevision.objects.filter(note=note).aggregate(
+            size=Avg(Length('data'))
+        )['size']
+        rebuild_timings = []
+        for _ in range(requests):
+            number = rng.randint(1, requests)
+            start = time.perf_counter()
+            get_revision(note, number)
+            rebuild_timings.append(time.perf_counter() - start)
+        report[f'snapshot every {period}'] = {
+            'edits': requests,
+            'bytes_per_edit': round(stored),
+            'full_copy_bytes': round(sum(copy_sizes) / len(copy_sizes)),
+            'save_p50_ms': _ms(save_timings, 50),
+            'rebuild_p50_ms': _ms(rebuild_timings, 50),
+            'rebuild_p95_ms': _ms(rebuild_timings, 95),
+        }
+    return report
@@ -0,0 +1,107 @@
+"""Смешанная нагрузка чтения и записи на файловую базу SQLite.
+
+Сравниваются стандартный бэкенд без постоянных соединений и
+настроенный ``yanote.db.sqlite3`` (WAL, PRAGMA, BEGIN IMMEDIATE,
+CONN_MAX_AGE). Каждый поток имитирует запросы: читает страницу списка
+или в транзакции читает и добавляет заметку, после чего, как по
+окончании запроса, закрывает устаревшие соединения.
+"""
+import random
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import (
+    OperationalError, close_old_connections, connections, transaction
+)
+
+from notes.models import Note
+
+from . import scenario
+from .harness import add_database, percentile, remove_database
+
+PROFILES = {
+    'default': {'ENGINE': 'django.db.backends.sqlite3', 'CONN_MAX_AGE': 0},
+    'tuned': {'ENGINE': 'yanote.db.sqlite3', 'CONN_MAX_AGE': None},
+}
+THREADS = 8
+WRITE_RATIO = 0.2
+
+
+def _worker(alias, author_id, operations, seed, timings, errors):
+    rng = random.Random(seed)
+    notes = Note.objects.using(alias).filter(author_id=author_id)
+    for _ in range(operations):
+        start = time.perf_counter()
+        try:
+            if rng.random() < WRITE_RATIO:
+                with transaction.atomic(using=alias):
+                    notes.count()
+                    Note.objects.using(alias).bulk_create([Note(
+                        title='Заметка', text='Текст заметки',
+                        slug=uuid.uuid4().hex, author_id=author_id,
+                    )])
+            else:
+                list(notes.for_list().order_by('-id')[:50])
+            timings.append(time.perf_counter() - start)
+        except OperationalError:
+            errors.append(1)
+        close_old_connections()
+    connections[alias].close()
+
+
+def _run_profile(alias, notes, requests):
+    call_command('migrate', database=alias, verbosity=0)
+    author = get_user_model().objects.db_manager(alias).create(
+        username='bench'
+    )
+    Note.objects.using(alias).bulk_create(
+        Note(title=f'Заметка {idx}', text='Текст заметки',
+             slug=f'zametka-{idx}', author=author)
+        for idx in range(notes)
+    )
+    connections[alias].close()
+    timings, errors = [], []
+    threads = [
+        threading.Thread(target=_worker, args=(
+            alias, author.pk, requests, seed, timings, errors
+        ))
+        for seed in range(THREADS)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = time.perf_counter() - start
+    return {
+        'operations': len(timings),
+        'errors': len(errors),
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 99) * 1000, 3),
+        'throughput_ops': round(len(timings) / total, 1),
+    }
+
+
+@scenario('sqlite')
+def sqlite(notes, requests, **options):
+    """Пропускная способность SQLite при одновременных чтении и записи."""
+    directory = Path(tempfile.mkdtemp())
+    report = {}
+    try:
+        for name, profile in PROFILES.items():
+            alias = f'bench_{name}'
+            add_database(alias, directory / f'{name}.sqlite3', profile)
+            try:
+                report[name] = _run_profile(alias, notes, requests)
+            finally:
+                remove_database(alias)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return report
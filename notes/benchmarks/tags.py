@@ -0,0 +1,72 @@
+"""Время отбора заметок по меткам при росте числа заметок.
+
+Автору добавляются заметки с тремя случайными метками из небольшого
+словаря, и для каждого размера замеряется первая страница списка с
+условием «все метки» и «любая метка». Время должно оставаться почти
+постоянным: подзапрос читает только индекс связей.
+"""
+import random
+
+from django.contrib.auth import get_user_model
+
+from notes.bulk import import_notes
+from notes.models import Note, NoteTag, Tag
+from notes.tags import filter_by_tags, reconcile_tag_counts
+
+from . import scenario
+from .harness import Recorder
+
+TAGS = 20
+TAGS_PER_NOTE = 3
+# Доля заметок с первой, редкой меткой.
+RARE_SHARE = 0.01
+GROWTH = (1, 10)
+PAGE_SIZE = 50
+
+
+def _grow(author, tags, total, rng):
+    """Дополняет заметки автора с метками до ``total``."""
+    existing = Note.objects.filter(author=author).count()
+    import_notes(author, (
+        {'title': f'Заметка {idx}', 'text': 'Текст', 'slug': ''}
+        for idx in range(existing, total)
+    ))
+    new_notes = Note.objects.filter(author=author).exclude(
+        pk__in=NoteTag.objects.filter(author=author).values('note_id')
+    ).values_list('pk', flat=True)
+    NoteTag.objects.bulk_create([
+        NoteTag(author=author, tag=tag, note_id=note_id)
+        for note_id in new_notes
+        for tag in rng.sample(tags[1:], TAGS_PER_NOTE) + (
+            [tags[0]] if rng.random() < RARE_SHARE else []
+        )
+    ], batch_size=2000)
+    reconcile_tag_counts()
+
+
+@scenario('tags')
+def tags(users, notes, requests, **options):
+    """Первая страница списка по меткам для растущего числа заметок."""
+    rng = random.Random(0)
+    author = get_user_model().objects.create(username='bench-tags')
+    Tag.objects.bulk_create(
+        [Tag(author=author, name=f'метка-{idx}') for idx in range(TAGS)]
+    )
+    tags = list(Tag.objects.filter(author=author).order_by('pk'))
+    queries = {
+        'common': [tag.name for tag in tags[1:3]],
+        'rare': [tag.name for tag in tags[:2]],
+    }
+    recorder = Recorder()
+    for factor in GROWTH:
+        total = notes * factor
+        _grow(author, tags, total, rng)
+        queryset = Note.objects.filter(author=author).for_list()
+        for kind, names in queries.items():
+            for label, match_all in (('all', True), ('any', False)):
+                for _ in range(requests):
+                    with recorder.measure(f'{total} notes, {kind} {label}'):
+                        list(filter_by_tags(
+                            queryset, author, names, match_all
+                        ).order_by('id')[:PAGE_SIZE])
+    return recorder.summary()
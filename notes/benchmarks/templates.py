@@ -0,0 +1,60 @@
+"""Время страницы списка при промахе кэша страниц.
+
+Сравниваются загрузчик шаблонов без кэша с пустым кэшем фрагментов,
+кэширующий загрузчик с пустым кэшем фрагментов и он же с прогретыми
+фрагментами шапки и строк, когда устарел только кэш страницы.
+"""
+from copy import deepcopy
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from notes.cache import bump_version
+
+from . import scenario
+from .harness import Recorder, seed
+
+
+def _uncached_templates():
+    templates = deepcopy(settings.TEMPLATES)
+    for backend in templates:
+        backend['OPTIONS']['loaders'] = [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]
+    return templates
+
+
+def _drive(recorder, label, client, author, requests, reset):
+    list_url = reverse('notes:list')
+    for _ in range(requests):
+        reset(author)
+        with recorder.measure(label):
+            response = client.get(list_url)
+        if response.status_code != 200:
+            raise AssertionError(
+                f'{label}: получен код {response.status_code}'
+            )
+
+
+@scenario('templates')
+def templates(users, notes, requests, **options):
+    """Рендеринг списка заметок с кэшами шаблонов и без них."""
+    author = seed(1, notes)[0]
+    client = Client()
+    client.force_login(author)
+    recorder = Recorder()
+
+    def clear(author):
+        cache.clear()
+
+    with override_settings(TEMPLATES=_uncached_templates()):
+        _drive(recorder, 'notes:list uncached loader', client, author,
+               requests, clear)
+    _drive(recorder, 'notes:list cold fragments', client, author,
+           requests, clear)
+    _drive(recorder, 'notes:list warm fragments', client, author,
+           requests, bump_version)
+    return recorder.summary()
@@ -0,0 +1,69 @@
+"""Замеры основных страниц с заметками через тестовый клиент Django."""
+from itertools import cycle
+
+from django.core.cache import cache
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from notes.models import Note
+
+from . import scenario
+from .harness import Recorder, seed
+
+
+def _check(response, expected, name):
+    if response.status_code != expected:
+        raise AssertionError(
+            f'{name}: ожидался код {expected}, получен {response.status_code}'
+        )
+
+
+@scenario('views')
+def views(users, notes, requests, cold_cache=False, **options):
+    """Список, просмотр, создание, изменение и удаление заметок."""
+    # Ограничение частоты включено, чтобы замер учитывал его цену, но
+    # лимит не достигается.
+    with override_settings(NOTES_RATE_LIMITS={'notes-write': '1000000/m'}):
+        return _views(users, notes, requests, cold_cache)
+
+
+def _views(users, notes, requests, cold_cache):
+    authors = seed(users, notes)
+    sessions = []
+    for author in authors:
+        client = Client()
+        client.force_login(author)
+        slugs = list(Note.objects.filter(author=author).values_list(
+            'slug', flat=True
+        )[:requests])
+        sessions.append((client, cycle(slugs)))
+    recorder = Recorder()
+    list_url = reverse('notes:list')
+    for idx, (client, slugs) in zip(range(requests), cycle(sessions)):
+        if cold_cache:
+            cache.clear()
+        with recorder.measure('notes:list'):
+            _check(client.get(list_url), 200, 'notes:list')
+        with recorder.measure('notes:detail'):
+            response = client.get(reverse('notes:detail', args=(next(slugs),)))
+            _check(response, 200, 'notes:detail')
+        with recorder.measure('notes:add'):
+            response = client.post(reverse('notes:add'), {
+                'title': f'Новая заметка {idx}', 'text': 'Текст заметки',
+                'slug': f'bench-new-{idx}',
+            })
+            _check(response, 302, 'notes:add')
+        with recorder.measure('notes:edit'):
+            response = client.post(
+                reverse('notes:edit', args=(f'bench-new-{idx}',)), {
+                    'title': f'Изменённая заметка {idx}',
+                    'text': 'Новый текст', 'slug': f'bench-new-{idx}',
+                }
+            )
+            _check(response, 302, 'notes:edit')
+        with recorder.measure('notes:delete'):
+            response = client.post(
+                reverse('notes:delete', args=(f'bench-new-{idx}',))
+            )
+            _check(response, 302, 'notes:delete')
+    return recorder.summary()
@@ -0,0 +1,137 @@
+"""Массовый импорт и экспорт заметок в формате JSON Lines."""
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+
+from .cache import bump_version
+from .models import Note
+from .stats import adjust_stats, text_size
+from .tasks import enqueue
+from .slugs import allocate_slugs, slug_base
+
+EXPORT_FIELDS = ('title', 'text', 'slug', 'created', 'updated')
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_BATCH_SIZE = 500
+
+
+class NoteImportError(ValueError):
+    """Ошибка в импортируемых данных."""
+
+    def __init__(self, message, line=None):
+        if line is not None:
+            message = f'Строка {line}: {message}'
+        super().__init__(message)
+        self.created = 0
+
+
+def export_notes(author):
+    """Построчно отдаёт заметки автора, не загружая их все в память."""
+    rows = Note.objects.filter(author=author).order_by('id').values(
+        *EXPORT_FIELDS
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    for row in rows:
+        yield json.dumps(
+            row, cls=DjangoJSONEncoder, ensure_ascii=False
+        ).encode() + b'\n'
+
+
+def _decode(line, number):
+    if not isinstance(line, bytes):
+        return line
+    try:
+        return line.decode()
+    except UnicodeDecodeError:
+        raise NoteImportError('строка не в кодировке UTF-8', number)
+
+
+def parse_lines(lines):
+    """Разбирает строки JSON Lines в данные заметок."""
+    max_title_length = Note._meta.get_field('title').max_length
+    for number, line in enumerate(lines, start=1):
+        line = _decode(line, number)
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise NoteImportError('некорректный JSON', number)
+        if not isinstance(record, dict):
+            raise NoteImportError('ожидается объект', number)
+        text = record.get('text')
+        title = record.get('title') or Note._meta.get_field('title').default
+        slug = record.get('slug') or ''
+        if not isinstance(text, str) or not text:
+            raise NoteImportError('не указан текст заметки', number)
+        if not isinstance(title, str) or len(title) > max_title_length:
+            raise NoteImportError('некорректный заголовок', number)
+        if not isinstance(slug, str):
+            raise NoteImportError('некорректный slug', number)
+        yield {'title': title, 'text': text, 'slug': slug}
+
+
+def _fill_ids(notes):
+    """Проставляет id заметкам, созданным через bulk_create.
+
+    SQLite в Django 3.2 не возвращает первичные ключи вставленных строк,
+    поэтому они выбираются одним запросом по уникальным slug.
+    """
+    ids = dict(Note.objects.filter(
+        slug__in=[note.slug for note in notes]
+    ).values_list('slug', 'id'))
+    for note in notes:
+        note.pk = ids[note.slug]
+
+
+def _create_batch(author, records):
+    max_slug_length = Note._meta.get_field('slug').max_length
+    bases = [
+        slug_base(record['slug'] or record['title'], max_slug_length)
+        for record in records
+    ]
+    for attempt in range(Note.SLUG_ATTEMPTS):
+        # Все slug пачки подбираются одним запросом.
+        slugs = allocate_slugs(Note.objects.all(), bases, max_slug_length)
+        notes = [
+            Note(title=record['title'], text=record['text'], slug=slug,
+                 author=author)
+            for record, slug in zip(records, slugs)
+        ]
+        for note in notes:
+            # bulk_create не вызывает Note.save.
+            note.render_text()
+        try:
+            with transaction.atomic():
+                Note.objects.bulk_create(notes)
+                _fill_ids(notes)
+                enqueue('search.sync', [note.pk for note in notes])
+                adjust_stats(
+                    author.pk, len(notes),
+                    sum(text_size(note.text) for note in notes),
+                    max(note.updated for note in notes)
+                )
+            return notes
+        except IntegrityError:
+            if attempt == Note.SLUG_ATTEMPTS - 1:
+                raise
+
+
+def import_notes(author, records, batch_size=IMPORT_BATCH_SIZE):
+    """Создаёт заметки автора пачками и возвращает их количество."""
+    records = iter(records)
+    created = 0
+    try:
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            created += len(_create_batch(author, batch))
+    except NoteImportError as error:
+        error.created = created
+        raise
+    finally:
+        if created:
+            # bulk_create не отправляет сигналы сохранения.
+            bump_version(author.pk)
+    return created
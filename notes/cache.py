@@ -0,0 +1,89 @@
+"""Версионированный кэш страниц с заметками.
+
+У каждого автора есть счётчик версии. Ключи страниц включают текущую
+версию, поэтому любое изменение заметок автора сводится к одному
+увеличению счётчика: старые страницы просто перестают запрашиваться
+и вытесняются из кэша по таймауту.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .routers import replica_read
+
+
+def get_cache():
+    """Кэш, в котором хранятся страницы и версии."""
+    return caches[settings.NOTES_CACHE_ALIAS]
+
+
+def _version_key(author_id):
+    return f'notes:version:{author_id}'
+
+
+def _user_version_key(user_id):
+    return f'notes:user-version:{user_id}'
+
+
+def _initial_version():
+    # Версия, потерянная при вытеснении, не должна совпасть со старой,
+    # иначе снова станут доступны устаревшие страницы.
+    return time.time_ns()
+
+
+def _get_version(key):
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), timeout=None)
+
+
+def get_version(author_id):
+    """Текущая версия заметок автора."""
+    return _get_version(_version_key(author_id))
+
+
+def bump_version(author_id):
+    """Делает недействительными все закэшированные страницы автора."""
+    _bump_version(_version_key(author_id))
+
+
+def get_user_version(user_id):
+    """Текущая версия самого пользователя, без учёта его заметок."""
+    return _get_version(_user_version_key(user_id))
+
+
+def bump_user_version(user_id):
+    """Делает недействительными закэшированные копии пользователя."""
+    _bump_version(_user_version_key(user_id))
+
+
+def page_key(prefix, author_id, *parts):
+    """Ключ страницы с учётом текущей версии заметок автора."""
+    digest = hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+    return f'notes:{prefix}:{author_id}:{get_version(author_id)}:{digest}'
+
+
+def get_page(key):
+    return get_cache().get(key)
+
+
+def set_page(key, content):
+    """Кэширует страницу, если она не прочитана с отстающей реплики."""
+    if replica_read.get():
+        return
+    get_cache().set(key, content, timeout=settings.NOTES_CACHE_TIMEOUT)
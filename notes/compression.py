@@ -0,0 +1,61 @@
+"""Пересжатие текстов заметок, сохранённых в прежнем формате."""
+from collections import namedtuple
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .fields import compress_text, decompress_text
+from .models import Note
+
+COMPRESS_BATCH_SIZE = 500
+
+RecompressStats = namedtuple(
+    'RecompressStats', 'scanned rewritten bytes_before bytes_after'
+)
+
+
+def _stored_size(value):
+    return len(value.encode() if isinstance(value, str) else value)
+
+
+def recompress_notes(batch_size=COMPRESS_BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+    """Переписывает тексты, хранимые не в текущем формате, пачками.
+
+    Хранимые значения читаются в обход поля, чтобы сравнить их с тем,
+    что записало бы поле сейчас: несжатые строки после миграции и
+    записи, сделанные с другим порогом, переписываются одним
+    UPDATE на пачку. Дата изменения и кэш страниц не затрагиваются —
+    текст заметок остаётся прежним.
+    """
+    connection = connections[using]
+    table = connection.ops.quote_name(Note._meta.db_table)
+    column = connection.ops.quote_name(Note._meta.get_field('text').column)
+    scanned = rewritten = bytes_before = bytes_after = 0
+    last_id = 0
+    while True:
+        # Чтение и запись в одной транзакции, чтобы не затереть
+        # правку, сделанную между ними.
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT id, {column} FROM {table} WHERE id > %s '
+                    f'ORDER BY id LIMIT %s',
+                    [last_id, batch_size]
+                )
+                rows = cursor.fetchall()
+            if not rows:
+                return RecompressStats(
+                    scanned, rewritten, bytes_before, bytes_after
+                )
+            changed = []
+            for note_id, stored in rows:
+                text = decompress_text(stored)
+                packed = compress_text(text)
+                bytes_before += _stored_size(stored)
+                bytes_after += len(packed)
+                if isinstance(stored, str) or bytes(stored) != packed:
+                    changed.append(Note(id=note_id, text=text))
+            if changed:
+                Note.objects.using(using).bulk_update(changed, ['text'])
+        scanned += len(rows)
+        rewritten += len(changed)
+        last_id = rows[-1][0]
@@ -0,0 +1,6 @@
+from django.conf import settings
+
+
+def fragments(request):
+    """Срок жизни кэшируемых фрагментов шаблонов."""
+    return {'fragment_timeout': settings.NOTES_FRAGMENT_TIMEOUT}
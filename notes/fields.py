@@ -0,0 +1,80 @@
+"""Поля моделей заметок."""
+import zlib
+
+from django.conf import settings
+from django.db import models
+
+# Первый байт хранимого значения указывает, как записан остаток.
+RAW = b'\x00'
+ZLIB = b'\x01'
+
+
+def compress_text(text, threshold=None, level=None):
+    """Байты для хранения: текст с маркером, сжатый, если это выгодно.
+
+    Тексты короче ``threshold`` байт и тексты, которые zlib не
+    уменьшает, хранятся как есть. ``threshold=None`` берётся из
+    NOTES_TEXT_COMPRESS_THRESHOLD, где None отключает сжатие.
+    """
+    if threshold is None:
+        threshold = settings.NOTES_TEXT_COMPRESS_THRESHOLD
+    if level is None:
+        level = settings.NOTES_TEXT_COMPRESS_LEVEL
+    data = text.encode()
+    if threshold is not None and len(data) >= threshold:
+        packed = zlib.compress(data, level)
+        if len(packed) < len(data):
+            return ZLIB + packed
+    return RAW + data
+
+
+def decompress_text(value):
+    """Текст из хранимого значения.
+
+    Строки и байты без маркера читаются как текст в UTF-8: так
+    хранятся записи, сохранённые до перехода на сжатое хранение, —
+    SQLite оставляет их строками, а другие базы при смене типа столбца
+    переводят в байты.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    data = bytes(value)
+    marker, payload = data[:1], data[1:]
+    if marker == ZLIB:
+        try:
+            return zlib.decompress(payload).decode()
+        except zlib.error:
+            # Прежний текст, который сам начинается с символа U+0001.
+            return data.decode()
+    if marker == RAW:
+        # Прежний текст с нулевым первым символом неотличим от
+        # маркера. PostgreSQL не хранит нулевые символы в тексте, а
+        # SQLite возвращает прежние записи строками.
+        return payload.decode()
+    return data.decode()
+
+
+class CompressedTextField(models.TextField):
+    """Текстовое поле, которое хранится в базе сжатым zlib.
+
+    В столбце BLOB лежит маркер и текст в UTF-8, сжатый, если он
+    длиннее порога. Для модели и форм поле остаётся обычным текстом;
+    поиск по подстроке в базе для него не работает.
+    """
+
+    def get_internal_type(self):
+        return 'BinaryField'
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is None:
+            return None
+        return connection.Database.Binary(compress_text(value))
+
+    def from_db_value(self, value, expression, connection):
+        return decompress_text(value)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return decompress_text(value)
+        return super().to_python(value)
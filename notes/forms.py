@@ -1,29 +1,66 @@
-from pytils.translit import slugify
-
 from django import forms
 from django.core.exceptions import ValidationError
 
 from .models import Note
+from .tags import TagError, parse_tags, set_tags, tag_names
 
 WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
 
 
 class NoteForm(forms.ModelForm):
     """Форма для создания или обновления заметки."""
+    tags = forms.CharField(
+        label='Метки',
+        required=False,
+        help_text='Перечислите метки через запятую',
+    )
 
     class Meta:
         model = Note
         fields = ('title', 'text', 'slug')
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk and not self.is_bound:
+            self.initial['tags'] = ', '.join(tag_names(self.instance))
+
+    def clean_tags(self):
+        try:
+            return parse_tags(self.cleaned_data.get('tags', ''))
+        except TagError as error:
+            raise ValidationError(str(error))
+
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
+        """Обрабатывает случай, если slug не уникален.
+
+        Пустой slug не проверяется: свободный slug подбирается
+        при сохранении заметки.
+        """
+        slug = self.cleaned_data.get('slug')
+        if slug and Note.objects.filter(
                 slug=slug
         ).exclude(id=self.instance.pk).exists():
             raise ValidationError(slug + WARNING)
         return slug
+
+    def validate_unique(self):
+        """Уникальность slug уже проверена в clean_slug."""
+        exclude = self._get_validation_exclusions()
+        exclude.append('slug')
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as error:
+            self._update_errors(error)
+
+    def save(self, commit=True):
+        self._created = self.instance._state.adding
+        return super().save(commit)
+
+    def _save_m2m(self):
+        """Метки назначаются после сохранения заметки.
+
+        С ``commit=False`` это делает вызов ``save_m2m()``.
+        """
+        super()._save_m2m()
+        set_tags(self.instance, self.cleaned_data['tags'],
+                 created=self._created)
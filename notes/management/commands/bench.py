@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases
+
+from notes.benchmarks import load_scenarios
+from notes.benchmarks.harness import (
+    compare, format_report, load_baseline, save_baseline
+)
+
+# Время замеров зависит от машины, поэтому базовые линии не хранятся в
+# репозитории: каждая машина сохраняет свои через --save-baseline.
+BASELINE_DIR = Path(__file__).resolve().parents[2] / 'benchmarks' / 'baselines'
+
+
+class Command(BaseCommand):
+    help = ('Запускает сценарий замеров на отдельной тестовой базе и '
+            'сравнивает результат с базовой линией.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', choices=sorted(load_scenarios()))
+        parser.add_argument('--users', type=int, default=5)
+        parser.add_argument('--notes', type=int, default=1000,
+                            help='Заметок у каждого пользователя')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--cold-cache', action='store_true',
+                            help='Очищать кэш перед каждым запросом')
+        parser.add_argument('--baseline', type=Path,
+                            help='Файл базовой линии в формате JSON')
+        parser.add_argument('--save-baseline', action='store_true',
+                            dest='save',
+                            help='Сохранить результат как базовую линию')
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='Допустимый рост времени (доля)')
+        parser.add_argument('--json', action='store_true',
+                            help='Вывести отчёт в формате JSON')
+
+    def handle(self, scenario, baseline, save, tolerance, **options):
+        run = load_scenarios()[scenario]
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            report = run(**options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+        if options['json']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False,
+                                         indent=2))
+        else:
+            self.stdout.write(format_report(report))
+        baseline = baseline or BASELINE_DIR / f'{scenario}.json'
+        if save:
+            baseline.parent.mkdir(parents=True, exist_ok=True)
+            save_baseline(baseline, report)
+            self.stdout.write(f'Базовая линия сохранена в {baseline}')
+            return
+        if not baseline.exists():
+            return
+        regressions = compare(report, load_baseline(baseline), tolerance)
+        if regressions:
+            raise CommandError(
+                'Регрессии относительно базовой линии:\n'
+                + '\n'.join(regressions)
+            )
+        self.stdout.write('Регрессий относительно базовой линии нет')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from notes.compression import COMPRESS_BATCH_SIZE, recompress_notes
+
+
+class Command(BaseCommand):
+    help = ('Пересжимает тексты заметок в соответствии с текущими '
+            'настройками хранения.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=COMPRESS_BATCH_SIZE
+        )
+
+    def handle(self, batch_size, **options):
+        stats = recompress_notes(batch_size=batch_size)
+        self.stdout.write(
+            f'Просмотрено заметок: {stats.scanned}, '
+            f'переписано: {stats.rewritten}, '
+            f'объём текстов: {stats.bytes_before} -> {stats.bytes_after} '
+            f'байт'
+        )
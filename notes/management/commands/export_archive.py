@@ -0,0 +1,36 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.archive import ARCHIVE_FORMATS, export_archive
+
+
+class Command(BaseCommand):
+    help = 'Выгружает заметки пользователя архивом файлов Markdown.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '-o', '--output', default='-',
+            help='Файл архива или "-" для stdout'
+        )
+        parser.add_argument(
+            '--format', choices=ARCHIVE_FORMATS, default='zip',
+            dest='archive_format'
+        )
+
+    def handle(self, username, output, archive_format, **options):
+        try:
+            author = get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Пользователь {username} не найден')
+        if output == '-':
+            # Архив двоичный, поэтому пишется мимо текстового self.stdout.
+            for chunk in export_archive(author, archive_format):
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        with open(output, 'wb') as target:
+            for chunk in export_archive(author, archive_format):
+                target.write(chunk)
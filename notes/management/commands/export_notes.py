@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.bulk import export_notes
+
+
+class Command(BaseCommand):
+    help = 'Выгружает заметки пользователя в формате JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '-o', '--output', default='-',
+            help='Файл для выгрузки или "-" для stdout'
+        )
+
+    def handle(self, username, output, **options):
+        try:
+            author = get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Пользователь {username} не найден')
+        if output == '-':
+            for line in export_notes(author):
+                self.stdout.write(line.decode(), ending='')
+            return
+        with open(output, 'wb') as target:
+            for line in export_notes(author):
+                target.write(line)
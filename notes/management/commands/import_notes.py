@@ -0,0 +1,38 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.bulk import (
+    IMPORT_BATCH_SIZE, NoteImportError, import_notes, parse_lines
+)
+
+
+class Command(BaseCommand):
+    help = 'Импортирует заметки пользователя из файла JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path', help='Файл JSON Lines или "-" для stdin')
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE
+        )
+
+    def handle(self, username, path, batch_size, **options):
+        try:
+            author = get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Пользователь {username} не найден')
+        source = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        try:
+            created = import_notes(
+                author, parse_lines(source), batch_size=batch_size
+            )
+        except NoteImportError as error:
+            raise CommandError(
+                f'{error} (импортировано заметок: {error.created})'
+            )
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        self.stdout.write(f'Импортировано заметок: {created}')
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.metrics import load_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Выводит сводку показателей запросов по маршрутам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir', default=settings.NOTES_METRICS_DIR,
+            help='Каталог с показателями (по умолчанию NOTES_METRICS_DIR)'
+        )
+
+    def handle(self, dir, **options):
+        if not dir:
+            raise CommandError('Не задан каталог с показателями')
+        snapshot = load_snapshots(dir)
+        if not snapshot:
+            self.stdout.write('Показатели ещё не собраны')
+            return
+        header = (f'{"view":<24}{"requests":>10}{"wall ms":>10}'
+                  f'{"db ms":>10}{"queries":>10}{"dups":>8}{"render ms":>11}')
+        self.stdout.write(header)
+        rows = sorted(snapshot.items(),
+                      key=lambda item: item[1]['wall_seconds'], reverse=True)
+        for view, stats in rows:
+            count = stats['requests']
+            self.stdout.write(
+                f'{view:<24}{count:>10}'
+                f'{stats["wall_seconds"] / count * 1000:>10.2f}'
+                f'{stats["db_seconds"] / count * 1000:>10.2f}'
+                f'{stats["queries"] / count:>10.2f}'
+                f'{stats["duplicate_queries"] / count:>8.2f}'
+                f'{stats["render_seconds"] / count * 1000:>11.2f}'
+            )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.search import INDEX_CHUNK_SIZE, is_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает полнотекстовый индекс заметок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=INDEX_CHUNK_SIZE
+        )
+
+    def handle(self, chunk_size, **options):
+        if not is_available():
+            raise CommandError('Полнотекстовый индекс доступен только '
+                               'для SQLite')
+        indexed = rebuild_index(chunk_size=chunk_size)
+        self.stdout.write(f'Проиндексировано заметок: {indexed}')
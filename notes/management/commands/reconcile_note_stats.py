@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from notes.stats import RECONCILE_CHUNK_SIZE, reconcile_stats
+from notes.tags import reconcile_tag_counts
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает сводки по заметкам всех пользователей и '
+            'счётчики заметок у меток.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=RECONCILE_CHUNK_SIZE
+        )
+
+    def handle(self, chunk_size, **options):
+        users = reconcile_stats(chunk_size=chunk_size)
+        self.stdout.write(f'Пересчитаны сводки пользователей: {users}')
+        tags = reconcile_tag_counts()
+        self.stdout.write(f'Пересчитаны счётчики меток: {tags}')
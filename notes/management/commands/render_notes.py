@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from notes.rendering import RENDER_BATCH_SIZE, render_notes
+
+
+class Command(BaseCommand):
+    help = ('Отрисовывает HTML заметок, сохранённых без него или прежней '
+            'версией отрисовки, в нескольких процессах.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=RENDER_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Число процессов, по умолчанию по числу ядер.'
+        )
+
+    def handle(self, batch_size, workers, **options):
+        stats = render_notes(batch_size=batch_size, workers=workers)
+        self.stdout.write(
+            f'Просмотрено заметок: {stats.scanned}, '
+            f'отрисовано: {stats.rendered}'
+        )
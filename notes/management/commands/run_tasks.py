@@ -0,0 +1,45 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from notes.tasks import CLAIM_BATCH_SIZE, run_pending
+
+POOLS = {'thread': ThreadPoolExecutor, 'process': ProcessPoolExecutor}
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--pool', choices=POOLS, default='thread')
+        parser.add_argument(
+            '--batch-size', type=int, default=CLAIM_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться'
+        )
+
+    def handle(self, workers, pool, batch_size, interval, once, **options):
+        # Дочерние процессы не должны наследовать открытые соединения.
+        connections.close_all()
+        done = 0
+        with POOLS[pool](max_workers=workers) as executor:
+            try:
+                while True:
+                    count = run_pending(executor, limit=batch_size)
+                    done += count
+                    if not count:
+                        if once:
+                            break
+                        time.sleep(interval)
+            except KeyboardInterrupt:
+                pass
+        self.stdout.write(f'Выполнено задач: {done}')
@@ -0,0 +1,62 @@
+"""Отрисовка текста заметок из Markdown в безопасный HTML.
+
+Модуль не зависит от настроек Django, поэтому функции отрисовки можно
+выполнять в отдельных процессах.
+"""
+import hashlib
+import threading
+
+import bleach
+import markdown
+
+# При изменении отрисовки версия увеличивается, и manage.py
+# render_notes перерисовывает все заметки.
+RENDER_VERSION = 1
+
+MARKDOWN_EXTENSIONS = ('fenced_code', 'tables', 'sane_lists')
+
+ALLOWED_TAGS = (
+    'a', 'abbr', 'b', 'blockquote', 'br', 'code', 'del', 'em', 'h1', 'h2',
+    'h3', 'h4', 'h5', 'h6', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre',
+    'strong', 'table', 'tbody', 'td', 'th', 'thead', 'tr', 'ul',
+)
+ALLOWED_ATTRIBUTES = {
+    'a': ('href', 'title'),
+    'abbr': ('title',),
+    'img': ('src', 'alt', 'title'),
+    'td': ('align',),
+    'th': ('align',),
+}
+ALLOWED_PROTOCOLS = ('http', 'https', 'mailto')
+
+# Markdown и Cleaner хранят состояние разбора, поэтому у каждого
+# потока свои экземпляры.
+_local = threading.local()
+
+
+def _renderers():
+    if not hasattr(_local, 'markdown'):
+        _local.markdown = markdown.Markdown(
+            extensions=list(MARKDOWN_EXTENSIONS)
+        )
+        _local.cleaner = bleach.Cleaner(
+            tags=list(ALLOWED_TAGS),
+            attributes={
+                tag: list(names) for tag, names in ALLOWED_ATTRIBUTES.items()
+            },
+            protocols=list(ALLOWED_PROTOCOLS),
+            strip=True,
+        )
+    return _local.markdown, _local.cleaner
+
+
+def render_html(text):
+    """HTML текста в Markdown без опасной разметки и ссылок."""
+    md, cleaner = _renderers()
+    html = md.reset().convert(text)
+    return cleaner.clean(html)
+
+
+def text_hash(text):
+    """Хэш текста вместе с версией отрисовки."""
+    return hashlib.sha256(f'{RENDER_VERSION}:{text}'.encode()).hexdigest()
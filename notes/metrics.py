@@ -0,0 +1,161 @@
+"""Сбор показателей запросов по именам маршрутов.
+
+Показатели копятся в памяти процесса, отдаются в текстовом формате
+Prometheus и периодически сбрасываются в файл ``metrics-<pid>.json``
+в каталоге ``NOTES_METRICS_DIR``, откуда их читает команда
+``metrics_report``.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+# Границы корзин гистограммы времени ответа, секунды.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+FIELDS = ('requests', 'wall_seconds', 'db_seconds', 'queries',
+          'duplicate_queries', 'render_seconds')
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsRegistry:
+    """Потокобезопасные накопители показателей по маршрутам."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._flushed = time.monotonic()
+
+    def record(self, view, wall, db, queries, duplicates, render):
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = dict.fromkeys(FIELDS, 0)
+                stats['buckets'] = [0] * len(BUCKETS)
+            stats['requests'] += 1
+            stats['wall_seconds'] += wall
+            stats['db_seconds'] += db
+            stats['queries'] += queries
+            stats['duplicate_queries'] += duplicates
+            stats['render_seconds'] += render
+            for idx, bound in enumerate(BUCKETS):
+                if wall <= bound:
+                    stats['buckets'][idx] += 1
+        self._maybe_flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {view: {**stats, 'buckets': list(stats['buckets'])}
+                    for view, stats in self._views.items()}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def _maybe_flush(self):
+        directory = settings.NOTES_METRICS_DIR
+        if not directory:
+            return
+        now = time.monotonic()
+        with self._lock:
+            # Сбрасывает только поток, первым заметивший срок.
+            if now - self._flushed < settings.NOTES_METRICS_FLUSH_INTERVAL:
+                return
+            self._flushed = now
+        try:
+            self.flush(directory)
+        except OSError as error:
+            # Ошибка записи показателей не должна ломать сам запрос.
+            logger.warning('Не удалось сохранить показатели: %s', error)
+
+    def flush(self, directory):
+        """Сохраняет показатели процесса в файл каталога.
+
+        Каждый вызов пишет свой временный файл и заменяет им итоговый,
+        поэтому параллельные сбросы не мешают друг другу.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        pid = os.getpid()
+        with tempfile.NamedTemporaryFile(
+                'w', encoding='utf-8', dir=directory,
+                prefix=f'metrics-{pid}-', suffix='.tmp', delete=False
+        ) as tmp:
+            tmp.write(json.dumps(self.snapshot()))
+        try:
+            os.replace(tmp.name, directory / f'metrics-{pid}.json')
+        except OSError:
+            os.unlink(tmp.name)
+            raise
+
+
+registry = MetricsRegistry()
+
+
+def load_snapshots(directory):
+    """Суммирует показатели, сохранённые всеми процессами."""
+    merged = {}
+    for path in sorted(Path(directory).glob('metrics-*.json')):
+        for view, stats in json.loads(path.read_text('utf-8')).items():
+            total = merged.setdefault(
+                view, {**dict.fromkeys(FIELDS, 0),
+                       'buckets': [0] * len(BUCKETS)}
+            )
+            for field in FIELDS:
+                total[field] += stats[field]
+            total['buckets'] = [
+                left + right
+                for left, right in zip(total['buckets'], stats['buckets'])
+            ]
+    return merged
+
+
+def _label(view):
+    return view.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def render_prometheus(snapshot):
+    """Показатели в текстовом формате Prometheus."""
+    lines = [
+        '# HELP notes_request_duration_seconds Время обработки запроса.',
+        '# TYPE notes_request_duration_seconds histogram',
+    ]
+    for view, stats in sorted(snapshot.items()):
+        label = _label(view)
+        for bound, count in zip(BUCKETS, stats['buckets']):
+            lines.append(
+                'notes_request_duration_seconds_bucket'
+                f'{{view="{label}",le="{bound}"}} {count}'
+            )
+        lines.append(
+            'notes_request_duration_seconds_bucket'
+            f'{{view="{label}",le="+Inf"}} {stats["requests"]}'
+        )
+        lines.append(
+            f'notes_request_duration_seconds_sum{{view="{label}"}} '
+            f'{stats["wall_seconds"]}'
+        )
+        lines.append(
+            f'notes_request_duration_seconds_count{{view="{label}"}} '
+            f'{stats["requests"]}'
+        )
+    counters = (
+        ('notes_db_duration_seconds_total', 'db_seconds',
+         'Время выполнения запросов к БД.'),
+        ('notes_db_queries_total', 'queries', 'Число запросов к БД.'),
+        ('notes_db_duplicate_queries_total', 'duplicate_queries',
+         'Число повторных одинаковых запросов к БД.'),
+        ('notes_template_render_seconds_total', 'render_seconds',
+         'Время отрисовки шаблонов.'),
+    )
+    for name, field, description in counters:
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} counter')
+        for view, stats in sorted(snapshot.items()):
+            lines.append(f'{name}{{view="{_label(view)}"}} {stats[field]}')
+    return '\n'.join(lines) + '\n'
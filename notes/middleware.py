@@ -0,0 +1,123 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.functional import SimpleLazyObject
+from django.db import connections
+
+from .auth import get_user
+from .metrics import registry
+from .routers import pinned, replica_read, wrote
+
+PIN_COOKIE = 'notes_primary'
+
+
+class MetricsMiddleware:
+    """Замеряет время, запросы к БД и отрисовку шаблонов по маршрутам.
+
+    При выключенной настройке NOTES_METRICS_ENABLED исключается из
+    цепочки обработчиков при запуске и ничего не стоит.
+    """
+
+    def __init__(self, get_response):
+        if not settings.NOTES_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = []
+        db_time = [0.0]
+        request._metrics_render = 0.0
+
+        def measure(execute, sql, params, many, context):
+            queries.append((sql, str(params)))
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                db_time[0] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(measure))
+            response = self.get_response(request)
+        wall = time.perf_counter() - start
+        match = request.resolver_match
+        registry.record(
+            view=match.view_name if match else 'unresolved',
+            wall=wall,
+            db=db_time[0],
+            queries=len(queries),
+            duplicates=len(queries) - len(set(queries)),
+            render=request._metrics_render,
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        start = time.perf_counter()
+
+        def finish(rendered):
+            request._metrics_render += time.perf_counter() - start
+
+        response.add_post_render_callback(finish)
+        return response
+
+
+class ReplicaPinMiddleware:
+    """Закрепляет пользователя за основной базой после записи.
+
+    Небезопасные запросы читают из основной базы целиком, а после
+    записи в ответ ставится подписанная cookie на
+    NOTES_REPLICA_PIN_SECONDS, пока реплики догоняют основную базу.
+    Без настроенных реплик исключается из цепочки при запуске.
+    """
+
+    def __init__(self, get_response):
+        if not settings.NOTES_READ_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        max_age = settings.NOTES_REPLICA_PIN_SECONDS
+        is_pinned = (
+            request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+            or request.get_signed_cookie(
+                PIN_COOKIE, default=None, max_age=max_age
+            ) is not None
+        )
+        pinned_token = pinned.set(is_pinned)
+        wrote_token = wrote.set(False)
+        replica_token = replica_read.set(False)
+        try:
+            response = self.get_response(request)
+            if wrote.get():
+                response.set_signed_cookie(
+                    PIN_COOKIE, '1', max_age=max_age, httponly=True,
+                    samesite='Lax'
+                )
+        finally:
+            pinned.reset(pinned_token)
+            wrote.reset(wrote_token)
+            replica_read.reset(replica_token)
+        return response
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """AuthenticationMiddleware с кэшем пользователей в памяти процесса.
+
+    Повторные запросы с той же сессией не читают пользователя из базы;
+    см. notes.auth.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: _cached_user(request))
+
+
+def _cached_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = get_user(request)
+    return request._cached_user
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0001_initial'),
+    ]
+
+    operations = [
+        # Значение по умолчанию в базу не попадает, поэтому меняется
+        # только состояние миграций: AlterField на SQLite пересоздал бы
+        # таблицу.
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='note',
+                name='title',
+                field=models.CharField(default='Название заметки', help_text='Дайте короткое название заметке', max_length=100, verbose_name='Заголовок'),
+            ),
+        ]),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['author', 'id'], name='note_author_id_idx'),
+        ),
+    ]
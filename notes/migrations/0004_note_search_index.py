@@ -0,0 +1,31 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE IF NOT EXISTS notes_note_fts USING fts5('
+        "title, text, author_id UNINDEXED, tokenize='unicode61', "
+        "prefix='2 3')"
+    )
+    schema_editor.execute(
+        'INSERT INTO notes_note_fts (rowid, title, text, author_id) '
+        'SELECT id, title, text, author_id FROM notes_note'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS notes_note_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_timestamps'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
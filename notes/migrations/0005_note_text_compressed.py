@@ -0,0 +1,19 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:19
+
+from django.db import migrations
+import notes.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_note_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='note',
+            name='text',
+            field=notes.fields.CompressedTextField(help_text='Добавьте подробностей', verbose_name='Текст'),
+        ),
+    ]
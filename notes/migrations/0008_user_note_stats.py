@@ -0,0 +1,46 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:31
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_stats(apps, schema_editor):
+    Note = apps.get_model('notes', 'Note')
+    UserNoteStats = apps.get_model('notes', 'UserNoteStats')
+    using = schema_editor.connection.alias
+    totals = {}
+    rows = Note.objects.using(using).values_list(
+        'author_id', 'text', 'updated'
+    ).iterator(chunk_size=2000)
+    for author_id, text, updated in rows:
+        count, size, modified = totals.get(author_id, (0, 0, updated))
+        totals[author_id] = (
+            count + 1, size + len(text.encode()), max(modified, updated)
+        )
+    UserNoteStats.objects.using(using).bulk_create(
+        UserNoteStats(user_id=author_id, note_count=count, text_bytes=size,
+                      last_modified=modified)
+        for author_id, (count, size, modified) in totals.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notes', '0007_tasks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserNoteStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='note_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('note_count', models.PositiveIntegerField(default=0, verbose_name='Заметок')),
+                ('text_bytes', models.PositiveBigIntegerField(default=0, verbose_name='Объём текстов в байтах')),
+                ('last_modified', models.DateTimeField(null=True, verbose_name='Последнее изменение')),
+            ],
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+import notes.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0009_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер в байтах')),
+                ('file', models.FileField(max_length=200, upload_to=notes.models.blob_path, verbose_name='Файл')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Загружен')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Attachment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, verbose_name='Имя файла')),
+                ('content_type', models.CharField(max_length=100, verbose_name='Тип содержимого')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Прикреплён')),
+                ('blob', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='notes.blob')),
+                ('note', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='notes.note')),
+            ],
+        ),
+    ]
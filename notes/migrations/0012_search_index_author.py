@@ -0,0 +1,52 @@
+from django.db import migrations
+
+CHUNK_SIZE = 1000
+
+
+def _fill(apps, schema_editor, author_column, author_value):
+    Note = apps.get_model('notes', 'Note')
+    notes = Note.objects.using(schema_editor.connection.alias).only(
+        'id', 'title', 'text', 'author_id'
+    ).iterator(chunk_size=CHUNK_SIZE)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO notes_note_fts '
+            f'(rowid, title, text, {author_column}) VALUES (%s, %s, %s, %s)',
+            ((note.id, note.title, note.text, author_value(note.author_id))
+             for note in notes)
+        )
+
+
+def index_author(apps, schema_editor):
+    """Индексирует автора словом u<id>, чтобы поиск шёл по его заметкам."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS notes_note_fts')
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE notes_note_fts USING fts5('
+        "title, text, author, tokenize='unicode61', prefix='2 3')"
+    )
+    _fill(apps, schema_editor, 'author', lambda author_id: f'u{author_id}')
+
+
+def unindex_author(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute('DROP TABLE IF EXISTS notes_note_fts')
+    schema_editor.execute(
+        'CREATE VIRTUAL TABLE notes_note_fts USING fts5('
+        "title, text, author_id UNINDEXED, tokenize='unicode61', "
+        "prefix='2 3')"
+    )
+    _fill(apps, schema_editor, 'author_id', lambda author_id: author_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0011_note_text_html'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_author, unindex_author),
+    ]
@@ -1,20 +1,45 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
 
-from pytils.translit import slugify
+from .fields import CompressedTextField
+from .markup import render_html, text_hash
+from .slugs import allocate_slug, slug_base
+
+
+class NoteQuerySet(models.QuerySet):
+    """Набор запросов к заметкам."""
+
+    # Поля, которых достаточно для вывода заметок списком.
+    # Дата изменения служит версией фрагмента строки в шаблоне списка.
+    LIST_FIELDS = ('id', 'slug', 'title', 'updated')
+
+    def for_list(self):
+        """Облегчённая выборка без тела заметки."""
+        return self.only(*self.LIST_FIELDS)
 
 
 class Note(models.Model):
+    # Сколько раз подбирать slug заново при гонке параллельных вставок.
+    SLUG_ATTEMPTS = 5
+
     title = models.CharField(
         'Заголовок',
         max_length=100,
         default='Название заметки',
         help_text='Дайте короткое название заметке'
     )
-    text = models.TextField(
+    text = CompressedTextField(
         'Текст',
         help_text='Добавьте подробностей'
     )
+    # Текст в HTML отрисовывается при сохранении, а не при показе.
+    text_html = CompressedTextField(
+        'Текст в HTML', blank=True, default='', editable=False
+    )
+    text_hash = models.CharField(
+        'Хэш отрисованного текста', max_length=64, blank=True, default='',
+        editable=False
+    )
     slug = models.SlugField(
         'Адрес для страницы с заметкой',
         max_length=100,
@@ -27,12 +52,293 @@ class Note(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
     )
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    updated = models.DateTimeField('Изменена', auto_now=True)
+    tags = models.ManyToManyField(
+        'Tag',
+        through='NoteTag',
+        related_name='notes',
+        blank=True,
+        verbose_name='Метки',
+    )
+
+    objects = NoteQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+            models.Index(
+                fields=('author', 'updated'), name='note_author_updated_idx'
+            ),
+        )
+
+    # Поля, версии которых хранит история правок.
+    REVISION_FIELDS = ('title', 'text')
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Загруженная версия нужна истории правок, чтобы не читать её
+        # из базы повторно перед сохранением.
+        instance._loaded_version = {
+            field: instance.__dict__[field]
+            for field in cls.REVISION_FIELDS if field in instance.__dict__
+        }
+        return instance
+
+    def save_base(self, *args, **kwargs):
+        # Сводка по заметкам автора обновляется обработчиком post_save
+        # в одной транзакции с самой заметкой.
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        with transaction.atomic(using=using, savepoint=False):
+            super().save_base(*args, **kwargs)
+
+    def render_text(self):
+        """Отрисовывает текст в HTML, если он изменился с прошлого раза.
+
+        Возвращает True, если HTML обновлён.
+        """
+        digest = text_hash(self.text)
+        if digest == self.text_hash:
+            return False
+        self.text_html = render_html(self.text)
+        self.text_hash = digest
+        return True
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        saves_text = 'text' not in self.get_deferred_fields() and (
+            update_fields is None or 'text' in update_fields
+        )
+        if saves_text and self.render_text() and update_fields is not None:
+            kwargs['update_fields'] = {
+                *update_fields, 'text_html', 'text_hash'
+            }
+        if self.slug:
+            return super().save(*args, **kwargs)
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        max_slug_length = self._meta.get_field('slug').max_length
+        base = slug_base(self.title, max_slug_length)
+        # Собственный slug изменяемой заметки свободен для неё самой.
+        others = Note.objects.using(using)
+        if self.pk is not None:
+            others = others.exclude(pk=self.pk)
+        for attempt in range(self.SLUG_ATTEMPTS):
+            self.slug = allocate_slug(others, base, max_slug_length)
+            try:
+                with transaction.atomic(using=using):
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # Подобранный slug успела занять параллельная вставка.
+                if attempt == self.SLUG_ATTEMPTS - 1:
+                    self.slug = ''
+                    raise
+
+
+class NoteRevision(models.Model):
+    """Прежняя версия заметки в истории правок.
+
+    Версия хранится либо целиком (снимок), либо разницей с предыдущей
+    версией. ``base`` — номер снимка, с которого начинается цепочка
+    разниц, поэтому любая версия восстанавливается одним запросом.
+    """
+    note = models.ForeignKey(
+        Note,
+        on_delete=models.CASCADE,
+        related_name='revisions',
+    )
+    number = models.PositiveIntegerField('Номер')
+    base = models.PositiveIntegerField('Номер снимка')
+    title = models.CharField('Заголовок', max_length=100)
+    data = CompressedTextField('Текст или разница с прошлой версией')
+    created = models.DateTimeField('Создана', auto_now_add=True)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('note', 'number'), name='note_revision_number_uniq'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.note_id}#{self.number}'
+
+    @property
+    def is_snapshot(self):
+        return self.base == self.number
+
+
+class Task(models.Model):
+    """Отложенная задача в очереди на базе данных.
+
+    Ожидающая задача с ключом идемпотентности существует в единственном
+    экземпляре: повторная постановка с тем же ключом ничего не делает,
+    пока задачу не взял обработчик.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    name = models.CharField('Задача', max_length=100)
+    args = models.JSONField('Аргументы', default=list)
+    key = models.CharField(
+        'Ключ идемпотентности', max_length=200, null=True, blank=True
+    )
+    status = models.CharField(
+        'Состояние', max_length=10, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveIntegerField('Попытки', default=0)
+    max_attempts = models.PositiveIntegerField('Наибольшее число попыток')
+    run_after = models.DateTimeField('Не раньше')
+    locked_at = models.DateTimeField('Взята в работу', null=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'), name='task_status_run_idx'
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('key',), condition=models.Q(status='pending'),
+                name='task_pending_key_uniq'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.name}#{self.pk}'
+
+
+class UserNoteStats(models.Model):
+    """Сводка по заметкам пользователя.
+
+    Поддерживается приращениями при сохранении и удалении заметок в той
+    же транзакции и пересчитывается командой ``reconcile_note_stats``.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='note_stats',
+    )
+    note_count = models.PositiveIntegerField('Заметок', default=0)
+    text_bytes = models.PositiveBigIntegerField(
+        'Объём текстов в байтах', default=0
+    )
+    last_modified = models.DateTimeField('Последнее изменение', null=True)
+
+    def __str__(self):
+        return f'{self.user_id}: {self.note_count}'
+
+
+class Tag(models.Model):
+    """Метка заметок автора.
+
+    ``note_count`` — число заметок с меткой, которое поддерживается
+    при назначении меток и удалении заметок; по нему строится облако
+    меток без подсчёта связей.
+    """
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='note_tags',
+    )
+    name = models.CharField('Название', max_length=50)
+    note_count = models.PositiveIntegerField('Заметок', default=0)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('author', 'name'), name='tag_author_name_uniq'
+            ),
+        )
+
+    def __str__(self):
+        return self.name
+
+
+class NoteTag(models.Model):
+    """Связь заметки с меткой.
+
+    Автор повторяет автора заметки, чтобы выборка заметок по меткам
+    читала только индекс (author, tag, note) без обращения к таблицам
+    заметок и меток.
+    """
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
+    note = models.ForeignKey(Note, on_delete=models.CASCADE)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'tag', 'note'),
+                name='notetag_author_tag_note_idx'
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('note', 'tag'), name='notetag_note_tag_uniq'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.note_id}:{self.tag_id}'
+
+
+def blob_path(instance, filename):
+    """Путь файла по его хэшу: blobs/ab/cd/abcd…"""
+    digest = instance.sha256
+    return f'blobs/{digest[:2]}/{digest[2:4]}/{digest}'
+
+
+class Blob(models.Model):
+    """Содержимое вложения, которое хранится один раз по хэшу SHA-256.
+
+    Одинаковые файлы разных заметок и авторов ссылаются на один объект;
+    файл удаляется, когда на него не остаётся вложений.
+    """
+    sha256 = models.CharField('SHA-256', max_length=64, unique=True)
+    size = models.PositiveBigIntegerField('Размер в байтах')
+    file = models.FileField('Файл', upload_to=blob_path, max_length=200)
+    created = models.DateTimeField('Загружен', auto_now_add=True)
+
+    def __str__(self):
+        return self.sha256
+
+
+class Attachment(models.Model):
+    """Файл, прикреплённый к заметке."""
+    note = models.ForeignKey(
+        Note,
+        on_delete=models.CASCADE,
+        related_name='attachments',
+    )
+    blob = models.ForeignKey(
+        Blob,
+        on_delete=models.PROTECT,
+        related_name='attachments',
+    )
+    name = models.CharField('Имя файла', max_length=255)
+    content_type = models.CharField('Тип содержимого', max_length=100)
+    created = models.DateTimeField('Прикреплён', auto_now_add=True)
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,80 @@
+from django.core.paginator import InvalidPage
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+# Наибольший ключ, который помещается в целочисленный столбец базы.
+MAX_CURSOR = 2 ** 63 - 1
+
+
+class InvalidCursor(InvalidPage):
+    """Курсор не удалось разобрать."""
+
+
+def encode_cursor(value):
+    """Упаковывает значение ключа в непрозрачный курсор."""
+    return urlsafe_base64_encode(force_bytes(value))
+
+
+def decode_cursor(cursor):
+    """Распаковывает курсор обратно в значение ключа."""
+    try:
+        value = int(force_str(urlsafe_base64_decode(cursor)))
+    except (TypeError, ValueError):
+        raise InvalidCursor('Некорректный курсор')
+    if not 0 < value <= MAX_CURSOR:
+        raise InvalidCursor('Некорректный курсор')
+    return value
+
+
+class CursorPage:
+    """Страница, полученная по курсору."""
+
+    def __init__(self, object_list, next_cursor, cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинация по ключу: следующая страница начинается после курсора.
+
+    Стоимость страницы не зависит от её номера, а вставки и удаления
+    не сдвигают уже выданные курсоры.
+    """
+
+    cursor_field = 'id'
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset.order_by(self.cursor_field)
+        self.per_page = int(per_page)
+
+    def page(self, cursor=None):
+        queryset = self.queryset
+        if cursor:
+            queryset = queryset.filter(
+                **{f'{self.cursor_field}__gt': decode_cursor(cursor)}
+            )
+        # Лишняя запись показывает, есть ли следующая страница.
+        object_list = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[:self.per_page]
+            next_cursor = encode_cursor(
+                getattr(object_list[-1], self.cursor_field)
+            )
+        return CursorPage(object_list, next_cursor, cursor or None)
@@ -1,10 +1,17 @@
 import pytest
 
+from django.core.cache import cache
 from django.test.client import Client
 
 from notes.models import Note
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Страницы, закэшированные в других тестах, не должны мешать."""
+    cache.clear()
+
+
 @pytest.fixture
 def author(django_user_model):
     """Автор заметки."""
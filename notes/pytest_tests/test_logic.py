@@ -80,3 +80,15 @@ def test_other_user_cant_delete_note(not_author_client, slug_for_args):
     response = not_author_client.post(url)
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert Note.objects.count() == 1
+
+
+def test_empty_slug_for_existing_title(author_client, note, form_data):
+    """Заметка без слага с уже занятым заголовком получает суффикс."""
+    url = reverse('notes:add')
+    form_data.pop('slug')
+    form_data['title'] = note.title
+    note.slug = slugify(note.title)
+    note.save()
+    response = author_client.post(url, data=form_data)
+    assertRedirects(response, reverse('notes:success'))
+    assert Note.objects.filter(slug=f'{note.slug}-2').exists()
@@ -0,0 +1,148 @@
+"""Ограничение частоты изменяющих запросов.
+
+Лимиты задаются настройкой ``NOTES_RATE_LIMITS`` для областей вида
+``{'notes-write': '60/m'}`` и считаются отдельно для каждого
+пользователя, а для анонимных запросов — для каждого адреса.
+
+Запросы считаются скользящим окном: к запросам текущего окна
+добавляется доля запросов предыдущего, пропорциональная ещё не
+истёкшей его части. Оба счётчика хранятся в одном числе в кэше —
+предыдущий в старших битах, — поэтому запрос обходится одним
+атомарным ``incr``. Только первый запрос окна дополнительно читает
+счётчик предыдущего окна и создаёт ключ.
+"""
+import asyncio
+import math
+import time
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from .cache import get_cache
+
+# Сколько младших бит значения занимает счётчик текущего окна.
+COUNTER_BITS = 32
+COUNTER_MASK = (1 << COUNTER_BITS) - 1
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+def parse_rate(rate):
+    """Лимит ``'число/период'`` в виде ``(число, окно в секундах)``.
+
+    Период — s, m, h или d, перед ним может стоять множитель: ``10/5m``.
+    """
+    count, _, period = rate.partition('/')
+    multiplier, unit = period[:-1], period[-1:]
+    if unit not in PERIODS or not count.isdigit() or int(count) < 1:
+        raise ValueError(f'Некорректный лимит: {rate!r}')
+    if multiplier and not multiplier.isdigit():
+        raise ValueError(f'Некорректный лимит: {rate!r}')
+    return int(count), int(multiplier or 1) * PERIODS[unit]
+
+
+def client_key(request):
+    """Кого ограничивать: пользователя или адрес анонимного клиента."""
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'ip:{request.META.get("REMOTE_ADDR", "")}'
+
+
+def _key(scope, client, window, index):
+    return f'ratelimit:{scope}:{window}:{client}:{index}'
+
+
+def _retry_after(limit, window, previous, current, elapsed):
+    """Через сколько секунд следующий запрос уложится в лимит."""
+    room = limit - current - 1
+    if room >= 0 and previous:
+        # Достаточно, чтобы истекла нужная часть предыдущего окна.
+        wait = window * (1 - room / previous) - elapsed
+    else:
+        # В следующем окне текущие запросы станут предыдущими.
+        wait = window - elapsed + window * max(0, 1 - (limit - 1) / current)
+    return max(1, math.ceil(wait))
+
+
+def hit(scope, client, limit, window, now=None):
+    """Учитывает запрос клиента в области.
+
+    Возвращает None, если лимит не превышен, иначе число секунд до
+    следующего разрешённого запроса. Отклонённые запросы тоже
+    учитываются, поэтому клиент, не выжидающий Retry-After, остаётся
+    ограниченным.
+    """
+    cache = get_cache()
+    now = time.time() if now is None else now
+    index, elapsed = divmod(now, window)
+    index = int(index)
+    key = _key(scope, client, window, index)
+    try:
+        value = cache.incr(key)
+    except ValueError:
+        # Первый запрос окна переносит в ключ число запросов предыдущего.
+        previous = cache.get(_key(scope, client, window, index - 1), 0)
+        cache.add(
+            key, (previous & COUNTER_MASK) << COUNTER_BITS,
+            timeout=2 * window
+        )
+        value = cache.incr(key)
+    previous, current = value >> COUNTER_BITS, value & COUNTER_MASK
+    if previous * (1 - elapsed / window) + current <= limit:
+        return None
+    return _retry_after(limit, window, previous, current, elapsed)
+
+
+def check(request, scope):
+    """Число секунд ожидания, если запрос превышает лимит области."""
+    rate = settings.NOTES_RATE_LIMITS.get(scope)
+    if rate is None or request.method in SAFE_METHODS:
+        return None
+    limit, window = parse_rate(rate)
+    return hit(scope, client_key(request), limit, window)
+
+
+def too_many_requests(retry_after):
+    response = HttpResponse('Слишком много запросов', status=429)
+    response['Retry-After'] = retry_after
+    return response
+
+
+class RateLimitMixin:
+    """Ограничивает частоту изменяющих запросов к представлению."""
+    rate_limit_scope = None
+
+    def dispatch(self, request, *args, **kwargs):
+        retry_after = check(request, self.rate_limit_scope)
+        if retry_after is not None:
+            return self.rate_limited(retry_after)
+        return super().dispatch(request, *args, **kwargs)
+
+    def rate_limited(self, retry_after):
+        """Ответ на запрос сверх лимита."""
+        return too_many_requests(retry_after)
+
+
+def rate_limit(scope):
+    """Декоратор с тем же ограничением для обычных и асинхронных функций."""
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                retry_after = await sync_to_async(check)(request, scope)
+                if retry_after is not None:
+                    return too_many_requests(retry_after)
+                return await view(request, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            retry_after = check(request, scope)
+            if retry_after is not None:
+                return too_many_requests(retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,93 @@
+"""Отрисовка текстов заметок, сохранённых без HTML или старой версией."""
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from .cache import bump_version
+from .markup import render_html, text_hash
+from .models import Note
+
+RENDER_BATCH_SIZE = 500
+
+RenderStats = namedtuple('RenderStats', 'scanned rendered')
+
+
+def _stale(notes):
+    """Заметки пачки, HTML которых не соответствует тексту."""
+    return [note for note in notes if note.text_hash != text_hash(note.text)]
+
+
+def _save(stale, htmls, using):
+    """Записывает HTML тех заметок, текст которых не успел измениться."""
+    with transaction.atomic(using=using):
+        current = dict(Note.objects.using(using).filter(
+            pk__in=[note.pk for note in stale]
+        ).values_list('pk', 'text_hash'))
+        changed = []
+        now = timezone.now()
+        for note, html in zip(stale, htmls):
+            if current.get(note.pk) != note.text_hash:
+                # Заметку пересохранили, и она уже отрисована заново.
+                continue
+            note.text_html = html
+            note.text_hash = text_hash(note.text)
+            # Новое время изменения сбрасывает Last-Modified страницы.
+            note.updated = now
+            changed.append(note)
+        if changed:
+            Note.objects.using(using).bulk_update(
+                changed, ['text_html', 'text_hash', 'updated']
+            )
+    return changed
+
+
+def render_notes(batch_size=RENDER_BATCH_SIZE, workers=None,
+                 using=DEFAULT_DB_ALIAS):
+    """Отрисовывает HTML заметок, у которых он устарел или отсутствует.
+
+    Тексты пачки отрисовываются параллельно в ``workers`` процессах
+    (по умолчанию по числу ядер), а с ``workers=1`` — в текущем
+    процессе. Запись идёт одним UPDATE на пачку; заметки, изменённые
+    во время отрисовки, пропускаются. У отрисованных заметок
+    обновляется время изменения, а кэш страниц сбрасывается у их
+    авторов.
+    """
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    scanned = rendered = 0
+    authors = set()
+    last_id = 0
+    try:
+        while True:
+            notes = list(Note.objects.using(using).filter(
+                id__gt=last_id
+            ).order_by('id').only(
+                'id', 'author_id', 'text', 'text_hash'
+            )[:batch_size])
+            if not notes:
+                break
+            stale = _stale(notes)
+            if stale:
+                texts = [note.text for note in stale]
+                if executor is None:
+                    htmls = map(render_html, texts)
+                else:
+                    # Тексты передаются процессам частями, а не по одному.
+                    htmls = executor.map(
+                        render_html, texts,
+                        chunksize=max(1, len(texts) // (4 * workers))
+                    )
+                changed = _save(stale, list(htmls), using)
+                rendered += len(changed)
+                authors.update(note.author_id for note in changed)
+            scanned += len(notes)
+            last_id = notes[-1].id
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        for author_id in authors:
+            bump_version(author_id)
+    return RenderStats(scanned, rendered)
@@ -0,0 +1,128 @@
+"""История правок заметок в виде цепочек разниц.
+
+При изменении заметки её прежняя версия сохраняется как NoteRevision:
+каждая NOTES_REVISION_SNAPSHOT_EVERY-я версия — целиком, остальные —
+построчной разницей с предыдущей версией. Текущая версия живёт только
+в самой заметке, поэтому заметки без правок истории не занимают.
+"""
+import difflib
+import json
+
+from django.conf import settings
+from django.db.models import Subquery
+
+from .models import Note, NoteRevision
+
+
+def make_delta(old, new):
+    """Построчная разница: диапазоны строк старого текста и вставки.
+
+    Элемент ``[i, j]`` копирует строки ``i:j`` старого текста, строка
+    вставляется как есть.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines,
+                                      autojunk=False)
+    delta = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            delta.append([i1, i2])
+        elif tag != 'delete':
+            delta.append(''.join(new_lines[j1:j2]))
+    return delta
+
+
+def apply_delta(old, delta):
+    """Восстанавливает новый текст из старого и разницы."""
+    old_lines = old.splitlines(keepends=True)
+    parts = []
+    for item in delta:
+        if isinstance(item, str):
+            parts.append(item)
+        else:
+            parts.extend(old_lines[item[0]:item[1]])
+    return ''.join(parts)
+
+
+def _rebuild(chain):
+    text = chain[0].data
+    for revision in chain[1:]:
+        text = apply_delta(text, json.loads(revision.data))
+    return text
+
+
+def _chain(note, number=None):
+    """Версии от ближайшего снимка до ``number`` или до последней."""
+    revisions = NoteRevision.objects.filter(note=note)
+    if number is not None:
+        target = revisions.filter(number=number)
+        revisions = revisions.filter(number__lte=number)
+    else:
+        target = revisions.order_by('-number')[:1]
+    return list(revisions.filter(
+        number__gte=Subquery(target.values('base'))
+    ).order_by('number'))
+
+
+def get_revision(note, number):
+    """Версия заметки с восстановленным текстом в атрибуте ``text``.
+
+    Выполняет один запрос и не более NOTES_REVISION_SNAPSHOT_EVERY
+    применений разницы.
+    """
+    chain = _chain(note, number)
+    if not chain:
+        raise NoteRevision.DoesNotExist
+    revision = chain[-1]
+    revision.text = _rebuild(chain)
+    return revision
+
+
+def record_revision(note, title, text):
+    """Сохраняет прежнюю версию заметки в истории."""
+    chain = _chain(note)
+    if not chain:
+        number = base = 1
+    else:
+        last = chain[-1]
+        number = last.number + 1
+        base = last.base
+        if number - base >= settings.NOTES_REVISION_SNAPSHOT_EVERY:
+            base = number
+    if base == number:
+        data = text
+    else:
+        data = json.dumps(
+            make_delta(_rebuild(chain), text), ensure_ascii=False
+        )
+    return NoteRevision.objects.create(
+        note=note, number=number, base=base, title=title, data=data
+    )
+
+
+def previous_version(note):
+    """Прежние заголовок и текст, если сохранение заметки их меняет.
+
+    Сравниваются только загруженные поля экземпляра с версией, которую
+    запомнил Note.from_db; недостающее читается из базы.
+    """
+    if note._state.adding:
+        return None
+    loaded = getattr(note, '_loaded_version', {})
+    current = {field: note.__dict__[field]
+               for field in Note.REVISION_FIELDS if field in note.__dict__}
+    if all(field in loaded and loaded[field] == value
+           for field, value in current.items()):
+        return None
+    version = dict(loaded)
+    missing = [field for field in Note.REVISION_FIELDS
+               if field not in version]
+    if missing:
+        stored = Note.objects.filter(pk=note.pk).values(*missing).first()
+        if stored is None:
+            return None
+        version.update(stored)
+    if all(version[field] == value for field, value in current.items()):
+        return None
+    return version
@@ -0,0 +1,65 @@
+"""Маршрутизация чтения заметок на реплики.
+
+Запись всегда идёт в основную базу. Чтение заметок распределяется по
+репликам из NOTES_READ_REPLICAS, кроме случаев, когда пользователь
+только что писал: такой запрос, как и все небезопасные запросы,
+закрепляется за основной базой, чтобы он видел собственные изменения
+несмотря на отставание реплик. Закрепление на следующие запросы
+переносит ReplicaPinMiddleware.
+
+Страница, при отрисовке которой что-то читалось с реплики, не
+попадает в кэш страниц: реплика могла отставать, а устаревшая копия
+под текущей версией автора отдавалась бы до истечения таймаута.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Чтение в текущем запросе должно идти в основную базу.
+pinned = ContextVar('notes_primary_pinned', default=False)
+# В текущем запросе была запись.
+wrote = ContextVar('notes_primary_wrote', default=False)
+# В текущем запросе было чтение с реплики.
+replica_read = ContextVar('notes_replica_read', default=False)
+
+
+class PrimaryReplicaRouter:
+    """Читает заметки с реплик, пишет в основную базу."""
+
+    app_label = 'notes'
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.NOTES_READ_REPLICAS
+        if (model._meta.app_label != self.app_label or not replicas
+                or pinned.get() or wrote.get()):
+            return None
+        replica_read.set(True)
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # Для моделей других приложений базу выбирает Django.
+        if model._meta.app_label != self.app_label:
+            return None
+        wrote.set(True)
+        instance = hints.get('instance')
+        database = instance._state.db if instance is not None else None
+        if database is None or database in settings.NOTES_READ_REPLICAS:
+            # Объект, прочитанный с реплики, сохраняется в основную базу.
+            return DEFAULT_DB_ALIAS
+        # Объекты другой подключённой базы, например базы замеров,
+        # остаются в ней.
+        return database
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.NOTES_READ_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными от основной базы.
+        if db in settings.NOTES_READ_REPLICAS:
+            return False
+        return None
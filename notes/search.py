@@ -0,0 +1,158 @@
+"""Полнотекстовый поиск по заметкам на основе SQLite FTS5.
+
+Индекс хранится в виртуальной таблице ``notes_note_fts``, rowid которой
+совпадает с id заметки. Автор заметки записан в индексируемый столбец
+``author`` словом ``u<id>``, поэтому поиск сразу ограничивается
+заметками автора, а не ранжирует совпадения всех пользователей.
+Таблица обновляется фоновой задачей ``search.sync``, которую ставят
+сигналы сохранения и удаления заметок, а целиком пересобирается
+командой ``rebuild_search_index``. На других СУБД поиск выполняется
+обычным фильтром по вхождению подстроки в заголовок.
+"""
+from collections import namedtuple
+from itertools import islice
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils.html import escape
+
+from .models import Note
+from .tasks import task
+
+FTS_TABLE = 'notes_note_fts'
+SEARCH_LIMIT = 50
+INDEX_CHUNK_SIZE = 1000
+
+# Заголовок важнее текста при ранжировании.
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+
+# Границы совпадений в сниппете до экранирования HTML.
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+SearchResult = namedtuple('SearchResult', 'id slug title snippet')
+
+
+def is_available(using=DEFAULT_DB_ALIAS):
+    return connections[using].vendor == 'sqlite'
+
+
+def author_token(author_id):
+    """Слово, которым автор заметки записан в индекс."""
+    return f'u{author_id}'
+
+
+def _rows(notes):
+    return [(note.pk, note.title, note.text, author_token(note.author_id))
+            for note in notes]
+
+
+def index_notes(notes, using=DEFAULT_DB_ALIAS):
+    """Добавляет заметки в индекс или обновляет их."""
+    rows = _rows(notes)
+    if not rows or not is_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(row[0],) for row in rows]
+        )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text, author) '
+            'VALUES (%s, %s, %s, %s)',
+            rows
+        )
+
+
+def unindex_notes(note_ids, using=DEFAULT_DB_ALIAS):
+    """Удаляет заметки из индекса."""
+    if not note_ids or not is_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(note_id,) for note_id in note_ids]
+        )
+
+
+@task('search.sync')
+def sync_index(note_ids, using=DEFAULT_DB_ALIAS):
+    """Переиндексирует заметки, а удалённые убирает из индекса.
+
+    Данные читаются при выполнении, поэтому задача идемпотентна и
+    несколько правок одной заметки сводятся к одной индексации.
+    """
+    notes = list(Note.objects.using(using).filter(pk__in=note_ids).only(
+        'id', 'title', 'text', 'author_id'
+    ))
+    found = {note.pk for note in notes}
+    unindex_notes(
+        [note_id for note_id in note_ids if note_id not in found], using
+    )
+    index_notes(notes, using)
+
+
+def rebuild_index(chunk_size=INDEX_CHUNK_SIZE):
+    """Пересобирает индекс по всем заметкам и возвращает их число."""
+    notes = Note.objects.only('id', 'title', 'text', 'author_id').iterator(
+        chunk_size=chunk_size
+    )
+    indexed = 0
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        while True:
+            chunk = list(islice(notes, chunk_size))
+            if not chunk:
+                return indexed
+            index_notes(chunk)
+            indexed += len(chunk)
+
+
+def build_match(query):
+    """Превращает пользовательский ввод в безопасное выражение MATCH.
+
+    Каждое слово берётся в кавычки, чтобы синтаксис FTS5 не
+    интерпретировался; последнее слово ищется как префикс.
+    """
+    terms = ['"{}"'.format(term.replace('"', '""'))
+             for term in query.split()]
+    if terms:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _highlight(snippet):
+    return escape(snippet).replace(_MARK_START, '<mark>').replace(
+        _MARK_END, '</mark>'
+    )
+
+
+def search_notes(author, query, limit=SEARCH_LIMIT):
+    """Заметки автора, найденные по запросу, от наиболее релевантных."""
+    match = build_match(query)
+    if not match:
+        return []
+    if not is_available():
+        # Тексты хранятся сжатыми, поэтому без индекса ищем только
+        # по заголовкам.
+        notes = Note.objects.filter(
+            author=author, title__icontains=query
+        ).only('id', 'slug', 'title')[:limit]
+        return [SearchResult(note.id, note.slug, note.title, '')
+                for note in notes]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT note.id, note.slug, note.title, '
+            f"snippet({FTS_TABLE}, 1, %s, %s, '…', 16) "
+            f'FROM {FTS_TABLE} JOIN {Note._meta.db_table} AS note '
+            f'ON note.id = {FTS_TABLE}.rowid '
+            f'WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY bm25({FTS_TABLE}, %s, %s, 0) LIMIT %s',
+            [_MARK_START, _MARK_END,
+             f'author:"{author_token(author.pk)}" AND '
+             f'{{title text}}:({match})',
+             TITLE_WEIGHT, TEXT_WEIGHT, limit]
+        )
+        return [SearchResult(id_, slug, title, _highlight(snippet))
+                for id_, slug, title, snippet in cursor.fetchall()]
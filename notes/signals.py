@@ -0,0 +1,130 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .attachments import release_blob
+from .auth import user_cache
+from .cache import bump_user_version, bump_version
+from .models import Attachment, Note
+from .revisions import previous_version, record_revision
+from .search import is_available
+from .stats import adjust_stats, text_size
+from .tags import forget_note
+from .tasks import enqueue
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def invalidate_author_pages(sender, instance, using, **kwargs):
+    """Сбрасывает кэш страниц автора изменённой заметки.
+
+    Сигнал приходит внутри транзакции, поэтому страница, собранная по
+    ещё не зафиксированным данным, сбрасывается повторно после фиксации.
+    """
+    author_id = instance.author_id
+    bump_version(author_id)
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: bump_version(author_id), using=using)
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def index_note(sender, instance, using, **kwargs):
+    """Ставит обновление заметки в поисковом индексе в очередь."""
+    if is_available(using):
+        enqueue('search.sync', [instance.pk], using,
+                key=f'search:{using}:{instance.pk}', using=using)
+
+
+@receiver(pre_save, sender=Note)
+def remember_previous_version(sender, instance, raw, **kwargs):
+    """Запоминает версию заметки, которую заменит сохранение."""
+    instance._previous_version = None if raw else previous_version(instance)
+
+
+@receiver(post_save, sender=Note)
+def update_stats(sender, instance, created, using, **kwargs):
+    """Учитывает сохранение заметки в сводке автора."""
+    if created:
+        adjust_stats(instance.author_id, 1, text_size(instance.text),
+                     instance.updated, using)
+        return
+    previous = instance._previous_version
+    delta = 0
+    if previous is not None and 'text' in instance.__dict__:
+        delta = text_size(instance.text) - text_size(previous['text'])
+    adjust_stats(instance.author_id, 0, delta, instance.updated, using)
+
+
+@receiver(pre_delete, sender=Note)
+def update_stats_on_delete(sender, instance, using, **kwargs):
+    """Вычитает удаляемую заметку из сводки автора."""
+    adjust_stats(instance.author_id, -1, -text_size(instance.text),
+                 using=using)
+
+
+@receiver(pre_delete, sender=Note)
+def update_tag_counts_on_delete(sender, instance, using, **kwargs):
+    """Вычитает удаляемую заметку из счётчиков её меток."""
+    forget_note(instance, using)
+
+
+@receiver(post_save, sender=Note)
+def save_revision(sender, instance, **kwargs):
+    """Добавляет прежнюю версию заметки в историю правок."""
+    previous = instance._previous_version
+    instance._loaded_version = {
+        field: instance.__dict__[field]
+        for field in Note.REVISION_FIELDS if field in instance.__dict__
+    }
+    if previous is not None:
+        record_revision(instance, previous['title'], previous['text'])
+
+
+@receiver(post_save, sender=Attachment)
+@receiver(post_delete, sender=Attachment)
+def invalidate_note_pages(sender, instance, using, **kwargs):
+    """Отмечает изменение заметки, у которой изменились вложения.
+
+    Вложения выводятся на странице заметки, поэтому вместе с кэшем
+    страниц меняется и время изменения заметки, по которому строятся
+    ETag и Last-Modified. При каскадном удалении заметки она не
+    загружена, а кэш сбрасывает удаление самой заметки.
+    """
+    if Attachment.note.is_cached(instance):
+        Note.objects.using(using).filter(pk=instance.note_id).update(
+            updated=timezone.now()
+        )
+        bump_version(instance.note.author_id)
+
+
+@receiver(post_delete, sender=Attachment)
+def release_attachment_blob(sender, instance, using, **kwargs):
+    """После фиксации удаляет содержимое, если оно больше не нужно."""
+    blob_id = instance.blob_id
+    transaction.on_commit(lambda: release_blob(blob_id), using=using)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_user_pages(sender, instance, **kwargs):
+    """Сбрасывает кэш страниц и кэш аутентификации пользователя.
+
+    Новая версия сбрасывает пользователя и в кэшах других процессов,
+    в том числе после его удаления.
+    """
+    bump_version(instance.pk)
+    bump_user_version(instance.pk)
+    user_cache.forget(instance.pk)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    """Удаляет вышедшего пользователя из кэша аутентификации."""
+    if user is not None:
+        user_cache.forget(user.pk)
@@ -0,0 +1,83 @@
+"""Подбор уникальных slug для заметок.
+
+Занятые варианты одной основы (``base``, ``base-2``, ``base-3``, …)
+выбираются одним запросом по диапазону уникального индекса,
+после чего свободный суффикс вычисляется в памяти.
+"""
+from functools import reduce
+from operator import or_
+
+from pytils.translit import slugify
+
+from django.db.models import Q
+
+DEFAULT_SLUG = 'note'
+# Сколько основ проверяется одним запросом: SQLite ограничивает
+# глубину дерева выражения, а каждая основа добавляет в него условие.
+BASES_PER_QUERY = 200
+
+
+def slug_base(title, max_length):
+    """Основа slug, полученная из заголовка."""
+    return slugify(title)[:max_length] or DEFAULT_SLUG
+
+
+def _prefix_filter(base):
+    # Все строки, начинающиеся с "base-", лежат между "base-" и "base.".
+    return Q(slug=base) | Q(slug__gt=f'{base}-', slug__lt=f'{base}.')
+
+
+def _number(slug, base):
+    """Номер варианта slug для основы или None."""
+    if slug == base:
+        return 1
+    suffix = slug[len(base) + 1:]
+    if slug.startswith(f'{base}-') and suffix.isdigit():
+        return int(suffix)
+
+
+def _with_suffix(base, number, max_length):
+    if number == 1:
+        return base[:max_length]
+    suffix = f'-{number}'
+    return base[:max_length - len(suffix)] + suffix
+
+
+def allocate_slugs(queryset, bases, max_length):
+    """Подбирает свободные slug для списка основ.
+
+    Выполняется один запрос на каждые BASES_PER_QUERY различных основ.
+    """
+    bases = list(bases)
+    if not bases:
+        return []
+    unique_bases = set(bases)
+    ordered_bases = sorted(unique_bases)
+    taken = set()
+    for start in range(0, len(ordered_bases), BASES_PER_QUERY):
+        chunk = ordered_bases[start:start + BASES_PER_QUERY]
+        taken.update(queryset.filter(
+            reduce(or_, (_prefix_filter(base) for base in chunk))
+        ).values_list('slug', flat=True))
+    numbers = {}
+    for slug in taken:
+        for base in {slug, slug.rsplit('-', 1)[0]} & unique_bases:
+            number = _number(slug, base)
+            if number is not None:
+                numbers[base] = max(numbers.get(base, 0), number)
+    slugs = []
+    for base in bases:
+        numbers[base] = numbers.get(base, 0) + 1
+        slug = _with_suffix(base, numbers[base], max_length)
+        while slug in taken:
+            # Основа обрезалась и столкнулась с чужим slug.
+            numbers[base] += 1
+            slug = _with_suffix(base, numbers[base], max_length)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def allocate_slug(queryset, base, max_length):
+    """Подбирает свободный slug для одной основы."""
+    return allocate_slugs(queryset, (base,), max_length)[0]
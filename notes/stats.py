@@ -0,0 +1,81 @@
+"""Сводка по заметкам пользователей: число, объём текстов, изменение."""
+from collections import defaultdict
+
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Note, UserNoteStats
+
+RECONCILE_CHUNK_SIZE = 2000
+
+
+def text_size(text):
+    """Объём текста в байтах UTF-8, независимо от сжатия в базе."""
+    return len(text.encode())
+
+
+def get_stats(user):
+    """Сводка пользователя одним запросом по первичному ключу."""
+    return (UserNoteStats.objects.filter(user_id=user.pk).first()
+            or UserNoteStats(user_id=user.pk))
+
+
+def adjust_stats(user_id, count=0, text_bytes=0, modified=None,
+                 using=DEFAULT_DB_ALIAS):
+    """Добавляет приращения к сводке пользователя.
+
+    Вызывается внутри транзакции изменения заметок; строка сводки
+    создаётся при первой заметке пользователя. Счётчики не опускаются
+    ниже нуля, даже если разошлись с заметками: расхождение исправляет
+    reconcile_note_stats.
+    """
+    modified = modified or timezone.now()
+    stats = UserNoteStats.objects.using(using)
+    updated = stats.filter(user_id=user_id).update(
+        note_count=Greatest(F('note_count') + count, 0),
+        text_bytes=Greatest(F('text_bytes') + text_bytes, 0),
+        last_modified=modified,
+    )
+    if updated or count < 0:
+        # Удаление не создаёт сводку: её строка могла уже попасть в
+        # каскадное удаление пользователя.
+        return
+    try:
+        with transaction.atomic(using=using):
+            stats.create(
+                user_id=user_id, note_count=max(count, 0),
+                text_bytes=max(text_bytes, 0), last_modified=modified,
+            )
+    except IntegrityError:
+        # Строку успела создать параллельная транзакция.
+        adjust_stats(user_id, count, text_bytes, modified, using)
+
+
+def reconcile_stats(chunk_size=RECONCILE_CHUNK_SIZE, using=DEFAULT_DB_ALIAS):
+    """Пересчитывает сводки всех пользователей по заметкам.
+
+    Тексты читаются потоком, чтобы посчитать их несжатый объём, и в
+    той же транзакции таблица сводок заменяется целиком. Возвращает
+    число пользователей с заметками.
+    """
+    totals = defaultdict(lambda: [0, 0, None])
+    with transaction.atomic(using=using):
+        rows = Note.objects.using(using).values_list(
+            'author_id', 'text', 'updated'
+        ).iterator(chunk_size=chunk_size)
+        for author_id, text, updated in rows:
+            total = totals[author_id]
+            total[0] += 1
+            total[1] += text_size(text)
+            if total[2] is None or updated > total[2]:
+                total[2] = updated
+        UserNoteStats.objects.using(using).all().delete()
+        UserNoteStats.objects.using(using).bulk_create(
+            [UserNoteStats(user_id=author_id, note_count=count,
+                           text_bytes=text_bytes, last_modified=modified)
+             for author_id, (count, text_bytes, modified) in totals.items()],
+            batch_size=chunk_size
+        )
+    return len(totals)
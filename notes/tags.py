@@ -0,0 +1,193 @@
+"""Метки заметок: назначение, выборка заметок по меткам и облако меток.
+
+Связи хранятся в ``NoteTag`` вместе с автором, и выборка по меткам
+проверяет их по индексу (author, tag, note). Число заметок с каждой
+меткой хранится в ``Tag.note_count`` и меняется в той же транзакции,
+что и связи.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Exists, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .cache import bump_version
+from .models import NoteTag, Tag
+
+MAX_TAGS = 20
+MAX_FILTER_TAGS = 10
+TAG_MAX_LENGTH = Tag._meta.get_field('name').max_length
+
+
+class TagError(ValueError):
+    """Некорректный список меток."""
+
+
+def parse_tags(value):
+    """Список меток из строки через запятую без повторов и пробелов."""
+    names = []
+    for name in value.split(','):
+        name = ' '.join(name.split()).lower()
+        if name and name not in names:
+            names.append(name)
+    if len(names) > MAX_TAGS:
+        raise TagError(f'Не больше {MAX_TAGS} меток у заметки')
+    for name in names:
+        if len(name) > TAG_MAX_LENGTH:
+            raise TagError(
+                f'Метка «{name}» длиннее {TAG_MAX_LENGTH} символов'
+            )
+    return names
+
+
+def tag_names(note):
+    """Метки заметки по алфавиту."""
+    return list(note.tags.order_by('name').values_list('name', flat=True))
+
+
+def _get_or_create_tags(author_id, names, using):
+    tags = Tag.objects.using(using)
+    found = dict(tags.filter(
+        author_id=author_id, name__in=names
+    ).values_list('name', 'pk'))
+    missing = [name for name in names if name not in found]
+    if missing:
+        # Метку с тем же названием могла успеть создать параллельная
+        # транзакция, поэтому вставка без ошибок и повторное чтение.
+        tags.bulk_create(
+            [Tag(author_id=author_id, name=name) for name in missing],
+            ignore_conflicts=True
+        )
+        found.update(tags.filter(
+            author_id=author_id, name__in=missing
+        ).values_list('name', 'pk'))
+    return set(found.values())
+
+
+def _count_plus(delta):
+    # Разошедшийся счётчик не опускается ниже нуля: его исправляет
+    # reconcile_note_stats.
+    return Greatest(F('note_count') + delta, 0)
+
+
+def _adjust_counts(tag_ids, delta, using):
+    if tag_ids:
+        Tag.objects.using(using).filter(pk__in=tag_ids).update(
+            note_count=_count_plus(delta)
+        )
+
+
+def set_tags(note, names, created=False, using=DEFAULT_DB_ALIAS):
+    """Заменяет метки сохранённой заметки на перечисленные.
+
+    Для только что созданной заметки текущие метки не читаются.
+    """
+    if created and not names:
+        return
+    links = NoteTag.objects.using(using)
+    current = set() if created else set(links.filter(
+        note=note
+    ).values_list('tag_id', flat=True))
+    if not current and not names:
+        return
+    with transaction.atomic(using=using):
+        wanted = (_get_or_create_tags(note.author_id, names, using)
+                  if names else set())
+        added, removed = wanted - current, current - wanted
+        if not added and not removed:
+            return
+        links.bulk_create([
+            NoteTag(author_id=note.author_id, tag_id=tag_id, note=note)
+            for tag_id in added
+        ])
+        if removed:
+            links.filter(note=note, tag_id__in=removed).delete()
+        _adjust_counts(added, 1, using)
+        _adjust_counts(removed, -1, using)
+    bump_version(note.author_id)
+
+
+def forget_note(note, using=DEFAULT_DB_ALIAS):
+    """Вычитает удаляемую заметку из счётчиков её меток."""
+    Tag.objects.using(using).filter(
+        pk__in=NoteTag.objects.using(using).filter(
+            note=note
+        ).values('tag_id')
+    ).update(note_count=_count_plus(-1))
+
+
+def filter_by_tags(queryset, author, names, match_all=True):
+    """Заметки с перечисленными метками: со всеми или с любой из них.
+
+    Таблица связей не читается: заметки с меткой перебираются по
+    индексу (author, tag, note), а наличие метки у заметки проверяется
+    точечным поиском по уникальному индексу (note, tag).
+
+    Если у самой редкой из обязательных меток (по счётчику заметок) не
+    больше ``NOTES_TAG_JOIN_LIMIT`` заметок, перебираются только они.
+    Иначе, как и для условия «любая метка», заметки перебираются в
+    порядке страницы с проверкой меток, и страница заполняется тем
+    быстрее, чем чаще встречаются метки. В обоих случаях время не растёт
+    вместе с общим числом заметок.
+    """
+    names = list(dict.fromkeys(names))[:MAX_FILTER_TAGS]
+    tags = list(Tag.objects.filter(
+        author=author, name__in=names
+    ).order_by('note_count').values_list('pk', 'note_count'))
+    if not tags or match_all and len(tags) < len(names):
+        return queryset.none()
+    links = NoteTag.objects.filter(note=OuterRef('pk'))
+    tag_ids = [tag_id for tag_id, _ in tags]
+    if not match_all:
+        return queryset.filter(Exists(links.filter(tag_id__in=tag_ids)))
+    rarest, rarest_count = tags[0]
+    if rarest_count <= settings.NOTES_TAG_JOIN_LIMIT:
+        queryset = queryset.filter(
+            notetag__author=author, notetag__tag_id=rarest
+        )
+        tag_ids = tag_ids[1:]
+    for tag_id in tag_ids:
+        queryset = queryset.filter(Exists(links.filter(tag_id=tag_id)))
+    return queryset
+
+
+def filter_by_query(queryset, author, query):
+    """Отбор заметок по параметрам ``tag`` и ``match`` строки запроса.
+
+    Меток может быть несколько; по умолчанию нужны все, а с
+    ``match=any`` — любая из них.
+    """
+    names = [name for name in (
+        ' '.join(value.split()).lower() for value in query.getlist('tag')
+    ) if name]
+    if not names:
+        return queryset
+    return filter_by_tags(
+        queryset, author, names, match_all=query.get('match') != 'any'
+    )
+
+
+def filter_query(query):
+    """Параметры отбора по меткам для ссылок на следующие страницы."""
+    params = query.copy()
+    params.pop('after', None)
+    return params.urlencode()
+
+
+def tag_cloud(author):
+    """Метки автора с числом заметок, по алфавиту."""
+    return list(Tag.objects.filter(
+        author=author, note_count__gt=0
+    ).order_by('name').values_list('name', 'note_count'))
+
+
+def reconcile_tag_counts(using=DEFAULT_DB_ALIAS):
+    """Пересчитывает число заметок у всех меток по связям.
+
+    Возвращает число меток.
+    """
+    counts = NoteTag.objects.using(using).filter(
+        tag=OuterRef('pk')
+    ).order_by().values('tag').annotate(total=Count('pk')).values('total')
+    return Tag.objects.using(using).update(
+        note_count=Coalesce(Subquery(counts), Value(0))
+    )
@@ -0,0 +1,155 @@
+"""Очередь фоновых задач на базе данных.
+
+Задачи регистрируются декоратором :func:`task` и ставятся в очередь
+функцией :func:`enqueue` в той же транзакции, что и изменения, к
+которым они относятся: обработчик увидит задачу только после фиксации.
+Задачи выполняет команда ``manage.py run_tasks``. Упавшая задача
+повторяется с экспоненциальной задержкой, пока не исчерпает попытки.
+С NOTES_TASKS_EAGER задачи выполняются сразу при постановке.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+)
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+DEFAULT_MAX_ATTEMPTS = 3
+CLAIM_BATCH_SIZE = 50
+
+
+def task(name, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Регистрирует функцию как задачу под указанным именем.
+
+    Аргументы задачи хранятся в JSON, поэтому должны быть простыми
+    значениями; задача должна быть идемпотентной, так как после сбоя
+    обработчика может выполниться повторно.
+    """
+    def decorator(func):
+        func.task_name = name
+        func.max_attempts = max_attempts
+        TASKS[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, *args, key=None, delay=0, using=DEFAULT_DB_ALIAS):
+    """Ставит задачу в очередь.
+
+    Если задача с тем же ``key`` ещё ждёт выполнения, новая не
+    создаётся: ожидающая задача всё равно прочтёт актуальные данные.
+    """
+    func = TASKS[name]
+    if settings.NOTES_TASKS_EAGER:
+        func(*args)
+        return
+    Task.objects.using(using).bulk_create([Task(
+        name=name,
+        args=list(args),
+        key=key,
+        max_attempts=func.max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )], ignore_conflicts=True)
+
+
+def claim(limit=CLAIM_BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+    """Берёт в работу готовые задачи и возвращает их.
+
+    Задачи, которые выполняются дольше NOTES_TASKS_LEASE секунд,
+    считаются брошенными упавшим обработчиком и берутся заново.
+    """
+    now = timezone.now()
+    lease = now - timedelta(seconds=settings.NOTES_TASKS_LEASE)
+    tasks = Task.objects.using(using)
+    with transaction.atomic(using=using):
+        ready = tasks.filter(
+            Q(status=Task.PENDING, run_after__lte=now)
+            | Q(status=Task.RUNNING, locked_at__lt=lease)
+        ).order_by('run_after', 'id')
+        if connections[using].features.has_select_for_update_skip_locked:
+            ready = ready.select_for_update(skip_locked=True)
+        ids = list(ready.values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        tasks.filter(id__in=ids).update(
+            status=Task.RUNNING, locked_at=now, attempts=F('attempts') + 1
+        )
+        return list(tasks.filter(id__in=ids).order_by('id'))
+
+
+def execute(name, args):
+    """Выполняет задачу; вызывается в потоке или процессе обработчика."""
+    try:
+        TASKS[name](*args)
+    finally:
+        connections.close_all()
+
+
+def complete(task_obj, error=None, using=DEFAULT_DB_ALIAS):
+    """Удаляет выполненную задачу или планирует повтор упавшей."""
+    tasks = Task.objects.using(using).filter(pk=task_obj.pk)
+    if error is None:
+        tasks.delete()
+        return
+    logger.warning(
+        'Задача %s упала: %s', task_obj, error.strip().splitlines()[-1]
+    )
+    if task_obj.attempts >= task_obj.max_attempts:
+        tasks.update(status=Task.FAILED, last_error=error)
+        return
+    delay = settings.NOTES_TASKS_RETRY_DELAY * 2 ** (task_obj.attempts - 1)
+    try:
+        with transaction.atomic(using=using):
+            tasks.update(
+                status=Task.PENDING,
+                run_after=timezone.now() + timedelta(seconds=delay),
+                last_error=error,
+            )
+    except IntegrityError:
+        # Пока задача выполнялась, с тем же ключом поставили новую: она
+        # прочтёт актуальные данные, поэтому повтор не нужен.
+        tasks.delete()
+
+
+def run_pending(executor=None, limit=CLAIM_BATCH_SIZE, using=DEFAULT_DB_ALIAS):
+    """Выполняет одну порцию задач и возвращает их число.
+
+    С ``executor`` (пулом потоков или процессов) задачи порции
+    выполняются параллельно, без него — по очереди в текущем потоке.
+    """
+    claimed = claim(limit, using)
+    if executor is None:
+        for task_obj in claimed:
+            complete(task_obj, _run_inline(task_obj), using)
+        return len(claimed)
+    futures = [
+        (task_obj, executor.submit(execute, task_obj.name, task_obj.args))
+        for task_obj in claimed
+    ]
+    for task_obj, future in futures:
+        error = future.exception()
+        complete(task_obj, _format(error) if error else None, using)
+    return len(claimed)
+
+
+def _run_inline(task_obj):
+    try:
+        TASKS[task_obj.name](*task_obj.args)
+    except Exception as error:
+        return _format(error)
+    return None
+
+
+def _format(error):
+    return ''.join(traceback.format_exception(
+        type(error), error, error.__traceback__
+    ))
@@ -0,0 +1,198 @@
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from notes.models import Note
+from notes.pagination import encode_cursor
+from notes.tags import tag_names
+
+
+User = get_user_model()
+
+
+class TestNotesApi(TestCase):
+    """Тестирование JSON API заметок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора, читателя и заметок автора."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.reader = User.objects.create(username='Читатель')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+        cls.notes = [
+            Note.objects.create(
+                title=f'Заметка {idx}', text=f'Текст {idx}',
+                slug=f'zametka-{idx}', author=cls.author
+            )
+            for idx in range(3)
+        ]
+        cls.list_url = reverse('api:notes')
+        cls.batch_url = reverse('api:batch')
+
+    def note_url(self, slug):
+        return reverse('api:note', args=(slug,))
+
+    def send(self, method, url, data, client=None):
+        return getattr(client or self.auth_client, method)(
+            url, json.dumps(data), content_type='application/json'
+        )
+
+    def test_anonymous_gets_401(self):
+        """Анонимный клиент получает 401 в JSON."""
+        for url in (self.list_url, self.note_url('zametka-0')):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+                self.assertIn('error', response.json())
+
+    def test_list_with_sparse_fields_and_cursor(self):
+        """Список отдаёт выбранные поля и листается по курсору."""
+        response = self.auth_client.get(
+            self.list_url, {'fields': 'slug', 'limit': 2}
+        )
+        data = response.json()
+        self.assertEqual(data['results'], [
+            {'slug': 'zametka-0'}, {'slug': 'zametka-1'}
+        ])
+        response = self.auth_client.get(
+            self.list_url, {'fields': 'slug', 'after': data['next']}
+        )
+        self.assertEqual(response.json(), {
+            'results': [{'slug': 'zametka-2'}], 'next': None
+        })
+
+    def test_out_of_range_cursor(self):
+        """Курсор вне диапазона ключей — ошибка 400."""
+        response = self.auth_client.get(
+            self.list_url, {'after': encode_cursor(10 ** 30)}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('error', response.json())
+
+    def test_sparse_fields_skip_text(self):
+        """Без поля text текст заметок не читается из базы."""
+        self.auth_client.get(self.list_url)
+        with self.assertNumQueries(1) as context:
+            # Сессия и пользователь уже в кэше.
+            self.auth_client.get(self.list_url, {'fields': 'id,title'})
+        self.assertNotIn('"text"', context.captured_queries[-1]['sql'])
+
+    def test_unknown_field(self):
+        """Неизвестное поле — ошибка 400."""
+        response = self.auth_client.get(self.list_url, {'fields': 'author'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(response.json()['fields'], ['author'])
+
+    def test_author_scoping(self):
+        """Чужие заметки не видны и не изменяются."""
+        response = self.reader_client.get(self.list_url)
+        self.assertEqual(response.json()['results'], [])
+        url = self.note_url('zametka-0')
+        self.assertEqual(
+            self.reader_client.get(url).status_code, HTTPStatus.NOT_FOUND
+        )
+        response = self.send(
+            'patch', url, {'title': 'Чужая'}, self.reader_client
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertEqual(
+            self.reader_client.delete(url).status_code, HTTPStatus.NOT_FOUND
+        )
+        self.assertEqual(Note.objects.get(slug='zametka-0').title,
+                         'Заметка 0')
+
+    def test_create_update_delete(self):
+        """Заметку можно создать, изменить и удалить."""
+        response = self.send('post', self.list_url, {
+            'title': 'Новая', 'text': 'Текст'
+        })
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        slug = response.json()['slug']
+        self.assertEqual(Note.objects.get(slug=slug).author, self.author)
+        response = self.send(
+            'patch', self.note_url(slug) + '?fields=title,text',
+            {'title': 'Изменённая'}
+        )
+        self.assertEqual(response.json(), {
+            'title': 'Изменённая', 'text': 'Текст'
+        })
+        response = self.auth_client.delete(self.note_url(slug))
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        self.assertFalse(Note.objects.filter(slug=slug).exists())
+
+    def test_tags(self):
+        """Метки задаются через API и не сбрасываются частичным изменением."""
+        response = self.send('post', self.list_url, {
+            'title': 'Новая', 'text': 'Текст', 'tags': 'b, a'
+        })
+        note = Note.objects.get(slug=response.json()['slug'])
+        self.assertEqual(tag_names(note), ['a', 'b'])
+        self.send('patch', self.note_url(note.slug), {'title': 'Другая'})
+        self.assertEqual(tag_names(note), ['a', 'b'])
+        self.send('post', self.batch_url, {'operations': [
+            {'op': 'update', 'slug': note.slug, 'data': {'tags': 'c'}},
+        ]})
+        self.assertEqual(tag_names(note), ['c'])
+
+    def test_invalid_data(self):
+        """Ошибки формы возвращаются в JSON."""
+        response = self.send('post', self.list_url, {
+            'title': 'Новая', 'text': 'Текст', 'slug': 'zametka-1'
+        })
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('slug', response.json()['errors'])
+
+    def test_batch(self):
+        """Пакет применяет все операции одним запросом."""
+        response = self.send('post', self.batch_url, {'operations': [
+            {'op': 'create', 'data': {'title': 'Новая', 'text': 'Текст',
+                                      'slug': 'novaya'}},
+            {'op': 'update', 'slug': 'zametka-0',
+             'data': {'title': 'Изменённая'}},
+            {'op': 'delete', 'slug': 'zametka-1'},
+            {'op': 'update', 'slug': 'novaya', 'data': {'text': 'Ещё'}},
+        ]})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(
+            [result['op'] for result in response.json()['results']],
+            ['create', 'update', 'delete', 'update']
+        )
+        self.assertEqual(Note.objects.get(slug='zametka-0').title,
+                         'Изменённая')
+        self.assertEqual(Note.objects.get(slug='novaya').text, 'Ещё')
+        self.assertFalse(Note.objects.filter(slug='zametka-1').exists())
+
+    def test_batch_is_atomic(self):
+        """Ошибка в пакете откатывает все операции."""
+        response = self.send('post', self.batch_url, {'operations': [
+            {'op': 'delete', 'slug': 'zametka-0'},
+            {'op': 'update', 'slug': 'zametka-0', 'data': {}},
+        ]})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertEqual(response.json()['index'], 1)
+        self.assertTrue(Note.objects.filter(slug='zametka-0').exists())
+
+    def test_batch_cannot_touch_other_notes(self):
+        """Пакет не находит чужие заметки."""
+        response = self.send('post', self.batch_url, {'operations': [
+            {'op': 'delete', 'slug': 'zametka-0'},
+        ]}, self.reader_client)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertTrue(Note.objects.filter(slug='zametka-0').exists())
+
+    def test_batch_rejects_non_string_slug(self):
+        """Slug операции, который не строка, — ошибка 400."""
+        for slug in (['zametka-0'], {'slug': 'zametka-0'}, 1):
+            with self.subTest(slug=slug):
+                response = self.send('post', self.batch_url, {'operations': [
+                    {'op': 'delete', 'slug': slug},
+                ]})
+                self.assertEqual(response.status_code,
+                                 HTTPStatus.BAD_REQUEST)
+                self.assertEqual(response.json()['index'], 0)
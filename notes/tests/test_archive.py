@@ -0,0 +1,110 @@
+import io
+import os
+import tarfile
+import tempfile
+import tracemalloc
+import zipfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from notes.archive import export_archive
+from notes.bulk import import_notes
+from notes.models import Note
+
+
+User = get_user_model()
+
+
+class TestNotesArchive(TestCase):
+    """Тестирование выгрузки заметок архивом."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора, его клиента и двух заметок."""
+        cls.author = User.objects.create(username='author')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        Note.objects.create(title='Первая', text='Текст первой',
+                            slug='first', author=cls.author)
+        Note.objects.create(title='Вторая', text='Текст второй',
+                            slug='second', author=cls.author)
+        Note.objects.create(title='Чужая', text='Текст', slug='other',
+                            author=User.objects.create(username='other'))
+        cls.url = reverse('notes:archive')
+
+    def test_zip(self):
+        """В zip по файлу Markdown на каждую заметку автора."""
+        response = self.auth_client.get(self.url)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIn('notes.zip', response['Content-Disposition'])
+        archive = zipfile.ZipFile(
+            io.BytesIO(b''.join(response.streaming_content))
+        )
+        self.assertEqual(archive.namelist(),
+                         ['notes/first.md', 'notes/second.md'])
+        self.assertEqual(archive.read('notes/first.md').decode(),
+                         '# Первая\n\nТекст первой\n')
+        self.assertIsNone(archive.testzip())
+
+    def test_tar(self):
+        """Архивы tar и tar.gz читаются стандартной библиотекой."""
+        for archive_format in ('tar', 'tar.gz'):
+            with self.subTest(archive_format=archive_format):
+                response = self.auth_client.get(
+                    self.url, {'format': archive_format}
+                )
+                archive = tarfile.open(fileobj=io.BytesIO(
+                    b''.join(response.streaming_content)
+                ))
+                self.assertEqual(archive.getnames(),
+                                 ['notes/first.md', 'notes/second.md'])
+                self.assertEqual(
+                    archive.extractfile('notes/second.md').read().decode(),
+                    '# Вторая\n\nТекст второй\n'
+                )
+
+    def test_unknown_format(self):
+        """Неизвестный формат — ошибка 400."""
+        response = self.auth_client.get(self.url, {'format': 'rar'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_anonymous(self):
+        """Аноним перенаправляется на страницу входа."""
+        response = self.client.get(self.url)
+        self.assertRedirects(
+            response, f'{reverse("users:login")}?next={self.url}'
+        )
+
+    def test_command(self):
+        """Команда пишет архив в файл."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'notes.tar.gz')
+            call_command('export_archive', 'author', output=path,
+                         archive_format='tar.gz')
+            with tarfile.open(path) as archive:
+                self.assertEqual(len(archive.getnames()), 2)
+
+    def test_memory_is_bounded(self):
+        """Память при выгрузке много меньше объёма заметок."""
+        text = 'Длинный текст заметки. ' * 2000
+        import_notes(self.author, (
+            {'title': f'Заметка {idx}', 'text': text, 'slug': ''}
+            for idx in range(100)
+        ))
+        total = 100 * len(text.encode())
+        for archive_format in ('zip', 'tar.gz'):
+            with self.subTest(archive_format=archive_format):
+                tracemalloc.start()
+                try:
+                    for _ in export_archive(
+                        self.author, archive_format, chunk_size=10
+                    ):
+                        pass
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                self.assertLess(peak, total / 4)
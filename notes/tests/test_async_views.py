@@ -0,0 +1,117 @@
+import asyncio
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncClient, Client, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from notes.models import Note
+
+
+User = get_user_model()
+
+
+@override_settings(ROOT_URLCONF='notes.async_urls')
+class TestAsyncViews(TestCase):
+    """Тестирование асинхронных версий представлений заметок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора, читателя, их клиентов и заметки автора."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.reader = User.objects.create(username='Читатель')
+        cls.note = Note.objects.create(
+            title='Заметка', text='Текст заметки', slug='zametka',
+            author=cls.author
+        )
+        cls.detail_url = reverse('notes:detail', args=(cls.note.slug,))
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_note_routes_are_coroutines(self):
+        """Маршруты заметок указывают на корутины."""
+        for name, args in (('notes:list', None), ('notes:add', None),
+                           ('notes:detail', (self.note.slug,))):
+            with self.subTest(name=name):
+                match = resolve(reverse(name, args=args))
+                self.assertTrue(asyncio.iscoroutinefunction(match.func))
+
+    def test_pages_availability(self):
+        """Страницы заметки доступны только автору."""
+        for name in ('notes:detail', 'notes:edit', 'notes:delete'):
+            url = reverse(name, args=(self.note.slug,))
+            for client, status in ((self.auth_client, HTTPStatus.OK),
+                                   (self.reader_client,
+                                    HTTPStatus.NOT_FOUND)):
+                with self.subTest(name=name, status=status):
+                    self.assertEqual(client.get(url).status_code, status)
+
+    def test_redirect_for_anonymous_client(self):
+        """Анонимный пользователь перенаправляется на страницу входа."""
+        login_url = reverse('users:login')
+        for url in (reverse('notes:list'), self.detail_url):
+            with self.subTest(url=url):
+                response = Client().get(url)
+                self.assertRedirects(response, f'{login_url}?next={url}')
+
+    def test_list_shows_only_own_notes(self):
+        """В списке только заметки пользователя."""
+        response = self.reader_client.get(reverse('notes:list'))
+        self.assertEqual(len(response.context['object_list']), 0)
+        response = self.auth_client.get(reverse('notes:list'))
+        self.assertEqual(list(response.context['object_list']), [self.note])
+
+    def test_create_edit_delete(self):
+        """Автор создаёт, редактирует и удаляет заметку."""
+        success_url = reverse('notes:success')
+        response = self.auth_client.post(reverse('notes:add'), {
+            'title': 'Новая', 'text': 'Текст', 'slug': 'novaya'
+        })
+        self.assertRedirects(response, success_url)
+        note = Note.objects.get(slug='novaya', author=self.author)
+        response = self.auth_client.post(
+            reverse('notes:edit', args=(note.slug,)),
+            {'title': 'Новая', 'text': 'Другой текст', 'slug': 'novaya'}
+        )
+        self.assertRedirects(response, success_url)
+        note.refresh_from_db()
+        self.assertEqual(note.text, 'Другой текст')
+        response = self.auth_client.post(
+            reverse('notes:delete', args=(note.slug,))
+        )
+        self.assertRedirects(response, success_url)
+        self.assertFalse(Note.objects.filter(pk=note.pk).exists())
+
+    def test_duplicate_slug_is_rejected(self):
+        """Форма отклоняет занятый slug."""
+        response = self.auth_client.post(reverse('notes:add'), {
+            'title': 'Новая', 'text': 'Текст', 'slug': self.note.slug
+        })
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.context['form'].errors)
+
+    def test_conditional_get(self):
+        """Асинхронный просмотр отвечает 304 на совпавший ETag."""
+        etag = self.auth_client.get(self.detail_url)['ETag']
+        response = self.auth_client.get(self.detail_url,
+                                        HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_method_not_allowed(self):
+        """Просмотр заметки не принимает POST."""
+        response = self.auth_client.post(self.detail_url)
+        self.assertEqual(response.status_code, HTTPStatus.METHOD_NOT_ALLOWED)
+
+    async def test_asgi_handler(self):
+        """Страница заметки отдаётся через ASGI-обработчик."""
+        client = AsyncClient()
+        client.cookies = self.auth_client.cookies
+        response = await client.get(self.detail_url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, self.note.text)
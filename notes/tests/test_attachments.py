@@ -0,0 +1,234 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from notes.attachments import HashingFileUploadHandler, parse_range
+from notes.models import Attachment, Blob, Note
+
+
+User = get_user_model()
+
+CONTENT = b'0123456789abcdef'
+
+
+class TestParseRange(TestCase):
+    """Тестирование разбора заголовка Range."""
+
+    def test_ranges(self):
+        """Поддерживаются обычный, открытый и суффиксный диапазоны."""
+        for header, expected in (
+            ('bytes=2-5', (2, 5)),
+            ('bytes=4-', (4, 15)),
+            ('bytes=-3', (13, 15)),
+            ('bytes=10-100', (10, 15)),
+            ('bytes=16-', (None, None)),
+            ('bytes=5-2', None),
+            ('bytes=20-10', None),
+            ('bytes=0-1,4-5', None),
+            ('items=0-1', None),
+            (None, None),
+        ):
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 16), expected)
+
+
+class TestAttachments(TestCase):
+    """Тестирование вложений заметок."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media = tempfile.mkdtemp()
+        cls.media_settings = override_settings(MEDIA_ROOT=cls.media)
+        cls.media_settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media_settings.disable()
+        shutil.rmtree(cls.media, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        """Автор с двумя заметками и читатель со своей заметкой."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.reader = User.objects.create(username='Читатель')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+        for slug, author in (('first', cls.author), ('second', cls.author),
+                             ('other', cls.reader)):
+            Note.objects.create(title=slug, text='Текст', slug=slug,
+                                author=author)
+
+    def setUp(self):
+        cache.clear()
+
+    def upload(self, slug='first', client=None, content=CONTENT,
+               name='file.txt'):
+        return (client or self.auth_client).post(
+            reverse('notes:attach', args=(slug,)),
+            {'file': SimpleUploadedFile(name, content, 'text/plain')}
+        )
+
+    def download(self, attachment, client=None, **headers):
+        return (client or self.auth_client).get(
+            reverse('notes:attachment',
+                    args=(attachment.note.slug, attachment.pk)),
+            **headers
+        )
+
+    def test_upload_is_stored_by_hash(self):
+        """Файл хранится под своим SHA-256."""
+        response = self.upload()
+        self.assertRedirects(response, reverse('notes:attach',
+                                               args=('first',)))
+        attachment = Attachment.objects.get()
+        digest = hashlib.sha256(CONTENT).hexdigest()
+        self.assertEqual(attachment.blob.sha256, digest)
+        self.assertEqual(attachment.blob.size, len(CONTENT))
+        path = attachment.blob.file.path
+        self.assertTrue(path.endswith(f'{digest[:2]}/{digest[2:4]}/{digest}'))
+        with open(path, 'rb') as file:
+            self.assertEqual(file.read(), CONTENT)
+
+    def test_same_content_is_stored_once(self):
+        """Одинаковые файлы разных заметок и авторов — один объект."""
+        self.upload('first')
+        self.upload('second', name='copy.txt')
+        self.upload('other', client=self.reader_client)
+        self.assertEqual(Attachment.objects.count(), 3)
+        self.assertEqual(Blob.objects.count(), 1)
+        self.assertEqual(len(os.listdir(os.path.dirname(
+            Blob.objects.get().file.path
+        ))), 1)
+
+    def test_full_download(self):
+        """Без Range файл отдаётся целиком как вложение."""
+        self.upload()
+        response = self.download(Attachment.objects.get())
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment; filename="file.txt"')
+
+    def test_range_download(self):
+        """Диапазон отдаётся с кодом 206 и заголовком Content-Range."""
+        self.upload()
+        attachment = Attachment.objects.get()
+        response = self.download(attachment, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, HTTPStatus.PARTIAL_CONTENT)
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/16')
+        self.assertEqual(response['Content-Length'], '4')
+        response = self.download(attachment, HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(response.streaming_content), b'def')
+
+    def test_if_range_mismatch_returns_full_file(self):
+        """Устаревший If-Range отменяет диапазон."""
+        self.upload()
+        response = self.download(
+            Attachment.objects.get(), HTTP_RANGE='bytes=2-5',
+            HTTP_IF_RANGE='"другая-версия"'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_unsatisfiable_range(self):
+        """Диапазон за концом файла — 416."""
+        self.upload()
+        response = self.download(Attachment.objects.get(),
+                                 HTTP_RANGE='bytes=100-')
+        self.assertEqual(response.status_code,
+                         HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], 'bytes */16')
+
+    def test_other_author(self):
+        """Чужие заметки и вложения недоступны."""
+        self.upload()
+        attachment = Attachment.objects.get()
+        self.assertEqual(self.download(attachment, self.reader_client)
+                         .status_code, HTTPStatus.NOT_FOUND)
+        self.assertEqual(self.upload(client=self.reader_client).status_code,
+                         HTTPStatus.NOT_FOUND)
+        response = self.reader_client.post(reverse(
+            'notes:attachment_delete', args=('first', attachment.pk)
+        ))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_other_author_upload_is_not_read(self):
+        """Загрузка к чужой заметке отклоняется до приёма файла."""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.reader)
+        with mock.patch.object(
+                HashingFileUploadHandler, 'receive_data_chunk'
+        ) as receive:
+            response = self.upload(client=client)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        receive.assert_not_called()
+
+    @override_settings(NOTES_ATTACHMENT_MAX_SIZE=10)
+    def test_too_large(self):
+        """Слишком большой файл не сохраняется."""
+        response = self.upload()
+        self.assertEqual(response.status_code,
+                         HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        self.assertFalse(Blob.objects.exists())
+
+    def test_upload_requires_csrf(self):
+        """Загрузка проверяет CSRF, хотя обработчик меняется в view."""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.author)
+        self.assertEqual(self.upload(client=client).status_code,
+                         HTTPStatus.FORBIDDEN)
+
+    def test_blob_is_released_with_last_attachment(self):
+        """Содержимое удаляется вместе с последним вложением."""
+        self.upload('first')
+        self.upload('second')
+        path = Blob.objects.get().file.path
+        first, second = Attachment.objects.order_by('pk')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.auth_client.post(reverse(
+                'notes:attachment_delete', args=('first', first.pk)
+            ))
+        self.assertTrue(os.path.exists(path))
+        with self.captureOnCommitCallbacks(execute=True):
+            Note.objects.get(slug='second').delete()
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_detail_lists_attachments(self):
+        """Страница заметки ссылается на вложения."""
+        self.upload()
+        response = self.auth_client.get(reverse('notes:detail',
+                                                args=('first',)))
+        self.assertContains(response, 'file.txt')
+
+    def test_attachments_change_detail_etag(self):
+        """Загрузка и удаление вложения меняют ETag страницы заметки."""
+        url = reverse('notes:detail', args=('first',))
+        etag = self.auth_client.get(url)['ETag']
+        self.upload()
+        response = self.auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'file.txt')
+        attachment = Attachment.objects.get()
+        self.auth_client.post(reverse(
+            'notes:attachment_delete', args=('first', attachment.pk)
+        ))
+        response = self.auth_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'file.txt')
@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.auth import user_cache
+from notes.models import Note
+
+
+User = get_user_model()
+
+
+class TestCachedAuthentication(TestCase):
+    """Тестирование быстрой аутентификации."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора и заметки."""
+        cls.author = User.objects.create_user(
+            username='Иванов Иван', password='пароль-1'
+        )
+        Note.objects.create(
+            title='Заметка', text='Текст', slug='zametka', author=cls.author
+        )
+        cls.url = reverse('notes:detail', args=('zametka',))
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.client.login(username='Иванов Иван', password='пароль-1')
+
+    def get_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        return response, [query['sql'] for query in context.captured_queries]
+
+    def test_session_and_user_are_cached(self):
+        """Повторный запрос не читает ни сессию, ни пользователя."""
+        self.get_queries()
+        response, queries = self.get_queries()
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([sql for sql in queries if 'auth_user' in sql
+                          or 'django_session' in sql])
+
+    @override_settings(NOTES_USER_CACHE_TTL=0)
+    def test_cache_can_be_disabled(self):
+        """С нулевым временем жизни пользователь читается каждый раз."""
+        self.get_queries()
+        _, queries = self.get_queries()
+        self.assertTrue([sql for sql in queries if 'auth_user' in sql])
+
+    def test_password_change_ends_session(self):
+        """После смены пароля старая сессия недействительна."""
+        self.get_queries()
+        author = User.objects.get(pk=self.author.pk)
+        author.set_password('пароль-2')
+        author.save()
+        response, _ = self.get_queries()
+        self.assertRedirects(
+            response, f'{reverse("users:login")}?next={self.url}'
+        )
+
+    def test_logout(self):
+        """После выхода сессия не находит пользователя."""
+        self.get_queries()
+        self.client.post(reverse('users:logout'))
+        response, _ = self.get_queries()
+        self.assertEqual(response.status_code, 302)
+
+    def test_other_process_is_invalidated_by_version(self):
+        """Запись сбрасывается версией из общего кэша без сигнала."""
+        self.get_queries()
+        cache.clear()
+        _, queries = self.get_queries()
+        self.assertTrue([sql for sql in queries if 'auth_user' in sql])
+
+    def test_note_changes_keep_cached_user(self):
+        """Правка заметок не сбрасывает пользователя из кэша."""
+        self.get_queries()
+        Note.objects.create(title='Ещё заметка', text='Текст',
+                            slug='eshche', author=self.author)
+        _, queries = self.get_queries()
+        self.assertFalse([sql for sql in queries if 'auth_user' in sql])
+
+    def test_deleted_user_is_not_authenticated(self):
+        """Удалённый пользователь не берётся из кэша."""
+        url = reverse('notes:list')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        User.objects.filter(pk=self.author.pk).delete()
+        response = self.client.get(url)
+        self.assertRedirects(response, f'{reverse("users:login")}?next={url}')
@@ -0,0 +1,74 @@
+from django.test import TestCase
+
+from notes.benchmarks import load_scenarios
+from notes.benchmarks.harness import compare, percentile
+
+
+class TestBenchmarkHarness(TestCase):
+    """Тестирование инструментов замеров."""
+
+    def test_percentile(self):
+        """Перцентиль считается по ближайшему рангу."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+
+    def test_compare_reports_regressions(self):
+        """Рост числа запросов и времени сверх допуска — регрессия."""
+        baseline = {'notes:list': {'p95_ms': 10, 'queries_per_request': 3}}
+        report = {'notes:list': {'p95_ms': 12, 'queries_per_request': 3}}
+        self.assertEqual(compare(report, baseline, tolerance=0.25), [])
+        report['notes:list'] = {'p95_ms': 20, 'queries_per_request': 4}
+        self.assertEqual(len(compare(report, baseline, tolerance=0.25)), 2)
+
+    def test_views_scenario(self):
+        """Сценарий страниц выполняется и отчитывается по каждой."""
+        report = load_scenarios()['views'](users=2, notes=3, requests=4)
+        self.assertEqual(set(report), {
+            'notes:list', 'notes:detail', 'notes:add', 'notes:edit',
+            'notes:delete',
+        })
+        for row in report.values():
+            self.assertEqual(row['requests'], 4)
+            self.assertGreater(row['queries_per_request'], 0)
+
+    def test_compression_scenario(self):
+        """Сжатие уменьшает объём текстов на синтетическом корпусе."""
+        report = load_scenarios()['compression'](
+            users=1, notes=20, requests=2
+        )
+        self.assertEqual(set(report), {'plain', 'zlib'})
+        self.assertLess(report['zlib']['text_kb'], report['plain']['text_kb'])
+
+    def test_auth_scenario(self):
+        """Кэш сессий и пользователей убирает запросы аутентификации."""
+        report = load_scenarios()['auth'](users=1, notes=3, requests=2)
+        for name in ('notes:list', 'notes:detail'):
+            plain = report[f'{name} db']['queries_per_request']
+            for profile in ('cached_db', 'signed_cookies'):
+                self.assertLess(
+                    report[f'{name} {profile}']['queries_per_request'], plain
+                )
+
+    def test_tags_scenario(self):
+        """Сценарий меток отчитывается по каждому размеру и условию."""
+        report = load_scenarios()['tags'](users=1, notes=20, requests=2)
+        self.assertEqual(len(report), 8)
+        for row in report.values():
+            self.assertEqual(row['queries_per_request'], 2)
+
+    def test_archive_scenario(self):
+        """Потоковая выгрузка требует меньше памяти, чем сборка целиком."""
+        report = load_scenarios()['archive'](users=1, notes=20, requests=1)
+        self.assertEqual(len(report), 6)
+        self.assertLess(report['200 notes, zip stream']['peak_traced_kb'],
+                        report['200 notes, zip in memory']['peak_traced_kb'])
+
+    def test_rendering_scenario(self):
+        """Сценарий отрисовки отчитывается по показу и заполнению HTML."""
+        report = load_scenarios()['rendering'](users=1, notes=3, requests=2)
+        self.assertEqual(len(report), 4)
+        self.assertLessEqual({
+            'detail stored html', 'render on read', 'render_notes workers=1',
+        }, set(report))
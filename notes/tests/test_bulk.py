@@ -0,0 +1,125 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from notes.bulk import import_notes, parse_lines
+from notes.models import Note
+
+
+User = get_user_model()
+
+
+def to_lines(*records):
+    return '\n'.join(json.dumps(record) for record in records) + '\n'
+
+
+class TestBulkImportExport(TestCase):
+    """Тестирование массового импорта и экспорта заметок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора, его клиента и заметки."""
+        cls.author = User.objects.create(username='author')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.note = Note.objects.create(
+            title='Заметка', text='Текст заметки', slug='zametka',
+            author=cls.author
+        )
+        cls.import_url = reverse('notes:import')
+        cls.export_url = reverse('notes:export')
+
+    def test_import_in_batches(self):
+        """Импорт создаёт заметки пачками и подбирает свободные slug."""
+        records = [{'title': 'Заметка', 'text': f'Текст {idx}'}
+                   for idx in range(5)]
+        with self.assertNumQueries(14):
+            # Каждая пачка: подбор slug, вставка, выборка id, постановка
+            # индексации в очередь и обновление сводки автора.
+            created = import_notes(
+                self.author, parse_lines(to_lines(*records).splitlines()),
+                batch_size=3
+            )
+        self.assertEqual(created, 5)
+        slugs = set(Note.objects.filter(author=self.author).values_list(
+            'slug', flat=True
+        ))
+        self.assertEqual(
+            slugs, {'zametka'} | {f'zametka-{idx}' for idx in range(2, 7)}
+        )
+
+    def test_import_endpoint_reads_body(self):
+        """Эндпоинт импорта принимает JSON Lines в теле запроса."""
+        response = self.auth_client.post(
+            self.import_url,
+            data=to_lines({'title': 'Новая', 'text': 'Текст',
+                           'slug': 'novaya'}),
+            content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.json(), {'created': 1})
+        self.assertTrue(Note.objects.filter(
+            slug='novaya', author=self.author
+        ).exists())
+
+    def test_import_endpoint_accepts_file(self):
+        """Эндпоинт импорта принимает загруженный файл."""
+        upload = SimpleUploadedFile(
+            'notes.jsonl', to_lines({'text': 'Текст'}).encode()
+        )
+        response = self.auth_client.post(self.import_url, {'file': upload})
+        self.assertEqual(response.json(), {'created': 1})
+
+    def test_import_reports_invalid_line(self):
+        """Ошибка в данных возвращается с номером строки."""
+        body = to_lines({'text': 'Текст'}) + '{не json}\n'
+        response = self.auth_client.post(
+            self.import_url, data=body, content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Строка 2', response.json()['error'])
+
+    def test_import_reports_invalid_encoding(self):
+        """Строка не в UTF-8 — ошибка данных, а не сбой сервера."""
+        body = (to_lines({'text': 'Текст'}).encode()
+                + 'Текст\n'.encode('cp1251'))
+        response = self.auth_client.post(
+            self.import_url, data=body, content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Строка 2', response.json()['error'])
+        self.assertEqual(response.json()['created'], 0)
+
+    def test_export_streams_only_own_notes(self):
+        """Экспорт построчно отдаёт только заметки пользователя."""
+        other = User.objects.create(username='other')
+        Note.objects.create(title='Чужая', text='Текст', slug='chuzhaya',
+                            author=other)
+        response = self.auth_client.get(self.export_url)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['slug'], self.note.slug)
+
+    def test_commands_round_trip(self):
+        """Выгрузка командой загружается обратно командой импорта."""
+        file = tempfile.NamedTemporaryFile(suffix='.jsonl', delete=False)
+        file.close()
+        self.addCleanup(os.remove, file.name)
+        call_command('export_notes', 'author', output=file.name)
+        target = User.objects.create(username='target')
+        call_command('import_notes', 'target', file.name, stdout=StringIO())
+        note = Note.objects.get(author=target)
+        self.assertEqual(note.text, self.note.text)
+        self.assertEqual(note.slug, 'zametka-2')
+
+    def test_command_unknown_user(self):
+        """Команда сообщает о неизвестном пользователе."""
+        with self.assertRaises(CommandError):
+            call_command('export_notes', 'nobody', stdout=StringIO())
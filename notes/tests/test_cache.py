@@ -0,0 +1,105 @@
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from notes.models import Note
+
+
+User = get_user_model()
+
+
+class TestPageCache(TestCase):
+    """Тестирование кэша страниц с заметками."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора, его клиента и заметки."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.note = Note.objects.create(
+            title='Заметка',
+            text='Текст заметки',
+            slug='zametka',
+            author=cls.author
+        )
+        cls.detail_url = reverse('notes:detail', args=(cls.note.slug,))
+        cls.list_url = reverse('notes:list')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_repeated_request_is_served_from_cache(self):
+        """Повторный запрос страницы не отрисовывает шаблон заново."""
+        for url in (self.detail_url, self.list_url):
+            with self.subTest(url=url):
+                first = self.auth_client.get(url)
+                self.assertIsNotNone(first.context)
+                second = self.auth_client.get(url)
+                self.assertIsNone(second.context)
+                self.assertEqual(second.content, first.content)
+
+    def test_edit_invalidates_cached_pages(self):
+        """Редактирование заметки сбрасывает её страницу и список."""
+        self.auth_client.get(self.detail_url)
+        self.auth_client.get(self.list_url)
+        self.auth_client.post(
+            reverse('notes:edit', args=(self.note.slug,)),
+            data={'title': 'Новый заголовок', 'text': 'Новый текст',
+                  'slug': self.note.slug}
+        )
+        self.assertContains(self.auth_client.get(self.detail_url),
+                            'Новый текст')
+        self.assertContains(self.auth_client.get(self.list_url),
+                            'Новый заголовок')
+
+    def test_delete_invalidates_cached_pages(self):
+        """Удаление заметки сбрасывает её страницу и список."""
+        self.auth_client.get(self.detail_url)
+        self.auth_client.get(self.list_url)
+        self.auth_client.post(reverse('notes:delete', args=(self.note.slug,)))
+        response = self.auth_client.get(self.detail_url)
+        self.assertEqual(response.status_code, 404)
+        self.assertNotContains(self.auth_client.get(self.list_url), 'Заметка')
+
+    def test_cache_is_per_user(self):
+        """Закэшированная страница не отдаётся другому пользователю."""
+        self.auth_client.get(self.detail_url)
+        reader = User.objects.create(username='Читатель')
+        reader_client = Client()
+        reader_client.force_login(reader)
+        response = reader_client.get(self.detail_url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_cursor_is_part_of_key(self):
+        """Разные страницы списка кэшируются по отдельности."""
+        self.auth_client.get(self.list_url)
+        response = self.auth_client.get(self.list_url, {'after': 'MQ'})
+        self.assertIsNotNone(response.context)
+
+
+class TestFileBasedPageCache(TestPageCache):
+    """Тестирование кэша страниц в файловом бэкенде."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.cache_dir = tempfile.mkdtemp()
+        cls.settings_override = override_settings(CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.'
+                           'FileBasedCache',
+                'LOCATION': cls.cache_dir,
+            }
+        })
+        cls.settings_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.settings_override.disable()
+        shutil.rmtree(cls.cache_dir, ignore_errors=True)
@@ -0,0 +1,133 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from notes.compression import recompress_notes
+from notes.fields import RAW, ZLIB, compress_text, decompress_text
+from notes.models import Note
+
+
+User = get_user_model()
+
+LONG_TEXT = 'Длинный текст заметки. ' * 100
+
+
+def stored_text(note):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT text FROM notes_note WHERE id = %s', [note.id])
+        return cursor.fetchone()[0]
+
+
+class TestCompressText(SimpleTestCase):
+    """Тестирование формата хранения текста."""
+
+    def test_short_text_is_stored_raw(self):
+        """Текст короче порога хранится без сжатия."""
+        packed = compress_text('Текст', threshold=256)
+        self.assertEqual(packed, RAW + 'Текст'.encode())
+        self.assertEqual(decompress_text(packed), 'Текст')
+
+    def test_long_text_is_compressed(self):
+        """Длинный текст сжимается и читается обратно."""
+        packed = compress_text(LONG_TEXT, threshold=256)
+        self.assertEqual(packed[:1], ZLIB)
+        self.assertLess(len(packed), len(LONG_TEXT.encode()) // 10)
+        self.assertEqual(decompress_text(memoryview(packed)), LONG_TEXT)
+
+    def test_incompressible_text_is_stored_raw(self):
+        """Несжимаемый текст хранится как есть."""
+        self.assertEqual(compress_text('Текст', threshold=1)[:1], RAW)
+
+    def test_legacy_string_is_read_as_is(self):
+        """Строки, записанные до сжатия, читаются как есть."""
+        self.assertEqual(decompress_text('Старый текст'), 'Старый текст')
+
+    def test_legacy_bytes_are_read_as_text(self):
+        """Байты без маркера читаются как текст в UTF-8."""
+        self.assertEqual(
+            decompress_text('Старый текст'.encode()), 'Старый текст'
+        )
+
+    def test_legacy_bytes_starting_with_marker(self):
+        """Прежний текст, начинающийся с байта маркера сжатия, читается."""
+        text = '\x01Старый текст'
+        self.assertEqual(decompress_text(text.encode()), text)
+
+
+class TestCompressedStorage(TestCase):
+    """Тестирование сжатого хранения текстов заметок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора и заметок."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.long_note = Note.objects.create(
+            title='Длинная', text=LONG_TEXT, author=cls.author
+        )
+        cls.short_note = Note.objects.create(
+            title='Короткая', text='Текст', author=cls.author
+        )
+
+    def test_round_trip(self):
+        """Длинный текст хранится сжатым и прозрачно читается."""
+        self.assertEqual(bytes(stored_text(self.long_note))[:1], ZLIB)
+        self.assertEqual(bytes(stored_text(self.short_note))[:1], RAW)
+        note = Note.objects.get(pk=self.long_note.pk)
+        self.assertEqual(note.text, LONG_TEXT)
+        self.assertEqual(
+            list(Note.objects.filter(pk=self.long_note.pk).values_list(
+                'text', flat=True
+            )),
+            [LONG_TEXT]
+        )
+
+    def test_list_does_not_load_text(self):
+        """Список заметок не читает сжатые тексты."""
+        with self.assertNumQueries(1) as context:
+            list(Note.objects.for_list())
+        self.assertNotIn('"text"', context.captured_queries[0]['sql'])
+
+    def test_recompress_legacy_rows(self):
+        """Несжатые строки после миграции переписываются пачками."""
+        with connection.cursor() as cursor:
+            cursor.execute('UPDATE notes_note SET text = %s', [LONG_TEXT])
+        self.assertIsInstance(stored_text(self.long_note), str)
+        updated = Note.objects.get(pk=self.long_note.pk).updated
+        with CaptureQueriesContext(connection) as context:
+            stats = recompress_notes(batch_size=1)
+        updates = [query for query in context.captured_queries
+                   if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual((stats.scanned, stats.rewritten), (2, 2))
+        self.assertLess(stats.bytes_after, stats.bytes_before // 10)
+        self.assertEqual(bytes(stored_text(self.short_note))[:1], ZLIB)
+        note = Note.objects.get(pk=self.long_note.pk)
+        self.assertEqual((note.text, note.updated), (LONG_TEXT, updated))
+        self.assertEqual(recompress_notes().rewritten, 0)
+
+    def test_recompress_legacy_bytes(self):
+        """Байты без маркера читаются и переписываются в новом формате."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE notes_note SET text = %s WHERE id = %s',
+                [connection.Database.Binary(LONG_TEXT.encode()),
+                 self.long_note.pk]
+            )
+        self.assertEqual(Note.objects.get(pk=self.long_note.pk).text,
+                         LONG_TEXT)
+        self.assertEqual(recompress_notes().rewritten, 1)
+        self.assertEqual(bytes(stored_text(self.long_note))[:1], ZLIB)
+        self.assertEqual(Note.objects.get(pk=self.long_note.pk).text,
+                         LONG_TEXT)
+
+    @override_settings(NOTES_TEXT_COMPRESS_THRESHOLD=None)
+    def test_command_follows_settings(self):
+        """Команда переписывает тексты по текущему порогу."""
+        out = StringIO()
+        call_command('compress_notes', stdout=out)
+        self.assertIn('переписано: 1', out.getvalue())
+        self.assertEqual(bytes(stored_text(self.long_note))[:1], RAW)
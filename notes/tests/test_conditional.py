@@ -0,0 +1,87 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from notes.models import Note
+
+
+User = get_user_model()
+
+
+class TestConditionalGet(TestCase):
+    """Тестирование условных запросов к страницам заметок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора, его клиента и заметки."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.note = Note.objects.create(
+            title='Заметка',
+            text='Текст заметки',
+            slug='zametka',
+            author=cls.author
+        )
+        cls.detail_url = reverse('notes:detail', args=(cls.note.slug,))
+        cls.list_url = reverse('notes:list')
+
+    def test_note_has_timestamps(self):
+        """У заметки заполняются время создания и изменения."""
+        self.assertIsNotNone(self.note.created)
+        self.assertGreaterEqual(self.note.updated, self.note.created)
+
+    def test_unchanged_pages_return_not_modified(self):
+        """Неизменившиеся страницы отдаются с кодом 304."""
+        for url in (self.detail_url, self.list_url):
+            with self.subTest(url=url):
+                etag = self.auth_client.get(url)['ETag']
+                response = self.auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code,
+                                 HTTPStatus.NOT_MODIFIED)
+
+    def test_detail_last_modified(self):
+        """Страница заметки поддерживает If-Modified-Since."""
+        last_modified = self.auth_client.get(self.detail_url)['Last-Modified']
+        response = self.auth_client.get(
+            self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_changes_update_etag(self):
+        """Изменение и удаление заметки меняют ETag страниц."""
+        detail_etag = self.auth_client.get(self.detail_url)['ETag']
+        list_etag = self.auth_client.get(self.list_url)['ETag']
+        self.note.text = 'Новый текст'
+        self.note.save()
+        response = self.auth_client.get(
+            self.detail_url, HTTP_IF_NONE_MATCH=detail_etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        response = self.auth_client.get(
+            self.list_url, HTTP_IF_NONE_MATCH=list_etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        list_etag = response['ETag']
+        Note.objects.create(title='Другая', text='Текст', slug='drugaya',
+                            author=self.author).delete()
+        response = self.auth_client.get(
+            self.list_url, HTTP_IF_NONE_MATCH=list_etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.note.delete()
+        response = self.auth_client.get(
+            self.list_url, HTTP_IF_NONE_MATCH=list_etag
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_etag_is_per_user(self):
+        """Значение ETag одного пользователя не подходит другому."""
+        etag = self.auth_client.get(self.list_url)['ETag']
+        reader = User.objects.create(username='Читатель')
+        reader_client = Client()
+        reader_client.force_login(reader)
+        response = reader_client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
@@ -1,9 +1,16 @@
+from http import HTTPStatus
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from notes.forms import NoteForm
 from notes.models import Note
+from notes.pagination import encode_cursor
+from notes.views import NotesList
 
 
 User = get_user_model()
@@ -42,7 +49,7 @@ class TestListPage(TestCase):
         """Тест вывода записей без пагинации."""
         url = reverse('notes:list')
         response = self.auth_client.get(url)
-        notes_count = response.context['object_list'].count()
+        notes_count = len(response.context['object_list'])
         self.assertEqual(notes_count, self.TEST_NOTES_COUNT)
 
     def test_user_can_see_only_own_notes(self):
@@ -51,7 +58,7 @@ class TestListPage(TestCase):
         response = self.auth_other_user.get(url)
         notes = response.context['object_list']
         # Ползователь получил только свою заметку.
-        self.assertEqual(notes.count(), 1)
+        self.assertEqual(len(notes), 1)
         note = notes[0]
         # Заголовок заметки соответствует созданной им заметки.
         self.assertEqual(note.title, self.note_other_user.title)
@@ -89,3 +96,117 @@ class TestAddNote(TestCase):
                 response = self.auth_client.get(url)
                 self.assertIn('form', response.context)
                 self.assertIsInstance(response.context['form'], NoteForm)
+
+
+class TestListPagination(TestCase):
+    """Тестирование постраничного вывода списка по курсору."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора и заметок больше, чем помещается на страницу."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.page_size = NotesList.paginate_by
+        Note.objects.bulk_create(Note(
+            title=f'Заметка {idx}',
+            text='Текст заметки',
+            slug=f'zametka_{idx}',
+            author=cls.author
+        ) for idx in range(cls.page_size + 5))
+        cls.url = reverse('notes:list')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_first_page_has_next_cursor(self):
+        """Первая страница ограничена и содержит курсор следующей."""
+        response = self.auth_client.get(self.url)
+        page = response.context['page_obj']
+        self.assertEqual(len(response.context['object_list']), self.page_size)
+        self.assertTrue(page.has_next())
+        self.assertContains(response, f'?after={page.next_cursor}')
+
+    def test_next_page_continues_after_cursor(self):
+        """Следующая страница начинается сразу после курсора."""
+        first = self.auth_client.get(self.url).context
+        response = self.auth_client.get(
+            self.url, {'after': first['page_obj'].next_cursor}
+        )
+        notes = response.context['object_list']
+        self.assertEqual(len(notes), 5)
+        self.assertGreater(notes[0].id, first['object_list'][-1].id)
+        self.assertFalse(response.context['page_obj'].has_next())
+
+    def test_cursor_is_stable_after_delete(self):
+        """Удаление заметок не сдвигает уже выданный курсор."""
+        first = self.auth_client.get(self.url).context
+        last_seen = first['object_list'][-1]
+        Note.objects.filter(id__lte=last_seen.id).delete()
+        response = self.auth_client.get(
+            self.url, {'after': first['page_obj'].next_cursor}
+        )
+        self.assertEqual(len(response.context['object_list']), 5)
+
+    def test_page_query_count_does_not_depend_on_cursor(self):
+        """Любая страница стоит одинаковое число запросов."""
+        first = self.auth_client.get(self.url).context
+        cursor = first['page_obj'].next_cursor
+        cache.clear()
+        with CaptureQueriesContext(connection) as first_page:
+            self.auth_client.get(self.url)
+        cache.clear()
+        with CaptureQueriesContext(connection) as next_page:
+            self.auth_client.get(self.url, {'after': cursor})
+        self.assertEqual(len(first_page), len(next_page))
+
+    def test_invalid_cursor(self):
+        """Некорректный курсор приводит к 404."""
+        response = self.auth_client.get(self.url, {'after': '!!!'})
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_out_of_range_cursor(self):
+        """Курсор вне диапазона ключей приводит к 404."""
+        for value in (0, -1, 2 ** 63, 10 ** 30):
+            with self.subTest(value=value):
+                response = self.auth_client.get(
+                    self.url, {'after': encode_cursor(value)}
+                )
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+
+class TestListQuery(TestCase):
+    """Тестирование запроса, которым выбирается список заметок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора, его клиента и заметки."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        Note.objects.create(
+            title='Заметка',
+            text='Очень длинный текст заметки',
+            slug='zametka',
+            author=cls.author
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_list_does_not_select_text(self):
+        """Список заметок не выбирает из БД текст заметки."""
+        url = reverse('notes:list')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.auth_client.get(url)
+        self.assertContains(response, 'Заметка')
+        select_clauses = [
+            query['sql'].split(' FROM ')[0]
+            for query in queries.captured_queries
+            if 'FROM "notes_note"' in query['sql']
+        ]
+        self.assertTrue(any(
+            '"notes_note"."title"' in clause for clause in select_clauses
+        ))
+        for clause in select_clauses:
+            self.assertNotIn('"notes_note"."text"', clause)
@@ -1,4 +1,5 @@
 from http import HTTPStatus
+from unittest import mock
 
 from pytils.translit import slugify
 
@@ -8,6 +9,7 @@ from django.urls import reverse
 
 from notes.forms import WARNING
 from notes.models import Note
+from notes.slugs import BASES_PER_QUERY, allocate_slug, allocate_slugs
 
 
 NOTE_TITLE = 'Заметка'
@@ -159,3 +161,95 @@ class TestNoteEditDelete(TestCase):
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.note.refresh_from_db()
         self.assertEqual(self.note.text, NOTE_TEXT)
+
+
+class TestSlugAllocation(TestCase):
+    """Тестирование подбора уникального slug."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора и его клиента."""
+        cls.author = User.objects.create(username='Автор заметки')
+        cls.auth_author = Client()
+        cls.auth_author.force_login(cls.author)
+        cls.base = slugify(NOTE_TITLE)
+
+    def create_note(self):
+        return Note.objects.create(
+            title=NOTE_TITLE, text=NOTE_TEXT, author=self.author
+        )
+
+    def test_same_title_gets_numbered_suffix(self):
+        """Заметки с одинаковым заголовком получают суффиксы."""
+        slugs = [self.create_note().slug for _ in range(3)]
+        self.assertEqual(
+            slugs, [self.base, f'{self.base}-2', f'{self.base}-3']
+        )
+
+    def test_form_without_slug_allows_duplicate_title(self):
+        """Форма без slug не отклоняет повторяющийся заголовок."""
+        self.create_note()
+        form_data = {'title': NOTE_TITLE, 'text': NOTE_TEXT}
+        response = self.auth_author.post(reverse('notes:add'), data=form_data)
+        self.assertRedirects(response, reverse('notes:success'))
+        self.assertTrue(
+            Note.objects.filter(slug=f'{self.base}-2').exists()
+        )
+
+    def test_edit_without_slug_keeps_it(self):
+        """Очищенный при правке slug подбирается без учёта самой заметки."""
+        note = self.create_note()
+        response = self.auth_author.post(
+            reverse('notes:edit', args=(note.slug,)),
+            data={'title': NOTE_TITLE, 'text': 'Новый текст', 'slug': ''}
+        )
+        self.assertRedirects(response, reverse('notes:success'))
+        note.refresh_from_db()
+        self.assertEqual(note.slug, self.base)
+
+    def test_similar_slugs_are_ignored(self):
+        """Slug с той же основой, но без номера, не мешают подбору."""
+        Note.objects.create(title='Другая', text=NOTE_TEXT,
+                            slug=f'{self.base}-zametka', author=self.author)
+        self.assertEqual(self.create_note().slug, self.base)
+
+    def test_allocation_costs_one_query(self):
+        """Подбор slug выполняется одним запросом."""
+        self.create_note()
+        with self.assertNumQueries(1):
+            allocate_slug(Note.objects.all(), self.base, 100)
+
+    def test_retry_after_concurrent_insert(self):
+        """Slug, занятый параллельной вставкой, подбирается заново."""
+        self.create_note()
+        calls = []
+
+        def stale_allocate(queryset, base, max_length):
+            # Первый вызов не видит вставку «параллельного» запроса.
+            calls.append(base)
+            if len(calls) == 1:
+                return base
+            return allocate_slug(queryset, base, max_length)
+
+        with mock.patch('notes.models.allocate_slug', stale_allocate):
+            note = self.create_note()
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(note.slug, f'{self.base}-2')
+
+    def test_long_title_keeps_max_length(self):
+        """Суффикс не выводит slug за пределы максимальной длины."""
+        title = 'я' * 100
+        first = Note.objects.create(title=title, text=NOTE_TEXT,
+                                    author=self.author)
+        second = Note.objects.create(title=title, text=NOTE_TEXT,
+                                     author=self.author)
+        self.assertEqual(len(first.slug), 100)
+        self.assertLessEqual(len(second.slug), 100)
+        self.assertNotEqual(first.slug, second.slug)
+
+    def test_many_bases_are_split_into_queries(self):
+        """Большой список основ проверяется несколькими запросами."""
+        bases = [f'zametka-{idx}-x' for idx in range(BASES_PER_QUERY + 1)]
+        with self.assertNumQueries(2):
+            slugs = allocate_slugs(Note.objects.all(), bases, 100)
+        self.assertEqual(slugs, bases)
@@ -0,0 +1,126 @@
+import shutil
+import tempfile
+import threading
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from notes.metrics import registry
+from notes.models import Note
+
+
+User = get_user_model()
+
+
+class TestMetrics(TestCase):
+    """Тестирование сбора показателей запросов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора и его заметки."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.note = Note.objects.create(
+            title='Заметка', text='Текст заметки', slug='zametka',
+            author=cls.author
+        )
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def get_client(self):
+        # Цепочка промежуточных слоёв собирается при первом запросе.
+        client = Client()
+        client.force_login(self.author)
+        return client
+
+    @override_settings(NOTES_METRICS_ENABLED=True)
+    def test_views_are_measured(self):
+        """Показатели копятся по именам маршрутов."""
+        client = self.get_client()
+        client.get(reverse('notes:list'))
+        client.get(reverse('notes:detail', args=(self.note.slug,)))
+        snapshot = registry.snapshot()
+        stats = snapshot['notes:list']
+        self.assertEqual(stats['requests'], 1)
+        self.assertGreater(stats['queries'], 0)
+        self.assertGreater(stats['render_seconds'], 0)
+        self.assertGreaterEqual(stats['wall_seconds'], stats['db_seconds'])
+        self.assertIn('notes:detail', snapshot)
+
+    @override_settings(NOTES_METRICS_ENABLED=True)
+    def test_prometheus_endpoint(self):
+        """Эндпоинт отдаёт показатели в формате Prometheus."""
+        client = self.get_client()
+        client.get(reverse('notes:list'))
+        response = client.get(reverse('notes:metrics'))
+        content = response.content.decode()
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(
+            'notes_request_duration_seconds_count{view="notes:list"} 1',
+            content
+        )
+        self.assertIn('notes_db_queries_total{view="notes:list"}', content)
+
+    def test_disabled_middleware_is_not_used(self):
+        """Выключенный сбор ничего не записывает и скрывает эндпоинт."""
+        client = self.get_client()
+        client.get(reverse('notes:list'))
+        self.assertEqual(registry.snapshot(), {})
+        response = client.get(reverse('notes:metrics'))
+        self.assertEqual(response.status_code, 404)
+
+    def test_report_command(self):
+        """Команда выводит показатели, сохранённые процессами."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        with override_settings(NOTES_METRICS_ENABLED=True):
+            self.get_client().get(reverse('notes:list'))
+        registry.flush(directory)
+        out = StringIO()
+        call_command('metrics_report', dir=directory, stdout=out)
+        self.assertIn('notes:list', out.getvalue())
+
+    def test_concurrent_flushes(self):
+        """Параллельные сбросы не мешают друг другу."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        registry.record('notes:list', 0.01, 0, 1, 0, 0)
+        errors = []
+
+        def flush():
+            try:
+                for _ in range(20):
+                    registry.flush(directory)
+            except OSError as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=flush) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            [path.suffix for path in Path(directory).iterdir()], ['.json']
+        )
+
+    def test_flush_error_does_not_break_request(self):
+        """Ошибка записи показателей пишется в лог, а запрос выполняется."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        # Каталог показателей не создать: на его месте файл.
+        path = Path(directory) / 'metrics'
+        path.write_text('')
+        with override_settings(NOTES_METRICS_ENABLED=True,
+                               NOTES_METRICS_DIR=str(path),
+                               NOTES_METRICS_FLUSH_INTERVAL=0):
+            with self.assertLogs('notes.metrics', 'WARNING'):
+                response = self.get_client().get(reverse('notes:list'))
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,150 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes.models import Note
+from notes.ratelimit import get_cache, hit, parse_rate
+
+User = get_user_model()
+
+
+class CountingCache:
+    """Кэш, считающий обращения к себе."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self.cache, name)
+
+        def call(*args, **kwargs):
+            self.calls.append(name)
+            return method(*args, **kwargs)
+        return call
+
+
+class TestSlidingWindow(TestCase):
+    """Тестирование счётчика скользящего окна."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        """Лимит разбирается в число запросов и длину окна."""
+        self.assertEqual(parse_rate('30/m'), (30, 60))
+        self.assertEqual(parse_rate('5/h'), (5, 3600))
+        self.assertEqual(parse_rate('10/5s'), (10, 5))
+        for rate in ('30', '0/m', 'x/m', '5/w', '5/xm'):
+            with self.subTest(rate=rate), self.assertRaises(ValueError):
+                parse_rate(rate)
+
+    def test_limit_in_window(self):
+        """Запросы сверх лимита получают время ожидания до конца окна."""
+        for _ in range(3):
+            self.assertIsNone(hit('scope', 'client', 3, 60, now=600))
+        self.assertEqual(hit('scope', 'client', 3, 60, now=610), 80)
+        self.assertIsNone(hit('scope', 'other', 3, 60, now=610))
+
+    def test_previous_window_slides_out(self):
+        """Запросы прошлого окна учитываются по доле его остатка."""
+        for _ in range(4):
+            hit('scope', 'client', 4, 60, now=630)
+        # В начале окна предыдущие запросы учитываются целиком.
+        self.assertEqual(hit('scope', 'client', 4, 60, now=660), 30)
+        # К середине окна — наполовину: 2 прежних и 2 текущих.
+        self.assertIsNone(hit('scope', 'client', 4, 60, now=690))
+        self.assertIsNotNone(hit('scope', 'client', 4, 60, now=690))
+
+    def test_one_cache_call_per_request(self):
+        """Кроме первого запроса окна, запрос — это один incr."""
+        counting = CountingCache(get_cache())
+        with mock.patch('notes.ratelimit.get_cache', return_value=counting):
+            hit('scope', 'client', 10, 60, now=600)
+            self.assertEqual(counting.calls, ['incr', 'get', 'add', 'incr'])
+            counting.calls.clear()
+            hit('scope', 'client', 10, 60, now=601)
+            hit('scope', 'client', 10, 60, now=602)
+        self.assertEqual(counting.calls, ['incr', 'incr'])
+
+
+@override_settings(NOTES_RATE_LIMITS={'notes-write': '2/m', 'signup': '1/h'})
+class TestRateLimitedViews(TestCase):
+    """Тестирование ограничения изменяющих запросов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора и заметки."""
+        cls.author = User.objects.create(username='Лев Толстой')
+        cls.reader = User.objects.create(username='Читатель простой')
+        Note.objects.create(
+            title='Заголовок', text='Текст', slug='zametka', author=cls.author
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.author)
+
+    def add_note(self, idx):
+        return self.client.post(reverse('notes:add'), {
+            'title': f'Заметка {idx}', 'text': 'Текст', 'slug': f'note-{idx}',
+        })
+
+    def test_writes_over_limit(self):
+        """Третья запись за минуту получает 429 с Retry-After."""
+        for idx in range(2):
+            self.assertEqual(self.add_note(idx).status_code, 302)
+        response = self.client.post(reverse('notes:edit', args=('zametka',)))
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response['Retry-After']), 1)
+        self.assertEqual(Note.objects.count(), 3)
+
+    def test_reads_are_not_limited(self):
+        """Чтение не расходует и не ограничивается лимитом записи."""
+        for idx in range(2):
+            self.add_note(idx)
+        for name, args in (('notes:list', ()), ('notes:add', ()),
+                           ('notes:detail', ('zametka',))):
+            response = self.client.get(reverse(name, args=args))
+            self.assertEqual(response.status_code, 200)
+
+    @override_settings(ROOT_URLCONF='notes.async_urls')
+    def test_async_views(self):
+        """Асинхронные представления ограничиваются так же."""
+        for idx in range(2):
+            self.assertEqual(self.add_note(idx).status_code, 302)
+        response = self.client.post(reverse('notes:delete', args=('zametka',)))
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(Note.objects.filter(slug='zametka').exists())
+
+    def test_users_are_limited_separately(self):
+        """У каждого пользователя свой счётчик."""
+        for idx in range(3):
+            self.add_note(idx)
+        self.client.force_login(self.reader)
+        self.assertEqual(self.add_note('reader').status_code, 302)
+
+    def test_api_answers_json(self):
+        """API отвечает на превышение лимита в JSON."""
+        url = reverse('api:notes')
+        for idx in range(3):
+            response = self.client.post(
+                url, {'title': 'Заметка', 'text': 'Текст', 'slug': f'a-{idx}'},
+                content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['retry_after'],
+                         int(response['Retry-After']))
+
+    def test_signup_limited_by_address(self):
+        """Регистрация ограничивается по адресу клиента."""
+        self.client.logout()
+        url = reverse('users:signup')
+        for _ in range(2):
+            response = self.client.post(url, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 429)
+        response = self.client.post(url, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 200)
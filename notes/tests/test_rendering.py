@@ -0,0 +1,165 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from notes.bulk import import_notes
+from notes.markup import render_html, text_hash
+from notes.models import Note
+from notes.rendering import render_notes
+
+User = get_user_model()
+
+
+class TestMarkdown(TestCase):
+    """Тестирование отрисовки Markdown."""
+
+    def test_markdown_is_rendered(self):
+        """Разметка Markdown превращается в HTML."""
+        html = render_html('# Заголовок\n\n**жирный** и `код`\n\n- пункт')
+        self.assertIn('<h1>Заголовок</h1>', html)
+        self.assertIn('<strong>жирный</strong>', html)
+        self.assertIn('<code>код</code>', html)
+        self.assertIn('<li>пункт</li>', html)
+
+    def test_dangerous_markup_is_removed(self):
+        """Скрипты, обработчики событий и javascript-ссылки удаляются."""
+        html = render_html(
+            '<script>alert(1)</script> <img src="x.png" onerror="alert(1)">'
+            '\n\n[ссылка](javascript:alert(1)) <iframe src="/"></iframe>'
+        )
+        for fragment in ('<script', 'onerror', 'javascript:', '<iframe'):
+            with self.subTest(fragment=fragment):
+                self.assertNotIn(fragment, html)
+
+    def test_hash_depends_on_render_version(self):
+        """Смена версии отрисовки меняет хэш."""
+        digest = text_hash('Текст')
+        with mock.patch('notes.markup.RENDER_VERSION', 2):
+            self.assertNotEqual(text_hash('Текст'), digest)
+
+
+class TestStoredHtml(TestCase):
+    """Тестирование HTML, сохраняемого вместе с заметкой."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора и заметки."""
+        cls.author = User.objects.create(username='Лев Толстой')
+        cls.note = Note.objects.create(
+            title='Заголовок', text='**Текст**', slug='zametka',
+            author=cls.author
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_html_is_rendered_on_save(self):
+        """HTML отрисовывается при сохранении и меняется вместе с текстом."""
+        note = Note.objects.get(pk=self.note.pk)
+        self.assertEqual(note.text_html, '<p><strong>Текст</strong></p>')
+        self.assertEqual(note.text_hash, text_hash('**Текст**'))
+        note.text = '*Новый текст*'
+        note.save(update_fields=['text'])
+        note.refresh_from_db()
+        self.assertEqual(note.text_html, '<p><em>Новый текст</em></p>')
+
+    def test_unchanged_text_is_not_rendered(self):
+        """Сохранение без изменения текста не отрисовывает его заново."""
+        note = Note.objects.get(pk=self.note.pk)
+        note.title = 'Новый заголовок'
+        with mock.patch('notes.models.render_html') as render:
+            note.save()
+        render.assert_not_called()
+
+    def test_detail_shows_html(self):
+        """Страница заметки выводит сохранённый HTML."""
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('notes:detail', args=('zametka',)))
+        self.assertContains(response, '<strong>Текст</strong>', html=True)
+
+    def test_import_renders_html(self):
+        """Загруженные пачкой заметки тоже получают HTML."""
+        import_notes(self.author, [{'title': 'А', 'text': '_б_', 'slug': ''}])
+        note = Note.objects.get(title='А')
+        self.assertEqual(note.text_html, '<p><em>б</em></p>')
+
+
+class TestRenderNotes(TestCase):
+    """Тестирование заполнения HTML для сохранённых заметок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление заметок, сохранённых без HTML."""
+        cls.author = User.objects.create(username='Лев Толстой')
+        for idx in range(5):
+            Note.objects.create(
+                title=f'Заметка {idx}', text=f'# Раздел {idx}',
+                slug=f'note-{idx}', author=cls.author
+            )
+        Note.objects.filter(slug__in=('note-1', 'note-3')).update(
+            text_html='', text_hash=''
+        )
+
+    def test_stale_notes_are_rendered(self):
+        """Отрисовываются только заметки без актуального HTML."""
+        updated = dict(Note.objects.values_list('slug', 'updated'))
+        stats = render_notes(batch_size=2, workers=1)
+        self.assertEqual((stats.scanned, stats.rendered), (5, 2))
+        for note in Note.objects.all():
+            with self.subTest(slug=note.slug):
+                self.assertIn('<h1>Раздел', note.text_html)
+                if note.slug in ('note-1', 'note-3'):
+                    self.assertGreater(note.updated, updated[note.slug])
+                else:
+                    self.assertEqual(note.updated, updated[note.slug])
+        self.assertEqual(render_notes(workers=1).rendered, 0)
+
+    def test_rendering_changes_etag(self):
+        """После отрисовки страница заметки не отдаётся как неизменная."""
+        self.client.force_login(self.author)
+        url = reverse('notes:detail', args=('note-1',))
+        etag = self.client.get(url)['ETag']
+        render_notes(workers=1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, '<h1>Раздел 1</h1>', html=True)
+
+    def test_rendering_changes_last_modified(self):
+        """После отрисовки If-Modified-Since не даёт 304."""
+        Note.objects.filter(slug='note-1').update(
+            updated=timezone.now() - timedelta(days=1)
+        )
+        self.client.force_login(self.author)
+        url = reverse('notes:detail', args=('note-1',))
+        last_modified = self.client.get(url)['Last-Modified']
+        render_notes(workers=1)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertContains(response, '<h1>Раздел 1</h1>', html=True)
+
+    def test_process_pool(self):
+        """Команда отрисовывает заметки в нескольких процессах."""
+        out = StringIO()
+        call_command('render_notes', '--workers', '2', stdout=out)
+        self.assertIn('отрисовано: 2', out.getvalue())
+        self.assertFalse(Note.objects.filter(text_html='').exists())
+
+    def test_edited_note_is_kept(self):
+        """HTML заметки, изменённой во время отрисовки, не затирается."""
+        def render(text):
+            Note.objects.get(slug='note-1').save()
+            return '<p>устаревший HTML</p>'
+
+        note = Note.objects.get(slug='note-1')
+        note.text = 'Новый текст'
+        note.save(update_fields=['text'])
+        Note.objects.filter(pk=note.pk).update(text_hash='')
+        with mock.patch('notes.rendering.render_html', render):
+            render_notes(workers=1)
+        note.refresh_from_db()
+        self.assertEqual(note.text_html, '<p>Новый текст</p>')
@@ -0,0 +1,153 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from notes.middleware import PIN_COOKIE
+from notes.models import Attachment, Blob, Note, NoteTag, Tag
+from notes.routers import (
+    PrimaryReplicaRouter, pinned, replica_read, wrote
+)
+
+
+User = get_user_model()
+
+
+@override_settings(NOTES_READ_REPLICAS=['replica'])
+class TestPrimaryReplicaRouter(SimpleTestCase):
+    """Тестирование маршрутизатора реплик."""
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        for var in (pinned, wrote, replica_read):
+            self.addCleanup(var.reset, var.set(False))
+
+    def test_reads_go_to_replica(self):
+        """Заметки читаются с реплики, прочие модели — нет."""
+        self.assertEqual(self.router.db_for_read(Note), 'replica')
+        self.assertIsNone(self.router.db_for_read(User))
+
+    def test_write_pins_to_primary(self):
+        """После записи чтение идёт в основную базу."""
+        self.assertEqual(self.router.db_for_write(Note), DEFAULT_DB_ALIAS)
+        self.assertIsNone(self.router.db_for_read(Note))
+
+    def test_other_apps_write_where_django_decides(self):
+        """Для моделей других приложений база записи не навязывается."""
+        self.assertIsNone(self.router.db_for_write(User))
+
+    def test_no_migrations_on_replica(self):
+        """Миграции на реплику не применяются."""
+        self.assertFalse(self.router.allow_migrate('replica', 'notes'))
+        self.assertIsNone(self.router.allow_migrate('default', 'notes'))
+
+
+@override_settings(NOTES_READ_REPLICAS=['replica'])
+class TestReplicaReads(TestCase):
+    """Чтение с отстающей реплики в отдельном файле SQLite."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Заметка в основной базе и её устаревшая копия на реплике.
+
+        Реплика подключается после настройки TestCase, поэтому живёт
+        вне его транзакций и удаляется вместе с файлом.
+        """
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        connections.databases['replica'] = {
+            **connections[DEFAULT_DB_ALIAS].settings_dict,
+            'NAME': str(Path(cls.directory) / 'replica.sqlite3'),
+        }
+        with connections['replica'].schema_editor() as editor:
+            for model in (User, Note, Tag, NoteTag, Blob, Attachment):
+                editor.create_model(model)
+        User.objects.using('replica').bulk_create([cls.author])
+        Note.objects.using('replica').bulk_create([Note(
+            id=cls.note.id,
+            title=cls.note.title,
+            text='Текст с реплики',
+            slug=cls.note.slug,
+            author=cls.author
+        )])
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.databases['replica']
+        shutil.rmtree(cls.directory, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора и заметки."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.note = Note.objects.create(
+            title='Заметка',
+            text='Текст с основной базы',
+            slug='zametka',
+            author=cls.author
+        )
+        cls.detail_url = reverse('notes:detail', args=(cls.note.slug,))
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def test_read_from_replica(self):
+        """Без записи заметка читается с реплики."""
+        response = self.client.get(self.detail_url)
+        self.assertContains(response, 'Текст с реплики')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_replica_page_is_not_cached(self):
+        """Страница с реплики не кэшируется и обновляется, когда та догонит."""
+        self.assertContains(self.client.get(self.detail_url),
+                            'Текст с реплики')
+        replica = Note.objects.using('replica').filter(pk=self.note.pk)
+        replica.update(text='Текст с основной базы')
+        self.addCleanup(replica.update, text='Текст с реплики')
+        self.assertContains(self.client.get(self.detail_url),
+                            'Текст с основной базы')
+
+    def test_read_your_writes(self):
+        """После записи автор читает из основной базы."""
+        response = self.client.post(
+            reverse('notes:edit', args=(self.note.slug,)),
+            data={
+                'title': self.note.title,
+                'text': 'Новый текст',
+                'slug': self.note.slug,
+            }
+        )
+        self.assertRedirects(response, reverse('notes:success'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+        response = self.client.get(self.detail_url)
+        self.assertContains(response, 'Новый текст')
+
+    def test_pin_expires(self):
+        """Просроченная отметка не закрепляет за основной базой."""
+        self.client.cookies[PIN_COOKIE] = 'invalid'
+        response = self.client.get(self.detail_url)
+        self.assertContains(response, 'Текст с реплики')
+
+    def test_note_from_replica_is_saved_to_primary(self):
+        """Заметка, прочитанная с реплики, сохраняется в основную базу."""
+        note = Note.objects.using('replica').get(pk=self.note.pk)
+        note.title = 'Сохранена в основную базу'
+        note.save()
+        self.assertEqual(note._state.db, DEFAULT_DB_ALIAS)
+        self.assertEqual(
+            Note.objects.using(DEFAULT_DB_ALIAS).get(pk=note.pk).title,
+            'Сохранена в основную базу'
+        )
+        self.assertEqual(
+            Note.objects.using('replica').get(pk=note.pk).title, 'Заметка'
+        )
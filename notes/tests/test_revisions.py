@@ -0,0 +1,132 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note, NoteRevision
+from notes.revisions import apply_delta, get_revision, make_delta
+
+
+User = get_user_model()
+
+
+class TestDelta(SimpleTestCase):
+    """Тестирование построчной разницы."""
+
+    def test_round_trip(self):
+        """Новый текст восстанавливается из старого и разницы."""
+        old = 'первая\nвторая\nтретья\n'
+        for new in ('первая\nновая\nтретья\n', '', 'третья', old + 'ещё'):
+            with self.subTest(new=new):
+                self.assertEqual(apply_delta(old, make_delta(old, new)), new)
+
+    def test_unchanged_lines_are_referenced(self):
+        """Неизменённые строки хранятся ссылкой на диапазон."""
+        old = ''.join(f'строка {idx}\n' for idx in range(100))
+        new = old.replace('строка 50\n', 'изменено\n')
+        self.assertEqual(
+            make_delta(old, new), [[0, 50], 'изменено\n', [51, 100]]
+        )
+
+
+@override_settings(NOTES_REVISION_SNAPSHOT_EVERY=3)
+class TestRevisionHistory(TestCase):
+    """Тестирование истории правок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора, читателя и заметки."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.reader = User.objects.create(username='Читатель')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+        cls.note = Note.objects.create(
+            title='Заметка', text='Версия 1\nКонец\n', slug='zametka',
+            author=cls.author
+        )
+
+    def edit(self, version):
+        note = Note.objects.get(pk=self.note.pk)
+        note.text = f'Версия {version}\nКонец\n'
+        note.save()
+
+    def test_edits_are_stored_as_deltas_and_snapshots(self):
+        """Каждая K-я версия — снимок, остальные — разницы."""
+        for version in range(2, 9):
+            self.edit(version)
+        revisions = list(self.note.revisions.order_by('number'))
+        self.assertEqual(
+            [revision.base for revision in revisions], [1, 1, 1, 4, 4, 4, 7]
+        )
+        for number in range(1, 8):
+            with self.subTest(number=number):
+                with self.assertNumQueries(1):
+                    revision = get_revision(self.note, number)
+                self.assertEqual(revision.text, f'Версия {number}\nКонец\n')
+
+    def test_unchanged_save_adds_nothing(self):
+        """Сохранение без изменений не добавляет версию."""
+        note = Note.objects.get(pk=self.note.pk)
+        with CaptureQueriesContext(connection) as context:
+            note.save()
+        self.assertFalse(any(
+            'notes_noterevision' in query['sql']
+            for query in context.captured_queries
+        ))
+        self.assertFalse(self.note.revisions.exists())
+
+    def test_note_without_loaded_text(self):
+        """Прежний текст читается из базы, если не был загружен."""
+        note = Note.objects.only('id', 'title').get(pk=self.note.pk)
+        note.title = 'Новый заголовок'
+        note.save()
+        revision = get_revision(self.note, 1)
+        self.assertEqual(revision.title, 'Заметка')
+        self.assertEqual(revision.text, 'Версия 1\nКонец\n')
+
+    def test_history_and_restore(self):
+        """Автор видит историю и восстанавливает версию."""
+        self.edit(2)
+        response = self.auth_client.get(
+            reverse('notes:history', args=(self.note.slug,))
+        )
+        self.assertContains(response, 'Версия 1')
+        url = reverse('notes:revision', args=(self.note.slug, 1))
+        self.assertContains(self.auth_client.get(url), 'Версия 1')
+        response = self.auth_client.post(url)
+        self.assertRedirects(response, reverse('notes:success'))
+        self.assertEqual(
+            Note.objects.get(pk=self.note.pk).text, 'Версия 1\nКонец\n'
+        )
+        self.assertEqual(
+            get_revision(self.note, 2).text, 'Версия 2\nКонец\n'
+        )
+
+    def test_other_user_cant_see_history(self):
+        """Чужая история правок недоступна."""
+        self.edit(2)
+        for url in (
+            reverse('notes:history', args=(self.note.slug,)),
+            reverse('notes:revision', args=(self.note.slug, 1)),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.reader_client.get(url).status_code,
+                                 HTTPStatus.NOT_FOUND)
+        self.reader_client.post(
+            reverse('notes:revision', args=(self.note.slug, 1))
+        )
+        self.assertEqual(
+            Note.objects.get(pk=self.note.pk).text, 'Версия 2\nКонец\n'
+        )
+
+    def test_missing_revision(self):
+        """Несуществующая версия — 404."""
+        url = reverse('notes:revision', args=(self.note.slug, 5))
+        self.assertEqual(self.auth_client.get(url).status_code,
+                         HTTPStatus.NOT_FOUND)
+        self.assertFalse(NoteRevision.objects.exists())
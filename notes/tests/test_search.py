@@ -0,0 +1,108 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from notes.bulk import import_notes
+from notes.models import Note
+from notes.search import FTS_TABLE, search_notes
+
+
+User = get_user_model()
+
+
+@override_settings(NOTES_TASKS_EAGER=True)
+class TestSearch(TestCase):
+    """Тестирование полнотекстового поиска по заметкам."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление двух авторов и их заметок."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.in_title = Note.objects.create(
+            title='Рецепт борща', text='Свёкла, капуста, картофель',
+            slug='borsch', author=cls.author
+        )
+        cls.in_text = Note.objects.create(
+            title='Покупки', text='Купить свёклу для борща и хлеб',
+            slug='pokupki', author=cls.author
+        )
+        cls.other = User.objects.create(username='Другой')
+        Note.objects.create(title='Чужой борщ', text='Тоже борщ',
+                            slug='chuzhoy', author=cls.other)
+
+    def test_results_are_ranked(self):
+        """Совпадение в заголовке ранжируется выше совпадения в тексте."""
+        results = search_notes(self.author, 'борщ')
+        self.assertEqual(
+            [result.id for result in results],
+            [self.in_title.id, self.in_text.id]
+        )
+
+    def test_results_are_filtered_by_author(self):
+        """Поиск не находит чужие заметки."""
+        results = search_notes(self.other, 'борщ')
+        self.assertEqual([result.slug for result in results], ['chuzhoy'])
+
+    def test_author_is_matched_by_index(self):
+        """Автор отбирается индексом, а запрос ищется только в тексте."""
+        results = search_notes(self.author, f'u{self.author.pk}')
+        self.assertEqual(results, [])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+                [f'author:u{self.other.pk}']
+            )
+            self.assertEqual(cursor.fetchone(), (1,))
+
+    def test_snippet_is_highlighted_and_escaped(self):
+        """Сниппет подсвечивает совпадение и экранирует HTML."""
+        Note.objects.create(title='Разметка', text='<b>хлеб</b> и соль',
+                            slug='razmetka', author=self.author)
+        result = search_notes(self.author, 'соль')[0]
+        self.assertIn('<mark>соль</mark>', result.snippet)
+        self.assertIn('&lt;b&gt;', result.snippet)
+
+    def test_index_follows_changes(self):
+        """Индекс обновляется при изменении и удалении заметки."""
+        self.in_text.text = 'Купить молоко'
+        self.in_text.save()
+        self.assertEqual(len(search_notes(self.author, 'борщ')), 1)
+        self.assertEqual(len(search_notes(self.author, 'молоко')), 1)
+        self.in_text.delete()
+        self.assertEqual(search_notes(self.author, 'молоко'), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Служебные символы FTS5 в запросе не вызывают ошибок."""
+        self.assertEqual(search_notes(self.author, 'борщ" OR ("'), [])
+
+    def test_prefix_search(self):
+        """Последнее слово запроса ищется как префикс."""
+        self.assertEqual(len(search_notes(self.author, 'покуп')), 1)
+
+    def test_search_page(self):
+        """Страница поиска выводит найденные заметки."""
+        response = self.auth_client.get(reverse('notes:search'),
+                                        {'q': 'борщ'})
+        self.assertContains(response, self.in_title.title)
+        self.assertNotContains(response, 'Чужой борщ')
+
+    def test_rebuild_command(self):
+        """Команда пересобирает индекс с нуля."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        self.assertEqual(search_notes(self.author, 'борщ'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(search_notes(self.author, 'борщ')), 2)
+
+    def test_imported_notes_are_indexed(self):
+        """Заметки, созданные массовым импортом, попадают в индекс."""
+        import_notes(self.author, [
+            {'title': 'Импорт', 'text': 'Окрошка на квасе', 'slug': ''}
+        ])
+        self.assertEqual(len(search_notes(self.author, 'окрошка')), 1)
@@ -0,0 +1,58 @@
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase
+
+from yanote.db.sqlite3.base import DatabaseWrapper
+
+
+class TestTunedSQLiteBackend(SimpleTestCase):
+    """Тестирование настроенного бэкенда SQLite."""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = str(Path(directory) / 'db.sqlite3')
+
+    def get_wrapper(self, **options):
+        wrapper = DatabaseWrapper({
+            **connection.settings_dict,
+            'NAME': self.path,
+            'OPTIONS': options,
+        }, alias='tuned')
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_are_applied(self):
+        """При подключении включаются WAL и прочие PRAGMA."""
+        wrapper = self.get_wrapper(pragmas={'cache_size': -1000})
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 5000)
+        self.assertEqual(self.pragma(wrapper, 'cache_size'), -1000)
+
+    def test_transaction_takes_write_lock(self):
+        """Транзакция сразу берёт блокировку записи."""
+        wrapper = self.get_wrapper()
+        with wrapper.cursor() as cursor:
+            cursor.execute('CREATE TABLE t (id INTEGER)')
+        wrapper._start_transaction_under_autocommit()
+        self.addCleanup(wrapper.connection.rollback)
+        other = sqlite3.connect(self.path, timeout=0)
+        self.addCleanup(other.close)
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'locked'):
+            other.execute('BEGIN IMMEDIATE')
+
+    def test_unknown_transaction_mode(self):
+        """Неизвестный режим транзакций отклоняется."""
+        with self.assertRaises(ImproperlyConfigured):
+            self.get_wrapper(transaction_mode='LAZY')
@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from notes.bulk import import_notes
+from notes.models import Note, UserNoteStats
+from notes.stats import get_stats
+
+
+User = get_user_model()
+
+
+class TestNoteStats(TestCase):
+    """Тестирование сводки по заметкам пользователя."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора, его клиента и заметки."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.note = Note.objects.create(
+            title='Заметка', text='Текст', slug='zametka', author=cls.author
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_stats(self, count, text_bytes):
+        stats = get_stats(self.author)
+        self.assertEqual((stats.note_count, stats.text_bytes),
+                         (count, text_bytes))
+
+    def test_stats_follow_changes(self):
+        """Сводка меняется при создании, изменении и удалении."""
+        self.assert_stats(1, len('Текст'.encode()))
+        note = Note.objects.get(pk=self.note.pk)
+        note.text = 'Новый текст'
+        note.save()
+        self.assert_stats(1, len('Новый текст'.encode()))
+        self.assertEqual(get_stats(self.author).last_modified, note.updated)
+        Note.objects.create(title='Вторая', text='abc', author=self.author)
+        self.assert_stats(2, len('Новый текст'.encode()) + 3)
+        note.delete()
+        self.assert_stats(1, 3)
+
+    def test_import_updates_stats(self):
+        """Импорт учитывается в сводке."""
+        import_notes(self.author, [{'title': 'Импорт', 'text': 'abcd',
+                                    'slug': ''}] * 3)
+        self.assert_stats(4, len('Текст'.encode()) + 12)
+
+    def test_delete_with_drifted_stats(self):
+        """Удаление заметки при обнулённой сводке не опускает её ниже нуля."""
+        UserNoteStats.objects.update(note_count=0, text_bytes=0)
+        response = self.auth_client.post(
+            reverse('notes:delete', args=(self.note.slug,))
+        )
+        self.assertRedirects(response, reverse('notes:success'))
+        self.assert_stats(0, 0)
+
+    def test_reconcile(self):
+        """Команда пересчитывает сводку после расхождения."""
+        UserNoteStats.objects.update(note_count=100, text_bytes=0)
+        out = StringIO()
+        call_command('reconcile_note_stats', stdout=out)
+        self.assertIn('пользователей: 1', out.getvalue())
+        self.assert_stats(1, len('Текст'.encode()))
+
+    def test_user_deletion(self):
+        """Удаление пользователя удаляет и его сводку."""
+        self.author.delete()
+        self.assertFalse(UserNoteStats.objects.exists())
+
+    def test_pages_show_stats(self):
+        """Главная и список показывают сводку одним запросом."""
+        for name in ('notes:home', 'notes:list'):
+            with self.subTest(name=name):
+                response = self.auth_client.get(reverse(name))
+                self.assertContains(response, 'Заметок: 1')
+        with self.assertNumQueries(1):
+            # Сессия и пользователь берутся из кэша, остаётся сводка.
+            self.auth_client.get(reverse('notes:home'))
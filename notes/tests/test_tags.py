@@ -0,0 +1,147 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from notes.models import Note, Tag
+from notes.tags import filter_by_tags, set_tags, tag_cloud
+
+
+User = get_user_model()
+
+
+class TestNoteTags(TestCase):
+    """Тестирование меток заметок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Автор с заметками: a, a+b, b+c; у читателя своя метка a."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.reader = User.objects.create(username='Читатель')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.notes = {}
+        for slug, tags in (('one', ['a']), ('two', ['a', 'b']),
+                           ('three', ['b', 'c'])):
+            note = Note.objects.create(
+                title=slug, text='Текст', slug=slug, author=cls.author
+            )
+            set_tags(note, tags, created=True)
+            cls.notes[slug] = note
+        note = Note.objects.create(
+            title='Чужая', text='Текст', slug='other', author=cls.reader
+        )
+        set_tags(note, ['a'], created=True)
+        cls.list_url = reverse('notes:list')
+
+    def setUp(self):
+        cache.clear()
+
+    def listed(self, query):
+        response = self.auth_client.get(f'{self.list_url}?{query}')
+        return {note.slug for note in response.context['object_list']}
+
+    def test_filter_all_tags(self):
+        """По умолчанию нужны все перечисленные метки."""
+        self.assertEqual(self.listed('tag=a'), {'one', 'two'})
+        self.assertEqual(self.listed('tag=a&tag=b'), {'two'})
+        self.assertEqual(self.listed('tag=a&tag=missing'), set())
+
+    @override_settings(NOTES_TAG_JOIN_LIMIT=0)
+    def test_filter_all_tags_without_join(self):
+        """Отбор без перебора связей редкой метки даёт то же самое."""
+        self.assertEqual(self.listed('tag=a&tag=b'), {'two'})
+
+    def test_filter_any_tag(self):
+        """С match=any достаточно любой метки, неизвестные пропускаются."""
+        self.assertEqual(self.listed('tag=a&tag=c&match=any'),
+                         {'one', 'two', 'three'})
+        self.assertEqual(self.listed('tag=c&tag=missing&match=any'),
+                         {'three'})
+
+    def test_form_sets_tags(self):
+        """Метки задаются в форме и пересчитываются в облаке."""
+        url = reverse('notes:edit', args=('one',))
+        response = self.auth_client.get(url)
+        self.assertEqual(response.context['form'].initial['tags'], 'a')
+        self.auth_client.post(url, {
+            'title': 'one', 'text': 'Текст', 'slug': 'one',
+            'tags': ' C, d,c ',
+        })
+        self.assertEqual(tag_cloud(self.author),
+                         [('a', 1), ('b', 2), ('c', 2), ('d', 1)])
+
+    def test_form_rejects_too_many_tags(self):
+        """Слишком много меток — ошибка формы."""
+        response = self.auth_client.post(reverse('notes:add'), {
+            'title': 'Новая', 'text': 'Текст',
+            'tags': ','.join(str(idx) for idx in range(21)),
+        })
+        self.assertFormError(response, 'form', 'tags',
+                             'Не больше 20 меток у заметки')
+
+    def test_delete_updates_cloud(self):
+        """Удаление заметки вычитается из счётчиков меток."""
+        Note.objects.get(slug='two').delete()
+        response = self.auth_client.get(reverse('notes:tags'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response.json(), {'tags': [
+            {'name': 'a', 'count': 1},
+            {'name': 'b', 'count': 1},
+            {'name': 'c', 'count': 1},
+        ]})
+
+    def test_drifted_counts_stay_non_negative(self):
+        """Правка и удаление при обнулённых счётчиках не дают ошибки."""
+        Tag.objects.update(note_count=0)
+        self.auth_client.post(reverse('notes:edit', args=('two',)), {
+            'title': 'two', 'text': 'Текст', 'slug': 'two', 'tags': 'c',
+        })
+        response = self.auth_client.post(
+            reverse('notes:delete', args=('three',))
+        )
+        self.assertRedirects(response, reverse('notes:success'))
+        self.assertEqual(
+            set(Tag.objects.values_list('note_count', flat=True)), {0}
+        )
+
+    def test_cloud_is_one_query(self):
+        """Облако читается из счётчиков одним запросом."""
+        with self.assertNumQueries(1):
+            tag_cloud(self.author)
+
+    def test_filter_reads_only_indexes(self):
+        """Связи с метками читаются только из покрывающих индексов."""
+        queryset = Note.objects.filter(author=self.author).for_list()
+        for match_all in (True, False):
+            with self.subTest(match_all=match_all):
+                plan = filter_by_tags(
+                    queryset, self.author, ['a', 'b'], match_all
+                ).explain()
+                links = [line for line in plan.splitlines()
+                         if 'notetag' in line or ' U0 ' in line]
+                self.assertTrue(links)
+                for line in links:
+                    self.assertIn('COVERING INDEX', line)
+
+    def test_next_page_keeps_filter(self):
+        """Ссылка на следующую страницу сохраняет отбор по меткам."""
+        for idx in range(55):
+            note = Note.objects.create(
+                title=f'Ещё {idx}', text='Текст', author=self.author
+            )
+            set_tags(note, ['c'], created=True)
+        response = self.auth_client.get(f'{self.list_url}?tag=c')
+        self.assertContains(response, '?tag=c&amp;after=')
+
+    def test_reconcile(self):
+        """Команда пересчитывает счётчики меток."""
+        Tag.objects.update(note_count=7)
+        call_command('reconcile_note_stats', stdout=StringIO())
+        self.assertEqual(tag_cloud(self.author),
+                         [('a', 2), ('b', 2), ('c', 1)])
+        self.assertEqual(tag_cloud(self.reader), [('a', 1)])
@@ -0,0 +1,123 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from notes.models import Note, Task
+from notes.search import search_notes
+from notes.tasks import claim, complete, enqueue, run_pending, task
+
+
+User = get_user_model()
+
+calls = []
+
+
+@task('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task('tests.fail', max_attempts=2)
+def fail():
+    raise RuntimeError('сбой')
+
+
+class TestTaskQueue(TestCase):
+    """Тестирование очереди фоновых задач."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_task_runs_in_worker(self):
+        """Задача выполняется обработчиком и удаляется из очереди."""
+        enqueue('tests.record', 1)
+        self.assertEqual(calls, [])
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(NOTES_TASKS_EAGER=True)
+    def test_eager_mode(self):
+        """В немедленном режиме задача выполняется при постановке."""
+        enqueue('tests.record', 1)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Task.objects.exists())
+
+    def test_idempotency_key(self):
+        """Ожидающая задача с тем же ключом не дублируется."""
+        enqueue('tests.record', 1, key='record')
+        enqueue('tests.record', 2, key='record')
+        self.assertEqual(Task.objects.count(), 1)
+        claim()
+        enqueue('tests.record', 3, key='record')
+        self.assertEqual(Task.objects.filter(status=Task.PENDING).count(), 1)
+
+    def test_retries_then_fails(self):
+        """Упавшая задача повторяется с задержкой, затем помечается."""
+        enqueue('tests.fail')
+        with self.assertLogs('notes.tasks', 'WARNING') as logs:
+            run_pending()
+        self.assertIn('RuntimeError: сбой', logs.output[0])
+        failed = Task.objects.get()
+        self.assertEqual((failed.status, failed.attempts), (Task.PENDING, 1))
+        self.assertGreater(failed.run_after, timezone.now())
+        self.assertIn('сбой', failed.last_error)
+        self.assertEqual(run_pending(), 0)
+        Task.objects.update(run_after=timezone.now())
+        with self.assertLogs('notes.tasks', 'WARNING'):
+            run_pending()
+        failed = Task.objects.get()
+        self.assertEqual((failed.status, failed.attempts), (Task.FAILED, 2))
+
+    def test_retry_with_pending_duplicate(self):
+        """Повтор не мешает задаче с тем же ключом, поставленной позже."""
+        enqueue('tests.fail', key='fail')
+        claimed = claim()
+        enqueue('tests.fail', key='fail')
+        with self.assertLogs('notes.tasks', 'WARNING'):
+            complete(claimed[0], 'RuntimeError: сбой')
+        pending = Task.objects.get()
+        self.assertEqual((pending.status, pending.attempts), (Task.PENDING, 0))
+        self.assertNotEqual(pending.pk, claimed[0].pk)
+
+    def test_abandoned_task_is_reclaimed(self):
+        """Задачу упавшего обработчика берут снова после аренды."""
+        enqueue('tests.record', 1)
+        claim()
+        self.assertEqual(run_pending(), 0)
+        Task.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(calls, [1])
+
+    def test_search_index_is_updated_by_worker(self):
+        """Индексация заметки выполняется вне запроса."""
+        author = User.objects.create(username='Иванов Иван')
+        note = Note.objects.create(
+            title='Рецепт борща', text='Свёкла', author=author
+        )
+        note.text = 'Капуста'
+        note.save()
+        self.assertEqual(search_notes(author, 'борщ'), [])
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(len(search_notes(author, 'капуста')), 1)
+
+
+class TestRunTasksCommand(TransactionTestCase):
+    """Тестирование команды обработчика задач."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_thread_pool(self):
+        """Команда выполняет задачи в пуле потоков и завершается."""
+        for value in range(5):
+            enqueue('tests.record', value)
+        out = StringIO()
+        call_command('run_tasks', once=True, workers=2, stdout=out)
+        self.assertIn('Выполнено задач: 5', out.getvalue())
+        self.assertEqual(sorted(calls), list(range(5)))
+        self.assertFalse(Task.objects.exists())
@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template import engines
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from notes.cache import bump_version
+from notes.models import Note
+from yanote.warmup import warm_up_templates
+
+
+User = get_user_model()
+
+
+class TestFragmentCache(TestCase):
+    """Тестирование кэша фрагментов страницы списка."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Добавление автора, его клиента и заметки."""
+        cls.author = User.objects.create(username='Иванов Иван')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.note = Note.objects.create(
+            title='Заметка', text='Текст', slug='zametka', author=cls.author
+        )
+        cls.list_url = reverse('notes:list')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_rows_are_reused(self):
+        """Неизменённая строка берётся из кэша фрагментов."""
+        self.auth_client.get(self.list_url)
+        Note.objects.filter(pk=self.note.pk).update(title='Без версии')
+        bump_version(self.author.pk)
+        response = self.auth_client.get(self.list_url)
+        self.assertContains(response, 'Заметка')
+        self.assertNotContains(response, 'Без версии')
+
+    def test_rows_follow_note_version(self):
+        """После изменения заметки её строка рендерится заново."""
+        self.auth_client.get(self.list_url)
+        self.note.title = 'Новый заголовок'
+        self.note.save()
+        response = self.auth_client.get(self.list_url)
+        self.assertContains(response, 'Новый заголовок')
+
+    def test_header_is_per_user(self):
+        """Шапка кэшируется отдельно для каждого пользователя."""
+        self.auth_client.get(self.list_url)
+        reader = User.objects.create(username='Читатель')
+        client = Client()
+        client.force_login(reader)
+        response = client.get(self.list_url)
+        self.assertContains(response, 'пользователя Читатель')
+
+
+class TestWarmUp(TestCase):
+    """Тестирование прогрева шаблонов."""
+
+    def test_templates_are_compiled(self):
+        """После прогрева шаблоны лежат в кэше загрузчика."""
+        loader = engines['django'].engine.template_loaders[0]
+        loader.reset()
+        self.assertGreater(warm_up_templates(), 0)
+        self.assertIn('notes/list.html', loader.get_template_cache)
+        self.assertIn('includes/header.html', loader.get_template_cache)
@@ -1,15 +1,56 @@
+from django.conf import settings
 from django.urls import path
 
-from notes import views
+from notes import async_views, views
 
 app_name = 'notes'
 
-urlpatterns = [
-    path('', views.Home.as_view(), name='home'),
-    path('add/', views.NoteCreate.as_view(), name='add'),
-    path('edit/<slug:slug>/', views.NoteUpdate.as_view(), name='edit'),
-    path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
-    path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
-    path('notes/', views.NotesList.as_view(), name='list'),
-    path('done/', views.NoteSuccess.as_view(), name='success'),
-]
+
+def get_urlpatterns(use_async=False):
+    """Маршруты заметок с синхронными или асинхронными представлениями."""
+    if use_async:
+        note_routes = [
+            path('', async_views.home, name='home'),
+            path('add/', async_views.note_create, name='add'),
+            path('edit/<slug:slug>/', async_views.note_update, name='edit'),
+            path('note/<slug:slug>/', async_views.note_detail,
+                 name='detail'),
+            path('delete/<slug:slug>/', async_views.note_delete,
+                 name='delete'),
+            path('notes/', async_views.notes_list, name='list'),
+            path('done/', async_views.success, name='success'),
+        ]
+    else:
+        note_routes = [
+            path('', views.Home.as_view(), name='home'),
+            path('add/', views.NoteCreate.as_view(), name='add'),
+            path('edit/<slug:slug>/', views.NoteUpdate.as_view(),
+                 name='edit'),
+            path('note/<slug:slug>/', views.NoteDetail.as_view(),
+                 name='detail'),
+            path('delete/<slug:slug>/', views.NoteDelete.as_view(),
+                 name='delete'),
+            path('notes/', views.NotesList.as_view(), name='list'),
+            path('done/', views.NoteSuccess.as_view(), name='success'),
+        ]
+    return note_routes + [
+        path('history/<slug:slug>/', views.NoteHistory.as_view(),
+             name='history'),
+        path('history/<slug:slug>/<int:number>/',
+             views.NoteRevisionView.as_view(), name='revision'),
+        path('note/<slug:slug>/attachments/',
+             views.NoteAttachments.as_view(), name='attach'),
+        path('note/<slug:slug>/attachments/<int:pk>/',
+             views.AttachmentDownload.as_view(), name='attachment'),
+        path('note/<slug:slug>/attachments/<int:pk>/delete/',
+             views.AttachmentDelete.as_view(), name='attachment_delete'),
+        path('search/', views.NotesSearch.as_view(), name='search'),
+        path('tags/', views.TagCloud.as_view(), name='tags'),
+        path('export/', views.NotesExport.as_view(), name='export'),
+        path('archive/', views.NotesArchive.as_view(), name='archive'),
+        path('import/', views.NotesImport.as_view(), name='import'),
+        path('metrics', views.Metrics.as_view(), name='metrics'),
+    ]
+
+
+urlpatterns = get_urlpatterns(settings.NOTES_ASYNC_VIEWS)
@@ -1,40 +1,129 @@
+import hashlib
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
+from django.db.models import Count, Max
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseRedirect, JsonResponse,
+    StreamingHttpResponse
+)
+from django.shortcuts import get_object_or_404
+from django.urls import reverse, reverse_lazy
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import condition
 
+from . import cache
+from .archive import ARCHIVE_FORMATS, export_archive
+from .attachments import (
+    HashingFileUploadHandler, RangeFile, attach, parse_range
+)
+from .bulk import NoteImportError, export_notes, import_notes, parse_lines
+from .metrics import registry, render_prometheus
 from .forms import NoteForm
-from .models import Note
+from .models import Attachment, Note, NoteRevision
+from .pagination import CursorPaginator, InvalidCursor
+from .ratelimit import RateLimitMixin
+from .revisions import get_revision
+from .search import search_notes
+from .stats import get_stats
+from .tags import filter_by_query, filter_query, tag_cloud
+
+
+def _note_state(request, slug):
+    """Время изменения и хэш отрисованного текста заметки пользователя."""
+    if not hasattr(request, '_note_state'):
+        request._note_state = Note.objects.filter(
+            author=request.user, slug=slug
+        ).values_list('updated', 'text_hash').first()
+    return request._note_state
+
+
+def note_updated(request, slug):
+    """Время изменения заметки, если она принадлежит пользователю."""
+    state = _note_state(request, slug)
+    return state[0] if state else None
+
+
+def note_etag(request, slug):
+    # Хэш отрисованного текста отличает страницы, отрисованные
+    # разными версиями Markdown.
+    state = _note_state(request, slug)
+    if state is not None:
+        updated, digest = state
+        return f'"{request.user.pk}-{slug}-{updated.timestamp()}-{digest}"'
+
+
+def notes_list_etag(request):
+    """Метка списка: число заметок и время последнего изменения."""
+    state = Note.objects.filter(author=request.user).aggregate(
+        count=Count('id'), updated=Max('updated')
+    )
+    updated = state['updated'].timestamp() if state['updated'] else 0
+    digest = hashlib.md5(
+        f'{request.GET.urlencode()}:{state["count"]}:{updated}'.encode()
+    ).hexdigest()
+    return f'"{request.user.pk}-{digest}"'
 
 
 class Home(generic.TemplateView):
     """Домашняя страница."""
     template_name = 'notes/home.html'
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.request.user.is_authenticated:
+            context['stats'] = get_stats(self.request.user)
+        return context
+
 
 class NoteSuccess(LoginRequiredMixin, generic.TemplateView):
     """Страница успешного выполнения операции."""
     template_name = 'notes/success.html'
 
 
-class NoteBase(LoginRequiredMixin):
+class NoteBase(RateLimitMixin, LoginRequiredMixin):
     """Базовый класс для остальных CBV."""
     model = Note
     success_url = reverse_lazy('notes:success')
+    rate_limit_scope = 'notes-write'
 
     def get_queryset(self):
         """Пользователь может работать только со своими заметками."""
         return self.model.objects.filter(author=self.request.user)
 
 
+class NoteCacheMixin:
+    """Отдаёт страницу из кэша, пока заметки автора не изменились."""
+    cache_prefix = None
+
+    def get_cache_parts(self):
+        """Части ключа, отличающие страницы одного автора."""
+        return ()
+
+    def get(self, request, *args, **kwargs):
+        key = cache.page_key(
+            self.cache_prefix, request.user.pk, *self.get_cache_parts()
+        )
+        content = cache.get_page(key)
+        if content is not None:
+            return HttpResponse(content)
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200 and not response.cookies:
+            response.add_post_render_callback(
+                lambda rendered: cache.set_page(key, rendered.content)
+            )
+        return response
+
+
 class NoteCreate(NoteBase, generic.CreateView):
     """Добавление заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
@@ -49,11 +138,278 @@ class NoteDelete(NoteBase, generic.DeleteView):
     template_name = 'notes/delete.html'
 
 
-class NotesList(NoteBase, generic.ListView):
+# Last-Modified для списка не отдаётся: после удаления самой свежей
+# заметки максимальное время изменения уменьшается, и клиент с
+# If-Modified-Since получил бы устаревший список.
+@method_decorator(condition(etag_func=notes_list_etag), name='get')
+class NotesList(NoteCacheMixin, NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
+    cache_prefix = 'list'
+    paginate_by = 50
+    paginator_class = CursorPaginator
+    page_kwarg = 'after'
+
+    def get_queryset(self):
+        return filter_by_query(
+            super().get_queryset().for_list(), self.request.user,
+            self.request.GET
+        )
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['stats'] = get_stats(self.request.user)
+        context['filter_query'] = filter_query(self.request.GET)
+        return context
 
-class NoteDetail(NoteBase, generic.DetailView):
+    def get_cache_parts(self):
+        return (self.request.GET.urlencode(),)
+
+    def paginate_queryset(self, queryset, page_size):
+        """Постраничный вывод по курсору вместо номера страницы."""
+        paginator = self.get_paginator(queryset, page_size)
+        cursor = self.request.GET.get(self.page_kwarg)
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return self.paginator_class(queryset, per_page)
+
+
+@method_decorator(
+    condition(etag_func=note_etag, last_modified_func=note_updated),
+    name='get'
+)
+class NoteDetail(NoteCacheMixin, NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+    cache_prefix = 'detail'
+
+    def get_cache_parts(self):
+        return (self.kwargs[self.slug_url_kwarg],)
+
+
+class NoteHistory(NoteBase, generic.DetailView):
+    """История правок заметки."""
+    template_name = 'notes/history.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['revisions'] = self.object.revisions.only(
+            'number', 'base', 'title', 'created'
+        ).order_by('-number')
+        return context
+
+
+class NoteRevisionView(NoteBase, generic.DetailView):
+    """Прежняя версия заметки и её восстановление."""
+    template_name = 'notes/revision.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['revision'] = self.get_revision()
+        return context
+
+    def get_revision(self):
+        try:
+            return get_revision(self.object, self.kwargs['number'])
+        except NoteRevision.DoesNotExist:
+            raise Http404('Версия не найдена')
+
+    def post(self, request, *args, **kwargs):
+        """Восстановление версии; текущая версия уходит в историю."""
+        self.object = self.get_object()
+        revision = self.get_revision()
+        self.object.title = revision.title
+        self.object.text = revision.text
+        self.object.save()
+        return HttpResponseRedirect(self.success_url)
+
+
+class AttachmentBase(NoteBase):
+    """Вложения доступны только через заметки пользователя."""
+
+    def get_attachment(self):
+        return get_object_or_404(
+            Attachment.objects.select_related('blob', 'note').filter(
+                note__in=self.get_queryset().filter(slug=self.kwargs['slug'])
+            ),
+            pk=self.kwargs['pk']
+        )
+
+    def attachments_url(self):
+        return reverse('notes:attach', args=(self.kwargs['slug'],))
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class NoteAttachments(AttachmentBase, generic.DetailView):
+    """Вложения заметки и загрузка новых.
+
+    Загружаемый файл пишется на диск по мере приёма, не накапливаясь
+    в памяти.
+    """
+    template_name = 'notes/attachments.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['attachments'] = self.object.attachments.select_related(
+            'blob'
+        ).order_by('name')
+        return context
+
+    def post(self, request, *args, **kwargs):
+        # Заметка ищется до приёма тела, чтобы файл для чужой заметки
+        # не записывался на диск. Обработчик загрузки нужно заменить до
+        # разбора тела, поэтому CSRF проверяется после замены, а не
+        # промежуточным слоем.
+        note = self.get_object()
+        handler = HashingFileUploadHandler(request)
+        request.upload_handlers = [handler]
+        return self.upload(request, note, handler)
+
+    @method_decorator(csrf_protect)
+    def upload(self, request, note, handler):
+        uploaded = request.FILES.get('file')
+        if handler.too_large:
+            return JsonResponse({'error': 'Файл слишком большой'}, status=413)
+        if uploaded is None:
+            return JsonResponse({'error': 'Файл не передан'}, status=400)
+        attach(note, uploaded)
+        return HttpResponseRedirect(self.attachments_url())
+
+
+class AttachmentDownload(AttachmentBase, generic.View):
+    """Выдача вложения целиком или диапазоном байт."""
+
+    def get(self, request, *args, **kwargs):
+        attachment = self.get_attachment()
+        blob = attachment.blob
+        etag = f'"{blob.sha256}"'
+        byte_range = parse_range(request.headers.get('Range'), blob.size)
+        if request.headers.get('If-Range', etag) != etag:
+            # Файл изменился с прошлой загрузки части: отдаётся целиком.
+            byte_range = None
+        if byte_range == (None, None):
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{blob.size}'
+            return response
+        file = blob.file.storage.open(blob.file.name, 'rb')
+        options = {
+            'as_attachment': True,
+            'filename': attachment.name,
+            'content_type': attachment.content_type,
+        }
+        if byte_range is None:
+            response = FileResponse(file, **options)
+        else:
+            start, end = byte_range
+            file.seek(start)
+            response = FileResponse(
+                RangeFile(file, end - start + 1), status=206, **options
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{blob.size}'
+            response['Content-Length'] = end - start + 1
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = etag
+        return response
+
+
+class AttachmentDelete(AttachmentBase, generic.View):
+    """Удаление вложения."""
+
+    def post(self, request, *args, **kwargs):
+        self.get_attachment().delete()
+        return HttpResponseRedirect(self.attachments_url())
+
+
+class NotesExport(LoginRequiredMixin, generic.View):
+    """Выгрузка всех заметок пользователя в формате JSON Lines."""
+
+    def get(self, request):
+        response = StreamingHttpResponse(
+            export_notes(request.user), content_type='application/x-ndjson'
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="notes.jsonl"'
+        )
+        return response
+
+
+class NotesArchive(LoginRequiredMixin, generic.View):
+    """Выгрузка всех заметок пользователя архивом файлов Markdown."""
+
+    def get(self, request):
+        archive_format = request.GET.get('format', 'zip')
+        if archive_format not in ARCHIVE_FORMATS:
+            return JsonResponse(
+                {'error': 'Неизвестный формат архива'}, status=400
+            )
+        content_type, extension = ARCHIVE_FORMATS[archive_format]
+        response = StreamingHttpResponse(
+            export_archive(request.user, archive_format),
+            content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="notes.{extension}"'
+        )
+        return response
+
+
+class NotesImport(RateLimitMixin, LoginRequiredMixin, generic.View):
+    """Загрузка заметок из файла или тела запроса в формате JSON Lines."""
+    rate_limit_scope = 'notes-write'
+
+    def post(self, request):
+        if request.content_type == 'multipart/form-data':
+            source = request.FILES.get('file')
+            if source is None:
+                return JsonResponse({'error': 'Файл не передан'}, status=400)
+        else:
+            # Тело запроса читается построчно, без загрузки в память.
+            source = request
+        try:
+            created = import_notes(request.user, parse_lines(source))
+        except NoteImportError as error:
+            return JsonResponse(
+                {'error': str(error), 'created': error.created}, status=400
+            )
+        return JsonResponse({'created': created})
+
+
+class NotesSearch(LoginRequiredMixin, generic.TemplateView):
+    """Полнотекстовый поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        context['query'] = query
+        context['results'] = (
+            search_notes(self.request.user, query) if query else []
+        )
+        return context
+
+
+class TagCloud(LoginRequiredMixin, generic.View):
+    """Метки пользователя с числом заметок в формате JSON."""
+
+    def get(self, request):
+        return JsonResponse({'tags': [
+            {'name': name, 'count': count}
+            for name, count in tag_cloud(request.user)
+        ]})
+
+
+class Metrics(generic.View):
+    """Показатели запросов в формате Prometheus."""
+
+    def get(self, request):
+        if not settings.NOTES_METRICS_ENABLED:
+            raise Http404('Сбор показателей выключен')
+        return HttpResponse(
+            render_prometheus(registry.snapshot()),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
@@ -0,0 +1,57 @@
+"""SQLite с настройками для одновременной работы нескольких процессов.
+
+При подключении включаются WAL-журнал и прочие PRAGMA, а транзакции
+начинаются с ``BEGIN IMMEDIATE``: блокировка записи берётся сразу,
+и транзакция ждёт её в busy_timeout, а не падает с «database is locked»
+при попытке повысить блокировку чтения до записи.
+
+Настраивается через OPTIONS::
+
+    'OPTIONS': {
+        'pragmas': {'cache_size': -128000},
+        'transaction_mode': 'IMMEDIATE',
+    }
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение задаёт размер кэша в КиБ.
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, settings_dict, *args, **kwargs):
+        super().__init__(settings_dict, *args, **kwargs)
+        options = self.settings_dict['OPTIONS']
+        self.pragmas = {**DEFAULT_PRAGMAS, **options.get('pragmas', {})}
+        self.transaction_mode = options.get(
+            'transaction_mode', 'IMMEDIATE'
+        ).upper()
+        if self.transaction_mode not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f'Неизвестный transaction_mode: {self.transaction_mode}'
+            )
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
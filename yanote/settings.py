@@ -22,11 +22,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'notes.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'notes.middleware.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'notes.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -37,13 +39,21 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Скомпилированные шаблоны хранятся в памяти процесса,
+            # а yanote.warmup заполняет этот кэш при запуске.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'notes.context_processors.fragments',
             ],
         },
     },
@@ -54,8 +64,24 @@ WSGI_APPLICATION = 'yanote.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yanote.db.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+}
+
+# Сессии читаются из кэша и только при промахе из базы. Для сессий без
+# обращений к серверу подходит 'django.contrib.sessions.backends.signed_cookies'.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+DATABASE_ROUTERS = ['notes.routers.PrimaryReplicaRouter']
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -83,7 +109,62 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# Вложения заметок; раздаются только представлениями с проверкой автора.
+MEDIA_ROOT = BASE_DIR / 'media'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_CACHE_ALIAS = 'default'
+NOTES_CACHE_TIMEOUT = 60 * 10
+
+NOTES_METRICS_ENABLED = False
+NOTES_METRICS_DIR = None
+NOTES_METRICS_FLUSH_INTERVAL = 10
+
+NOTES_ASYNC_VIEWS = False
+
+# Псевдонимы реплик из DATABASES, с которых читаются заметки.
+NOTES_READ_REPLICAS = []
+NOTES_REPLICA_PIN_SECONDS = 10
+
+# Тексты заметок от этого размера в байтах хранятся сжатыми zlib,
+# None отключает сжатие новых записей.
+NOTES_TEXT_COMPRESS_THRESHOLD = 256
+NOTES_TEXT_COMPRESS_LEVEL = 6
+
+# Срок жизни фрагментов шаблонов: шапки пользователя и строк списка.
+NOTES_FRAGMENT_TIMEOUT = 600
+NOTES_WARM_UP_TEMPLATES = True
+
+# Каждая такая по счёту версия в истории правок хранится целиком.
+NOTES_REVISION_SNAPSHOT_EVERY = 10
+
+# Фоновые задачи: с NOTES_TASKS_EAGER выполняются сразу при постановке,
+# иначе их выполняет manage.py run_tasks.
+NOTES_TASKS_EAGER = False
+# Через сколько секунд задача, взятая упавшим обработчиком, берётся снова.
+NOTES_TASKS_LEASE = 300
+# Задержка первого повтора в секундах, дальше она удваивается.
+NOTES_TASKS_RETRY_DELAY = 5
+
+# Сколько секунд пользователь сессии живёт в кэше процесса, 0 — без кэша.
+NOTES_USER_CACHE_TTL = 60
+
+# Если у самой редкой из меток отбора не больше заметок, список
+# строится перебором её связей, иначе — проверкой меток у заметок
+# в порядке страницы.
+NOTES_TAG_JOIN_LIMIT = 2000
+
+# Наибольший размер вложения в байтах.
+NOTES_ATTACHMENT_MAX_SIZE = 50 * 1024 * 1024
+
+# Лимиты изменяющих запросов по областям: 'число/период', где период —
+# s, m, h или d с необязательным множителем. Считаются для каждого
+# пользователя, а для анонимных запросов — для каждого адреса.
+NOTES_RATE_LIMITS = {
+    'notes-write': '60/m',
+    'signup': '5/h',
+}
@@ -0,0 +1,56 @@
+"""Запуск тестов с отчётом о самых медленных из них."""
+import sys
+import time
+import unittest
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TimedTextTestResult(unittest.TextTestResult):
+    """Результат прогона, запоминающий время каждого теста."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = []
+        self._started = None
+
+    def startTest(self, test):  # noqa: N802
+        self._started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):  # noqa: N802
+        super().stopTest(test)
+        self.timings.append((time.perf_counter() - self._started, test.id()))
+
+
+class TimedTestRunner(DiscoverRunner):
+    """Прогон тестов, после которого выводятся самые медленные.
+
+    При параллельном запуске события тестов пересылаются из процессов
+    пачками и время отдельных тестов не измерить, поэтому отчёт
+    выводится только для последовательного прогона.
+    """
+
+    def get_resultclass(self):
+        return super().get_resultclass() or TimedTextTestResult
+
+    def run_suite(self, suite, **kwargs):
+        result = super().run_suite(suite, **kwargs)
+        if self.parallel == 1 and isinstance(result, TimedTextTestResult):
+            self.report_slowest(result.timings)
+        return result
+
+    def report_slowest(self, timings):
+        slow = sorted(
+            (timing for timing in timings
+             if timing[0] >= settings.TEST_SLOW_SECONDS),
+            reverse=True
+        )[:settings.TEST_SLOWEST]
+        if not slow:
+            return
+        sys.stderr.write(
+            f'\nСамые медленные тесты (от {settings.TEST_SLOW_SECONDS} с):\n'
+        )
+        for seconds, test_id in slow:
+            sys.stderr.write(f'{seconds:8.3f} с  {test_id}\n')
@@ -0,0 +1,33 @@
+"""Настройки для быстрого прогона тестов.
+
+Используются ``manage.py test`` и pytest. Отличаются от рабочих только
+тем, что не влияет на проверяемое поведение: быстрый хэш паролей,
+тестовая база в памяти и отчёт о самых медленных тестах.
+"""
+from .settings import *  # noqa: F401, F403
+from .settings import DATABASES
+
+# PBKDF2 с сотнями тысяч итераций делает create_user и login самыми
+# медленными операциями тестов.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Тестовая база SQLite создаётся в памяти; при параллельном запуске
+# (manage.py test --parallel, pytest -n) у каждого процесса своя копия,
+# поэтому тесты не делят ни файл базы, ни данные.
+DATABASES = {
+    **DATABASES,
+    'default': {**DATABASES['default'], 'TEST': {'NAME': None}},
+}
+
+NOTES_WARM_UP_TEMPLATES = False
+
+TEST_RUNNER = 'yanote.test_runner.TimedTestRunner'
+
+# Сколько самых медленных тестов показывать и начиная с какого времени
+# в секундах тест считается медленным.
+TEST_SLOWEST = 10
+TEST_SLOW_SECONDS = 0.25
+
+# Тесты разных пользователей с одинаковыми pk делят счётчики в кэше,
+# поэтому лимиты включают только тесты самого ограничения.
+NOTES_RATE_LIMITS = {}
@@ -4,8 +4,11 @@ from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path
 from django.views.generic import CreateView
 
+from notes.ratelimit import rate_limit
+
 urlpatterns = [
     path('', include('notes.urls')),
+    path('api/', include('notes.api_urls')),
     path('admin/', admin.site.urls),
 ]
 
@@ -24,11 +27,11 @@ auth_urls = ([
     ),
     path(
         'signup/',
-        CreateView.as_view(
+        rate_limit('signup')(CreateView.as_view(
             form_class=UserCreationForm,
             success_url='/',
             template_name='registration/signup.html',
-        ),
+        )),
         name='signup'
     ),
 ], 'users')
@@ -0,0 +1,40 @@
+"""Прогрев кэша скомпилированных шаблонов при запуске процесса."""
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+TEMPLATE_PATTERN = '*.html'
+
+
+def _template_names(engine):
+    for loader in engine.template_loaders:
+        for source in getattr(loader, 'loaders', [loader]):
+            for directory in source.get_dirs():
+                directory = Path(directory)
+                for path in directory.rglob(TEMPLATE_PATTERN):
+                    yield path.relative_to(directory).as_posix()
+
+
+def warm_up_templates():
+    """Компилирует все шаблоны, чтобы первые запросы не тратили на это
+    время, и возвращает их число.
+
+    Шаблоны остаются в кэше загрузчика ``cached.Loader``; без него
+    прогрев ничего не даёт, но и не мешает.
+    """
+    compiled = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in dict.fromkeys(_template_names(backend.engine)):
+            backend.get_template(name)
+            compiled += 1
+    return compiled
+
+
+def warm_up():
+    """Прогрев по настройке NOTES_WARM_UP_TEMPLATES."""
+    if settings.NOTES_WARM_UP_TEMPLATES:
+        warm_up_templates()